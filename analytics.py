@@ -0,0 +1,353 @@
+#------------------------GACHA ANALYTICS--------------------------#
+# Offline reports that never touch the live bot.
+#
+#   python analytics.py db database/database.db
+#   python analytics.py db database/database.db --report depth --format csv > depth.csv
+#   python analytics.py db backups/kiichu-20250301-040000.db.gz
+#   python analytics.py events                     (reads logs/events/)
+#   python analytics.py events --bucket 6 --format csv > rates.csv
+
+import argparse
+import csv
+import heapq
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from helpers.backup import extract
+from helpers.events import EVENTS_PATH
+from helpers.rates import PULL_COST, variant_probability
+
+PERCENTILES = (10, 25, 50, 75, 90, 99, 100)
+ACTIVE_WINDOWS = (1, 7, 30)
+# Pages copied per step of the snapshot, the live bot can write in between
+SNAPSHOT_PAGES = 1024
+
+RARITIES = ("Standard", "Holo", "Signed", "Golden Signed", "Holo Signed", "Holo Golden Signed", "Limited")
+
+
+def rarity_name(holo: int, sig: int, limited: bool = False) -> str:
+    if limited:
+        return "Limited"
+    if holo == 1 and sig == 2:
+        return "Holo Golden Signed"
+    elif holo == 1 and sig == 1:
+        return "Holo Signed"
+    elif sig == 2:
+        return "Golden Signed"
+    elif sig == 1:
+        return "Signed"
+    elif holo == 1:
+        return "Holo"
+    return "Standard"
+
+
+def write_rows(rows, columns, output_format, out=sys.stdout):
+    """Print dict rows as an aligned table, CSV or JSON lines."""
+    if output_format == "csv":
+        writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    elif output_format == "json":
+        for row in rows:
+            out.write(json.dumps({column: row.get(column) for column in columns}) + "\n")
+    else:
+        rendered = [[format_cell(row.get(column)) for column in columns] for row in rows]
+        widths = [max([len(column)] + [len(cells[i]) for cells in rendered]) for i, column in enumerate(columns)]
+        out.write("  ".join(column.rjust(width) for column, width in zip(columns, widths)) + "\n")
+        out.write("  ".join("-" * width for width in widths) + "\n")
+        for cells in rendered:
+            out.write("  ".join(cell.rjust(width) for cell, width in zip(cells, widths)) + "\n")
+
+
+def format_cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    return str(value)
+
+
+
+#----------------------DATABASE REPORTS----------------------#
+
+def snapshot(db_path: str, target: str):
+    """Copy a live database with the online backup API, a few pages at a time."""
+    source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    copy = sqlite3.connect(target)
+    try:
+        source.backup(copy, pages=SNAPSHOT_PAGES, sleep=0.005)
+    finally:
+        copy.close()
+        source.close()
+
+
+def drop_report(conn):
+    """Owned copies per holo/signature combination, against the configured drop rates."""
+    total = conn.execute("SELECT COALESCE(SUM(quantity), 0) FROM user_inventory").fetchone()[0]
+    cursor = conn.execute("""
+        SELECT cv.holo_type, cv.signature_type, cv.generation = 999, SUM(ui.quantity)
+        FROM user_inventory ui
+        JOIN card_variants cv ON ui.card_variant_id = cv.id
+        GROUP BY cv.holo_type, cv.signature_type, cv.generation = 999
+        ORDER BY cv.generation = 999, cv.holo_type, cv.signature_type
+    """)
+    for holo, sig, limited, copies in cursor:
+        yield {
+            "rarity": rarity_name(holo, sig, limited),
+            "holo_type": holo,
+            "signature_type": sig,
+            "copies": copies,
+            "rate": copies / total if total else None,
+            "expected": None if limited else variant_probability(holo, sig),
+        }
+
+
+def economy_report(conn):
+    users, balance, collected, pulls, owned = conn.execute("""
+        SELECT COUNT(*), COALESCE(SUM(currency), 0), COALESCE(SUM(total_stardust_collected), 0),
+            COALESCE(SUM(total_pulls), 0), COALESCE(SUM(total_cards_owned), 0)
+        FROM users
+    """).fetchone()
+    copies = conn.execute("SELECT COALESCE(SUM(quantity), 0) FROM user_inventory").fetchone()[0]
+    for metric, value in (
+        ("users", users),
+        ("stardust_balance", balance),
+        ("stardust_collected", collected),
+        ("stardust_spent_on_pulls", pulls * PULL_COST),
+        ("total_pulls", pulls),
+        ("copies_held", copies),
+        ("copies_recorded_on_users", owned),
+        ("copies_recycled_estimate", max(pulls - copies, 0)),
+        ("avg_balance", balance / users if users else 0.0),
+    ):
+        yield {"metric": metric, "value": value}
+
+
+def depth_report(conn):
+    """Percentiles of distinct variants per collecting user, streamed in order."""
+    variants = conn.execute("SELECT COUNT(*) FROM card_variants").fetchone()[0]
+    collectors = conn.execute("SELECT COUNT(DISTINCT user_id) FROM user_inventory").fetchone()[0]
+    if not collectors:
+        return
+    # rank (1-based) at which each percentile is reached
+    ranks = [(percentile, max(1, -(-percentile * collectors // 100))) for percentile in PERCENTILES]
+    cursor = conn.execute("""
+        SELECT COUNT(*) AS depth FROM user_inventory GROUP BY user_id ORDER BY depth
+    """)
+    wanted = iter(ranks)
+    percentile, rank = next(wanted)
+    for position, (depth,) in enumerate(cursor, start=1):
+        while position == rank:
+            yield {
+                "percentile": percentile,
+                "variants": depth,
+                "share_of_catalog": depth / variants if variants else None,
+            }
+            try:
+                percentile, rank = next(wanted)
+            except StopIteration:
+                return
+
+
+def active_report(conn):
+    now = datetime.now(timezone.utc)
+    for days in ACTIVE_WINDOWS:
+        cutoff = (now - timedelta(days=days)).isoformat()
+        daily, chatting, either = conn.execute("""
+            SELECT SUM(last_daily >= :cutoff), SUM(last_message_points >= :cutoff),
+                SUM(last_daily >= :cutoff OR last_message_points >= :cutoff)
+            FROM users
+        """, {"cutoff": cutoff}).fetchone()
+        yield {
+            "window_days": days,
+            "claimed_daily": daily or 0,
+            "earned_chat_stardust": chatting or 0,
+            "active": either or 0,
+        }
+
+
+DB_REPORTS = {
+    "drops": (drop_report, ["rarity", "holo_type", "signature_type", "copies", "rate", "expected"]),
+    "economy": (economy_report, ["metric", "value"]),
+    "depth": (depth_report, ["percentile", "variants", "share_of_catalog"]),
+    "active": (active_report, ["window_days", "claimed_daily", "earned_chat_stardust", "active"]),
+}
+
+
+def analyze_db(args):
+    if not os.path.isfile(args.db):
+        sys.exit(f"'{args.db}' does not exist")
+
+    workdir = None
+    path = args.db
+    if args.db.endswith(".gz"):
+        # a backup from db_backup.py / the backup command
+        workdir = tempfile.mkdtemp(prefix="kiichu-analytics-")
+        path = os.path.join(workdir, "backup.db")
+        extract(args.db, path)
+    elif not args.live:
+        workdir = tempfile.mkdtemp(prefix="kiichu-analytics-")
+        path = os.path.join(workdir, "snapshot.db")
+        snapshot(args.db, path)
+
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        # one read transaction, so every report sees the same state
+        conn.execute("BEGIN")
+        names = list(DB_REPORTS) if args.report == "all" else [args.report]
+        if args.format == "json":
+            json.dump({name: list(DB_REPORTS[name][0](conn)) for name in names}, sys.stdout, indent=2)
+            sys.stdout.write("\n")
+            return
+        for i, name in enumerate(names):
+            report, columns = DB_REPORTS[name]
+            if args.format == "table":
+                print(f"{'' if i == 0 else chr(10)}{name.upper()}")
+            elif i:
+                print()
+            write_rows(report(conn), columns, args.format)
+    finally:
+        conn.close()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+
+#----------------------EVENT LOG----------------------#
+
+def event_files(paths) -> list:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".jsonl")
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def read_events(path):
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # a torn last line after a crash
+                continue
+
+
+def merged_events(paths):
+    """Events from every file in time order, one line in memory per file."""
+    return heapq.merge(*(read_events(path) for path in event_files(paths)), key=lambda event: event["t"])
+
+
+class Bucket:
+    def __init__(self, start):
+        self.start = start
+        self.pulls = 0
+        self.drops = Counter()
+        self.inflow = Counter()
+        self.outflow = Counter()
+
+    def add(self, event):
+        kind = event["e"]
+        if kind == "drop":
+            self.drops[rarity_name(event.get("holo", 0), event.get("sig", 0), event.get("limited"))] += 1
+        elif kind == "pull":
+            self.pulls += event["n"]
+            self.outflow["pulls"] += event["cost"]
+        elif kind == "recycle":
+            self.inflow[f"recycle:{event.get('source', 'manual')}"] += event["stardust"]
+        elif kind == "grant":
+            self.inflow[event.get("source", "other").split(":")[0]] += event["amount"]
+        elif kind == "daily":
+            self.inflow["daily"] += event["amount"]
+        elif kind == "spend":
+            self.outflow[event.get("source", "other")] += event["amount"]
+        elif kind == "adjust":
+            target = self.inflow if event["amount"] >= 0 else self.outflow
+            target[event.get("source", "other")] += abs(event["amount"])
+
+    def merge(self, other):
+        self.pulls += other.pulls
+        self.drops.update(other.drops)
+        self.inflow.update(other.inflow)
+        self.outflow.update(other.outflow)
+
+    def row(self, label) -> dict:
+        drops = sum(self.drops.values())
+        row = {
+            "period": label,
+            "pulls": self.pulls,
+            "drops": drops,
+            "stardust_in": sum(self.inflow.values()),
+            "stardust_out": sum(self.outflow.values()),
+        }
+        row["net"] = row["stardust_in"] - row["stardust_out"]
+        for rarity in RARITIES:
+            row[rarity] = self.drops[rarity] / drops if drops else None
+        return row
+
+
+def analyze_events(args):
+    width = args.bucket * 3600
+    columns = ["period", "pulls", "drops", *RARITIES, "stardust_in", "stardust_out", "net"]
+    totals = Bucket(None)
+    rows = []
+    current = None
+
+    for event in merged_events(args.paths):
+        start = int(event["t"] // width * width)
+        if current is None or start != current.start:
+            if current is not None:
+                rows.append(current.row(datetime.fromtimestamp(current.start, timezone.utc).strftime("%Y-%m-%d %H:%M")))
+                totals.merge(current)
+            current = Bucket(start)
+        current.add(event)
+
+    if current is None:
+        sys.exit(f"No events found in {', '.join(args.paths)}")
+    rows.append(current.row(datetime.fromtimestamp(current.start, timezone.utc).strftime("%Y-%m-%d %H:%M")))
+    totals.merge(current)
+    rows.append(totals.row("total"))
+    write_rows(rows, columns, args.format)
+
+    if args.format == "table":
+        print("\nStardust in by source:  " + ", ".join(f"{source} {amount}" for source, amount in totals.inflow.most_common()))
+        print("Stardust out by source: " + ", ".join(f"{source} {amount}" for source, amount in totals.outflow.most_common()))
+
+
+
+#----------------------MAIN----------------------#
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline gacha analytics.")
+    subparsers = parser.add_subparsers(dest="report", required=True)
+
+    db = subparsers.add_parser("db", help="drop rates, economy, collection depth and activity from a database")
+    db.add_argument("db", help="path of the database file or of a .db.gz backup")
+    db.add_argument("--report", choices=("all", *DB_REPORTS), default="all")
+    db.add_argument("--format", choices=("table", "csv", "json"), default="table")
+    db.add_argument("--live", action="store_true",
+                    help="read the database in place (read-only) instead of from a snapshot copy")
+    db.set_defaults(run=analyze_db)
+
+    events = subparsers.add_parser("events", help="drop rates and stardust flows from the event log")
+    events.add_argument("paths", nargs="*", default=[EVENTS_PATH], help="event files or directories")
+    events.add_argument("--bucket", type=int, default=24, help="hours per row (default 24)")
+    events.add_argument("--format", choices=("table", "csv", "json"), default="table")
+    events.set_defaults(run=analyze_events)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
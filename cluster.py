@@ -0,0 +1,139 @@
+#------------------------MULTI-PROCESS MODE--------------------------#
+# Runs KiichuBot as several shard processes plus one writer process. The shards
+# handle their own gateway events and send every stardust and inventory write to
+# the writer over a local socket (see helpers/coordinator.py).
+#
+#   python cluster.py --processes 2 --shard-count 4
+#   python cluster.py writer --port 8765          (the writer on its own)
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT_PATH = os.path.realpath(os.path.dirname(__file__))
+DEFAULT_PORT = 8765
+
+
+
+#----------------------WRITER PROCESS----------------------#
+
+async def run_writer(host: str, port: int):
+    from cogs.gacha import DATABASE_PATH, Database, Gacha
+    from helpers.banners import banners
+    from helpers.catalog import catalog
+    from helpers.coordinator import BatchedConnection, WriterServer, writes
+    from helpers.events import events
+    from helpers.migrations import migrate
+
+    # the writer owns the schema, shards only start once it is listening
+    applied = await migrate(DATABASE_PATH)
+    for version, name in applied:
+        print(f"Applied migration {version:04d}_{name}")
+    await catalog.load(DATABASE_PATH)
+    await banners.load(DATABASE_PATH)
+    writes.subscribe("banners", lambda key: banners.load())
+    writes.subscribe("catalog", lambda key: catalog.attach(DATABASE_PATH))
+    writes.subscribe("catalog", lambda key: banners.load())
+
+    # the cog registers its write operations, it never sees a gateway event here
+    Gacha(None)
+    connection = BatchedConnection(await Database.get_connection())
+    Database._conn_pool = connection
+
+    server = WriterServer(writes, connection)
+    # pulls run here, so the writer follows the banner dates and stores is_active
+    schedule = asyncio.create_task(banners.run(persist=True))
+    print(f"Writer listening on {host}:{port}")
+    try:
+        await server.serve(host, port)
+    finally:
+        schedule.cancel()
+        print(f"Writer applied {server.applied} operations in {server.batches} transactions")
+        await events.close()
+        await Database.close()
+
+
+
+#----------------------LAUNCHER----------------------#
+
+def wait_for_port(host: str, port: int, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit("The writer process exited during startup")
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    sys.exit(f"The writer did not start listening on {host}:{port}")
+
+
+def shard_groups(processes: int, shard_count: int) -> list:
+    """Shard ids per process, round-robin: 2 processes / 4 shards -> [0, 2], [1, 3]."""
+    return [list(range(first, shard_count, processes)) for first in range(processes)]
+
+
+def launch(args):
+    shard_count = args.shard_count or args.processes
+    if shard_count < args.processes:
+        sys.exit("--shard-count must be at least --processes")
+
+    writer = subprocess.Popen(
+        [sys.executable, __file__, "writer", "--host", args.host, "--port", str(args.port)], cwd=ROOT_PATH
+    )
+    wait_for_port(args.host, args.port, writer)
+
+    shards = [
+        subprocess.Popen([
+            sys.executable, os.path.join(ROOT_PATH, "kiichan.py"),
+            "--shards", ",".join(map(str, group)),
+            "--shard-count", str(shard_count),
+            "--writer", f"{args.host}:{args.port}",
+        ], cwd=ROOT_PATH)
+        for group in shard_groups(args.processes, shard_count)
+    ]
+
+    try:
+        while all(shard.poll() is None for shard in shards) and writer.poll() is None:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # stop the shards first so nothing is left waiting on the writer
+        for process in shards + [writer]:
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+
+#----------------------MAIN----------------------#
+
+def main():
+    parser = argparse.ArgumentParser(description="Run KiichuBot as several shard processes and one writer.")
+    parser.add_argument("role", nargs="?", choices=("launch", "writer"), default="launch")
+    parser.add_argument("--processes", type=int, default=2, help="number of shard processes")
+    parser.add_argument("--shard-count", type=int, help="total shards (default: one per process)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    if args.role == "writer":
+        try:
+            asyncio.run(run_writer(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        launch(args)
+
+
+if __name__ == "__main__":
+    main()
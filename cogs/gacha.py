@@ -7,27 +7,34 @@ import asyncio
 import random
 from datetime import datetime, timedelta, timezone
 import hashlib
+from collections import namedtuple
 from datetime import timezone, timedelta
 from discord.ext.commands import BucketType
 from zoneinfo import ZoneInfo
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 from discord.ui import Button, View, Select
 
+from helpers.banners import MAX_INTERVAL as BANNER_CHECK_INTERVAL, Rates, banners
+from helpers.catalog import Card, Variant, catalog
+from helpers.collection import Collection, rarity_value
 from helpers.colors import colors
+from helpers.connection import connect as connect_database
+from helpers.coordinator import writes
 from helpers.emotes import emotes
+from helpers.events import events
+from helpers.metrics import InstrumentedConnection, instrumented
+# drop rates and the pull cost live in helpers/rates.py, shared with the offline tools
+from helpers.rates import (
+    GOLDEN_SIGNED_CHANCE, HOLO_DROP_RATE, LIMITED_CARD_FALLBACK, LIMITED_CARD_RATE, PULL_COST, SIGNED_DROP_RATE,
+)
+from helpers.render import render_cache
+from helpers.views import views
 
 DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'database.db')
 
-# Card Drop ratess
-LIMITED_CARD_RATE = 0 # 0 for now, until we decide to add it to the game
-LIMITED_CARD_FALLBACK = True
-HOLO_DROP_RATE = 0.2
-SIGNED_DROP_RATE = 0.2
-GOLDEN_SIGNED_CHANCE = 0.1
-
 # Recycling Values
 RECYCLE_STANDARD = 15
 RECYCLE_HOLO =  30
@@ -44,6 +51,9 @@ DAILY_COOLDOWN = timedelta(seconds=10)
 STARDUST_CHANNELS = [1333255961057562788,1338661794343817328]
 # Channels where you can use commands
 COMMAND_CHANNELS = [1333562210089435146] 
+# Set lookups for the per-message checks, chatting in a command channel earns nothing
+COMMAND_CHANNEL_IDS = frozenset(COMMAND_CHANNELS)
+POINT_CHANNEL_IDS = frozenset(STARDUST_CHANNELS) - COMMAND_CHANNEL_IDS
 
 # Stardust earned per eligible message
 MESSAGE_INTERVAL_1 = 20
@@ -55,9 +65,6 @@ MESSAGE_STARDUST_3 = 5
 MESSAGE_COOLDOWN = 180
 # Max messages per day that can earn stardust
 
-# Cost of one card pull
-PULL_COST = 100 
-
 GMT8 = ZoneInfo("Asia/Singapore")
 
 LEADERBOARD_TYPES = {
@@ -91,14 +98,14 @@ class Database:
     @classmethod
     async def get_connection(cls):
         if not cls._conn_pool:
-            cls._conn_pool = await aiosqlite.connect(
+            conn = await connect_database(
                 DATABASE_PATH,
                 timeout=30,
                 check_same_thread=False
             )
-            await cls._conn_pool.execute("PRAGMA journal_mode=WAL;")
-            await cls._conn_pool.execute("PRAGMA busy_timeout=5000;")
-            cls._conn_pool.row_factory = aiosqlite.Row
+            conn.row_factory = aiosqlite.Row
+            # time every statement issued through the shared connection
+            cls._conn_pool = InstrumentedConnection(conn)
         return cls._conn_pool
 
 
@@ -107,11 +114,14 @@ class Database:
     @contextlib.asynccontextmanager
     async def connection(cls):
         conn = await cls.get_connection()
-        try:
-            yield conn
-        finally:
-            # Don't close the connection, just ensure transactions commit
-            await conn.commit()
+        # events emitted in the block describe its writes, they are logged once the commit went through
+        with events.held() as held:
+            try:
+                yield conn
+            finally:
+                # Don't close the connection, just ensure transactions commit
+                await conn.commit()
+        events.release(held)
 
             
     @classmethod
@@ -120,6 +130,12 @@ class Database:
             await cls._conn_pool.close()
             cls._conn_pool = None
 
+
+# writes run on the shared connection unless a writer process is connected
+writes.connection = Database.connection
+# variants registered by a pull the writer then rolled back may not exist any more
+writes.on_rollback(catalog.forget_added)
+
     
 
 # ------------------- BANNER MANAGEMENT -------------------#
@@ -130,15 +146,24 @@ class BannerManager:
         self.db_path = db_path
 
     async def activate_banner(self, banner_id):
+        # the schedule follows the dates: starting the banner now makes it the latest
+        # one to start, and an end date already behind it is cleared
         async with Database.connection() as db:
             
             try:
-                await db.execute("UPDATE banners SET is_active = 0")
-                await db.execute("UPDATE banners SET is_active = 1 WHERE id = ?", (banner_id,))
+                await db.execute("""
+                    UPDATE banners
+                    SET start_date = CURRENT_TIMESTAMP,
+                        end_date = CASE WHEN end_date <= CURRENT_TIMESTAMP THEN NULL ELSE end_date END
+                    WHERE id = ?
+                """, (banner_id,))
+                await db.execute("UPDATE banners SET is_active = (id = ?)", (banner_id,))
                 
             except:
                 
                 raise
+        await banners.load()
+        await writes.publish("banners")
 
     async def get_active_banner(self):
         async with Database.connection() as db:
@@ -148,7 +173,16 @@ class BannerManager:
     async def add_banner(self, name):
         async with Database.connection() as db:
             await db.execute("INSERT INTO banners (name) VALUES (?)", (name,))
-            
+        await banners.load()
+        await writes.publish("banners")
+
+
+
+def drop_rates(pool) -> Rates:
+    """A banner's rate overrides over the defaults above, the defaults for no banner."""
+    defaults = (HOLO_DROP_RATE, SIGNED_DROP_RATE, GOLDEN_SIGNED_CHANCE, LIMITED_CARD_RATE)
+    overrides = pool.rates if pool else Rates()
+    return Rates(*(default if rate is None else rate for rate, default in zip(overrides, defaults)))
 
 
 
@@ -204,12 +238,12 @@ class PullResultView(View):
 
 
 class InventoryView(View):
-    def __init__(self, embeds, command_author, inventory_owner, card_list, bot, gacha, timeout=300, sort_order='rarity'):
+    def __init__(self, command_author, inventory_owner, collection, bot, gacha, timeout=300, sort_order='rarity'):
         super().__init__(timeout=timeout)
-        self.embeds = embeds
         self.command_author = command_author
         self.inventory_owner = inventory_owner
-        self.card_list = card_list
+        # a Collection, pages are rendered from it when shown
+        self.collection = collection
         self.bot = bot
         self.gacha = gacha
         self.current_index = 0
@@ -238,10 +272,11 @@ class InventoryView(View):
         self.add_item(self.sort_button)
 
         # Disable buttons if only one page
-        if len(self.embeds) <= 1:
+        if self.collection.page_count <= 1:
             self.prev_button.disabled = True
             self.next_button.disabled = True
 
+    @instrumented
     async def toggle_sort_order(self, interaction: discord.Interaction):
         self.sort_order = 'quantity' if self.sort_order == 'rarity' else 'rarity'
         self.sort_button.label = "Sort by Rarity" if self.sort_order == 'quantity' else "Sort by Quantity"
@@ -252,7 +287,7 @@ class InventoryView(View):
         await self.rebuild_collection(interaction)
         
         # Restore nearest valid page position
-        self.current_index = min(original_page, len(self.embeds)-1)
+        self.current_index = min(original_page, self.collection.page_count - 1)
         
         await self.update_inventory_view(interaction)
         
@@ -276,18 +311,9 @@ class InventoryView(View):
                 
                 raise
 
-        # Rebuild card list and embeds
-        self.card_list, rarest_card = self.process_collection(collection)
-        self.embeds = self.create_embeds(self.card_list, rarest_card)
+        self.collection = Collection(collection)
         self.current_index = 0
 
-        # Update footer with current sorting
-        for embed in self.embeds:
-            embed.set_footer(text=f"{embed.footer.text} | Sorting: {self.sort_order.capitalize()}")
-        
-        # Update view
-        await self.update_inventory_view(interaction)
-
     def get_order_clause(self):
         if self.sort_order == 'rarity':
             return """CASE
@@ -301,74 +327,28 @@ class InventoryView(View):
         else:
             return "user_inventory.quantity DESC"
 
-    def process_collection(self, collection):
-        card_list = []
-        rarest_card = None
-
-        for item in collection:
-            card_name, artist_name, card_variant_id, image_url, holo_type, signature_type, quantity = item
-
-            # Determine variation text
-            variations = []
-            if holo_type == 1:
-                variations.append("Holo")
-            if signature_type == 1:
-                variations.append("Signed")
-            elif signature_type == 2:
-                variations.append("Golden Signed")
-            variation_text = " ".join(variations) or "Standard"
-
-            summary = f"**{card_name}** ({variation_text}), x{quantity}"
-
-
-            # Store card data
-            card_data = {
-                "name": card_name,
-                "summary": summary,
-                "card_variant_id": card_variant_id,
-                "image_url": image_url,
-                "holo_type": holo_type,
-                "signature_type": signature_type,
-                "rarity_value": self.get_rarity_value(holo_type, signature_type)
-            }
-            card_list.append(card_data)
-
-            # Update rarest card (based on rarity value, even when quantity sorting)
-            if not rarest_card or card_data['rarity_value'] < rarest_card['rarity_value']:
-                rarest_card = {
-                    "image_url": image_url,
-                    "rarity_value": card_data['rarity_value']
-                }
-
-        return card_list, rarest_card
+    # build the embed of one page, only the cards on it are formatted
+    def render_page(self, index):
+        embed = discord.Embed(
+            description="\n".join(summary for _, summary in self.collection.page(index)),
+            color=colors["blue"]
+        )
+        embed.set_footer(text=f"Page {index + 1}/{self.collection.page_count} | Sorting: {self.sort_order.capitalize()}")
 
-    def create_embeds(self, card_list, rarest_card):
-        embeds = []
-        for i in range(0, len(card_list), 10):
-            page_cards = card_list[i:i + 10]
-            base_color = colors["blue"]
+        if index == 0:
+            rarest_image_url = self.collection.rarest_image_url()
+            if rarest_image_url:
+                embed.set_thumbnail(url=rarest_image_url)
 
-            embed = discord.Embed(
-                description="\n".join([card["summary"] for card in page_cards]),
-                color=base_color
-            )
-            embed.set_footer(text=f"Page {i//10 + 1} of {len(card_list)//10 + 1} | Sorting: {self.sort_order.capitalize()}")
-            
-            if rarest_card and i == 0:
-                embed.set_thumbnail(url=rarest_card["image_url"])
-                
-            embed.set_author(
-                name=f"{self.inventory_owner.display_name}'s Collection",
-                icon_url=self.inventory_owner.display_avatar.url
-            )
-            embeds.append(embed)
-        return embeds
+        embed.set_author(
+            name=f"{self.inventory_owner.display_name}'s Collection",
+            icon_url=self.inventory_owner.display_avatar.url
+        )
+        return embed
 
     # Retrieve cards for the current page (10 per page)
     def get_current_page_cards(self):
-        start = self.current_index * 10
-        end = start + 10
-        return self.card_list[start:end]
+        return self.collection.page(self.current_index)
 
     # create dropdown based on the currently displayed cards on page
     def create_dropdown(self, page_cards):
@@ -376,17 +356,7 @@ class InventoryView(View):
     
 
     def get_rarity_value(self, holo, signature):
-        if holo == 1 and signature == 2:  # Holo + Golden Signed
-            return 1
-        elif signature == 2:  # Golden Signed
-            return 2
-        elif holo == 1 and signature == 1:  # Holo + Signed
-            return 3
-        elif signature == 1:  # Signed
-            return 4
-        elif holo == 1:  # Holo
-            return 5
-        return 6
+        return rarity_value(holo, signature)
 
     # update the embed and dropdown when changing pages
     async def update_inventory_view(self, interaction):
@@ -404,11 +374,9 @@ class InventoryView(View):
 
         # Update button states
         self.prev_button.disabled = self.current_index == 0
-        self.next_button.disabled = self.current_index == len(self.embeds) - 1
+        self.next_button.disabled = self.current_index == self.collection.page_count - 1
 
-        # Get current embed and update footer
-        current_embed = self.embeds[self.current_index]
-        current_embed.set_footer(text=f"Page {self.current_index + 1}/{len(self.embeds)} | Sorting: {self.sort_order.capitalize()}")
+        current_embed = self.render_page(self.current_index)
 
         # Handle response properly
         if interaction.response.is_done():
@@ -426,11 +394,13 @@ class InventoryView(View):
 
     
     # previous inventory page
+    @instrumented
     async def go_previous(self, interaction):
         self.current_index -= 1
         await self.update_inventory_view(interaction)
 
     # next inventory page
+    @instrumented
     async def go_next(self, interaction):
         self.current_index += 1
         await self.update_inventory_view(interaction)
@@ -470,6 +440,7 @@ class InventoryView(View):
         return True
 
     # Recycle UI
+    @instrumented
     async def open_recycle_ui(self, interaction, card_variant_id):
         async with Database.connection() as db:
             
@@ -518,6 +489,7 @@ class InventoryView(View):
 
 
     # back to inventory page from card details
+    @instrumented
     async def go_back_to_inventory(self, interaction: discord.Interaction):
         """Handle back navigation with current sort order"""
         # Use the existing InventoryView's sorting logic instead of hardcoded query
@@ -556,8 +528,7 @@ class InventoryView(View):
             return
 
         # Rebuild using InventoryView's processing methods
-        self.card_list, rarest_card = self.process_collection(collection)
-        self.embeds = self.create_embeds(self.card_list, rarest_card)
+        self.collection = Collection(collection)
         self.current_index = 0
 
         # Reset view components
@@ -570,46 +541,18 @@ class InventoryView(View):
 
         # Update button states
         self.prev_button.disabled = self.current_index == 0
-        self.next_button.disabled = self.current_index == len(self.embeds) - 1
+        self.next_button.disabled = self.current_index == self.collection.page_count - 1
 
         # Update the message
         await interaction.response.edit_message(
-            embed=self.embeds[self.current_index],
+            embed=self.render_page(self.current_index),
             view=self
         )
 
     # recycle number of cards
     async def recycle_card(self, interaction, card_variant_id, quantity, recycle_value):
         user_id = interaction.user.id
-        total_points = recycle_value * quantity
-
-        async with Database.connection() as db:
-            
-            try:
-                # update inventory and points
-                await db.execute(
-                    """
-                    UPDATE user_inventory 
-                    SET quantity = quantity - ? 
-                    WHERE user_id = ? AND card_variant_id = ?
-                    """,
-                    (quantity, user_id, card_variant_id)
-                )
-                await db.execute(
-                    """
-                    DELETE FROM user_inventory
-                    WHERE user_id = ? AND card_variant_id = ? AND quantity <= 0
-                    """,
-                    (user_id, card_variant_id)
-                )
-                await db.execute(
-                    "UPDATE users SET currency = currency + ? WHERE discord_id = ?",
-                    (total_points, user_id)
-                )
-                
-            except Exception as e:
-                
-                raise
+        total_points = await writes.call("recycle", user_id, card_variant_id, quantity, recycle_value)
 
         await interaction.response.send_message(
             f"Recycled **x{quantity}** copies for **{total_points} stardust**!", ephemeral=True
@@ -628,15 +571,16 @@ class CardDropdown(discord.ui.Select):
 
         options = [
             discord.SelectOption(
-                label=card["summary"],
-                value=str(card["card_variant_id"]),
+                label=summary,
+                value=str(card_variant_id),
                 description=""
             )
-            for card in card_list
+            for card_variant_id, summary in card_list
         ]
         super().__init__(placeholder="Select a card to view", options=options)
         self.user_id = user_id
 
+    @instrumented
     async def callback(self, interaction: discord.Interaction):
         card_variant_id = int(self.values[0])
 
@@ -727,37 +671,14 @@ class RecycleDropdown(discord.ui.Select):
         super().__init__(placeholder="Select quantity to recycle...", options=options)
 
     # recycle quantity user selected
+    @instrumented
     async def callback(self, interaction: discord.Interaction):
         quantity = int(self.values[0])
-        total_points = quantity * self.recycle_value
 
         # update database
-        async with Database.connection() as db:
-            
-            try:
-                await db.execute(
-                    """
-                    UPDATE user_inventory 
-                    SET quantity = quantity - ? 
-                    WHERE user_id = ? AND card_variant_id = ?
-                    """,
-                    (quantity, interaction.user.id, self.card_variant_id)
-                )
-                await db.execute(
-                    """
-                    DELETE FROM user_inventory
-                    WHERE user_id = ? AND card_variant_id = ? AND quantity <= 0
-                    """,
-                    (interaction.user.id, self.card_variant_id)
-                )
-                await db.execute(
-                    "UPDATE users SET currency = currency + ? WHERE discord_id = ?",
-                    (total_points, interaction.user.id)
-                )
-                
-            except Exception as e:
-                
-                raise
+        total_points = await writes.call(
+            "recycle", interaction.user.id, self.card_variant_id, quantity, self.recycle_value
+        )
 
         # edit ephemeral message
         await interaction.response.edit_message(
@@ -884,53 +805,54 @@ class AutoRecycleView(discord.ui.View):
 
 
 
+# Prebuilt parts of a banner message, shared by every BannerView of that banner
+BannerTemplate = namedtuple("BannerTemplate", "banner_id embed options")
+
+
+async def card_preview_embed(card_id):
+    card = catalog.cards.get(card_id)
+    if card is None:
+        # not in the catalog yet
+        async with Database.connection() as db:
+            cursor = await db.execute("""
+                SELECT id, name, image_url, artist_name, banner_id, is_limited, max_copies
+                FROM cards WHERE id = ?
+            """, (card_id,))
+            card = Card(*await cursor.fetchone())
+
+    def build():
+        embed = discord.Embed(
+            title=card.name,
+            description=f"**Artist:** {card.artist_name}",
+            color=colors["blue"]
+        )
+        embed.set_image(url=card.image_url)
+        return embed
+
+    return render_cache.embed(("card_preview", card_id), build)
+
+
 class BannerView(discord.ui.View):
-    def __init__(self, cards, bot, original_embed):
+    def __init__(self, template, bot):
         super().__init__(timeout=300)
-        self.cards = cards
+        self.template = template
         self.bot = bot
-        self.original_embed = original_embed
-        self.add_item(self.CardDropdown(cards))
+        self.add_item(self.CardDropdown(template.options))
 
     class CardDropdown(discord.ui.Select):
-        def __init__(self, cards):
-            options = [
-                discord.SelectOption(
-                    label=card['name'],
-                    value=str(card['id']),
-                    description=f"by {card['artist_name']}"
-                ) for card in cards
-            ]
+        def __init__(self, options):
             super().__init__(
                 placeholder="Select a card to preview...",
-                options=options,
+                options=list(options),
                 min_values=1,
                 max_values=1
             )
 
         async def callback(self, interaction: discord.Interaction):
-            card_id = int(self.values[0])
-            async with Database.connection() as db:
-                cursor = await db.execute("""
-                    SELECT name, image_url, artist_name 
-                    FROM cards WHERE id = ?
-                """, (card_id,))
-                card = await cursor.fetchone()
+            embed = await card_preview_embed(int(self.values[0]))
 
-            # Create detail embed
-            embed = discord.Embed(
-                title=card['name'],
-                description=f"**Artist:** {card['artist_name']}",
-                color=colors["blue"]
-            )
-            embed.set_image(url=card['image_url'])
-            
             view = discord.ui.View(timeout=300)
-            view.add_item(self.view.BackButton(
-                self.view.cards,
-                self.view.bot,
-                self.view.original_embed
-            ))
+            view.add_item(self.view.BackButton(self.view.template, self.view.bot))
             
             await interaction.response.edit_message(
                 embed=embed, 
@@ -939,22 +861,22 @@ class BannerView(discord.ui.View):
 
 
     class BackButton(discord.ui.Button):
-        def __init__(self, cards, bot, original_embed):
+        def __init__(self, template, bot):
             super().__init__(
                 label="Back to Banner",
                 style=discord.ButtonStyle.secondary
             )
-            self.cards = cards
+            self.template = template
             self.bot = bot
-            self.original_embed = original_embed
                 
         async def callback(self, interaction: discord.Interaction):
             # Pass the stored data to recreate BannerView
-            view = BannerView(self.cards, self.bot, self.original_embed)
+            view = BannerView(self.template, self.bot)
             await interaction.response.edit_message(
-                embed=self.original_embed,
+                embed=self.template.embed.copy(),
                 view=view
             )
+            views.register(view, interaction.user.id, interaction.message)
 
 
 
@@ -993,98 +915,40 @@ class BulkRecycleView(discord.ui.View):
                 options=options
             )
 
+        @instrumented
         async def callback(self, interaction: discord.Interaction):
             await interaction.response.defer()
             level = int(self.values[0])
-            total_recycled = 0
-            recycled_info = {}
-
-            async with Database.connection() as db:
-                # Get all inventory items
-                cursor = await db.execute("""
-                    SELECT ui.card_variant_id, ui.quantity, 
-                        cv.holo_type, cv.signature_type
-                    FROM user_inventory ui
-                    JOIN card_variants cv ON ui.card_variant_id = cv.id
-                    WHERE ui.user_id = ?
-                """, (interaction.user.id,))
-                inventory = await cursor.fetchall()
-
-                # Process recycling
-                for row in inventory:
-                    if not row: continue
-                    variant_id, quantity, holo, sig = row
-                    if quantity <= 1:
-                        continue  # Keep at least 1 copy
-
-                    if self.cog.should_recycle_card(level, holo, sig):
-                        # Get current quantity
-                        cursor = await db.execute(
-                            "SELECT quantity FROM user_inventory WHERE user_id = ? AND card_variant_id = ?",
-                            (interaction.user.id, variant_id)
-                        )
-                        result = await cursor.fetchone()
-                        if not result: continue
-                        
-                        current_qty = result['quantity']
-                        copies_to_recycle = current_qty - 1
-
-                        if copies_to_recycle > 0:
-                            recycle_value = self.cog.calculate_recycle_value(holo, sig)
-                            total_recycled += recycle_value * copies_to_recycle
-
-                            # Track by rarity
-                            rarity = self.cog.get_rarity_name(holo, sig)
-                            recycled_info[rarity] = recycled_info.get(rarity, {
-                                'copies': 0,
-                                'value': recycle_value
-                            })
-                            recycled_info[rarity]['copies'] += copies_to_recycle
-
-                            # Update inventory
-                            await db.execute(
-                                "UPDATE user_inventory SET quantity = 1 WHERE user_id = ? AND card_variant_id = ?",
-                                (interaction.user.id, variant_id)
-                            )
-
-                # Update currency if any recycling occurred
-                if total_recycled > 0:
-                    await db.execute(
-                        """UPDATE users SET 
-                            currency = currency + ?,
-                            total_stardust_collected = total_stardust_collected + ?
-                        WHERE discord_id = ?""",
-                        (total_recycled, total_recycled, interaction.user.id)
-                    )
-                    await db.commit()
-
+            outcome = await writes.call("bulk_recycle", interaction.user.id, level)
+            total_recycled = outcome["total"]
+            recycled_info = outcome["recycled_info"]
 
-                # Build result embed
-                if total_recycled > 0:
-                    embed = discord.Embed(
-                        title="Bulk Recycling Complete",
-                        description=f"Recycled **{sum(info['copies'] for info in recycled_info.values())}** copies",
-                        color=colors["green"]
-                    )
-                    
-                    for rarity, info in recycled_info.items():
-                        embed.add_field(
-                            name=f"{rarity} x{info['copies']}",
-                            value=f"{info['value']} {emotes['stardust']} each → **{info['copies'] * info['value']} {emotes['stardust']}**",
-                            inline=False
-                        )
-                    
-                    embed.set_footer(text=f"Total gained: {total_recycled}")
-                else:
-                    embed = discord.Embed(
-                        title="No Cards Recycled",
-                        description="No matching cards found for selected tier",
-                        color=colors["blue"]
+            # Build result embed
+            if total_recycled > 0:
+                embed = discord.Embed(
+                    title="Bulk Recycling Complete",
+                    description=f"Recycled **{sum(info['copies'] for info in recycled_info.values())}** copies",
+                    color=colors["green"]
+                )
+                
+                for rarity, info in recycled_info.items():
+                    embed.add_field(
+                        name=f"{rarity} x{info['copies']}",
+                        value=f"{info['value']} {emotes['stardust']} each → **{info['copies'] * info['value']} {emotes['stardust']}**",
+                        inline=False
                     )
                 
+                embed.set_footer(text=f"Total gained: {total_recycled}")
+            else:
+                embed = discord.Embed(
+                    title="No Cards Recycled",
+                    description="No matching cards found for selected tier",
+                    color=colors["blue"]
+                )
+            
 
-                self.view.stop()
-                await interaction.followup.send(embed=embed, ephemeral=True)
+            self.view.stop()
+            await interaction.followup.send(embed=embed, ephemeral=True)
                 
 
         async def interaction_check(self, interaction: discord.Interaction) -> bool:
@@ -1119,8 +983,16 @@ class Gacha(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         # allowed channels for gaining points in chat
-        self.allowed_channels = STARDUST_CHANNELS
+        self.allowed_channels = POINT_CHANNEL_IDS
         self._cd = commands.CooldownMapping.from_cooldown(1, 3.0, BucketType.user)
+        writes.operation("message_points", self.apply_message_points)
+        writes.operation("pull", self.apply_pull)
+        writes.operation("daily", self.apply_daily)
+        writes.operation("recycle", self.apply_recycle)
+        writes.operation("bulk_recycle", self.apply_bulk_recycle)
+        writes.operation("add_points", self.apply_add_points)
+        writes.operation("remove_points", self.apply_remove_points)
+        writes.operation("set_points", self.apply_set_points)
         self.ACHIEVEMENT_TIERS = {
             "stardust": [
                 (1000, "Starlet"),
@@ -1157,6 +1029,35 @@ class Gacha(commands.Cog):
             ]
         }
 
+    async def cog_load(self):
+        # the bot drops messages outside these channels unless they look like a command
+        self.bot.listen_in_channels("gacha", self.allowed_channels)
+        self.banner_schedule.start()
+
+    async def cog_unload(self):
+        self.bot.forget_channels("gacha")
+        self.banner_schedule.cancel()
+
+    @tasks.loop(seconds=BANNER_CHECK_INTERVAL)
+    async def banner_schedule(self):
+        # every process follows the dates itself; the one applying writes stores is_active
+        try:
+            changed, interval = await banners.tick(persist=not writes.remote)
+        except Exception as e:
+            self.bot.logger.error(f"Banner schedule check failed: {type(e).__name__}: {e}")
+            return
+        if changed:
+            live = ", ".join(f"'{pool.banner.name}'" for pool in banners.live)
+            self.bot.logger.info(f"Live banners: {live}" if live else "No banner is live")
+        # sleep until the next start or end date
+        if interval != self.banner_schedule.seconds:
+            self.banner_schedule.change_interval(seconds=interval)
+
+    @banner_schedule.before_loop
+    async def before_banner_schedule(self):
+        # boot has loaded the catalog and the schedule by then
+        await self.bot.wait_until_ready()
+
     async def check_achievements(self, db, user_id: int, achievement_type: str, current_value: int):
         new_achievements = []
         reward = 0
@@ -1184,6 +1085,7 @@ class Gacha(commands.Cog):
                         "INSERT INTO achievements (user_id, achievement_type, tier) VALUES (?, ?, ?)",
                         (user_id, achievement_type, threshold)
                     )
+                    events.emit("grant", u=user_id, amount=100, source=f"achievement:{achievement_type}")
                     new_achievements.append((threshold, title))
                     reward += 100
 
@@ -1194,7 +1096,7 @@ class Gacha(commands.Cog):
 
 
     async def command_channel_check(self, ctx: commands.Context):
-        if ctx.channel.id not in COMMAND_CHANNELS:
+        if ctx.channel.id not in COMMAND_CHANNEL_IDS:
             embed = discord.Embed(
             description=f"Commands can only be used in <#{COMMAND_CHANNELS[0]}>!",
             color=colors["blue"]
@@ -1255,97 +1157,102 @@ class Gacha(commands.Cog):
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        if message.author.bot or message.channel.id not in self.allowed_channels or message.channel.id in COMMAND_CHANNELS:
+        if message.author.bot or message.channel.id not in self.allowed_channels:
             return
 
-        async with Database.connection() as db:
-            try:
-                user_id = message.author.id
-                now_gmt8 = datetime.now(GMT8)
-                now_utc = datetime.now(timezone.utc)
-                await db.execute(
-                    """INSERT OR IGNORE INTO users 
-                    (discord_id, currency, last_daily, total_stardust_collected, 
-                        daily_message_count, last_message_points) 
-                    VALUES (?, 0, NULL, 0, 0, NULL)""",
-                    (user_id,)
-                )
-                
-                cursor = await db.execute(
-                    """SELECT daily_message_count, last_message_points, currency, total_stardust_collected 
-                    FROM users WHERE discord_id = ?""",
-                    (user_id,)
-                )
-                result = await cursor.fetchone()
-
-                daily_message_count, last_message_points, currency, total_collected = result
+        user_id = message.author.id
+        outcome = await writes.call("message_points", user_id)
+        if outcome is None:
+            return
+        new_achievements = outcome["achievements"]
 
-                # Reset daily count at GMT+8 midnight
-                if result['last_message_points']:
-                    last_utc = datetime.fromisoformat(result['last_message_points']).replace(tzinfo=timezone.utc)
-                    last_gmt8 = last_utc.astimezone(GMT8)
-                    
-                    if last_gmt8.date() != now_gmt8.date():
-                        daily_message_count = 0
-                    else:
-                        daily_message_count = result['daily_message_count']
-                else:
-                    daily_message_count = 0
+        # Send achievement notifications
+        if new_achievements:
+            for threshold, title in new_achievements:
+                embed = discord.Embed(
+                    title=f"Achievement Unlocked: {title}!",
+                    description=f"{message.author.mention} you have passed **{threshold}** total stardust! {emotes['stardust']}\n"
+                            f"**Reward:** +100 {emotes['stardust']}",
+                    color=colors["gold"]
+                )
+                await message.channel.send(embed=embed)
+
+
+    async def apply_message_points(self, db, user_id: int):
+        """Chat point accrual, returns None while the user is on cooldown. Runs through `writes`."""
+        now_gmt8 = datetime.now(GMT8)
+        now_utc = datetime.now(timezone.utc)
+        await db.execute(
+            """INSERT OR IGNORE INTO users 
+            (discord_id, currency, last_daily, total_stardust_collected, 
+                daily_message_count, last_message_points) 
+            VALUES (?, 0, NULL, 0, 0, NULL)""",
+            (user_id,)
+        )
+        
+        cursor = await db.execute(
+            """SELECT daily_message_count, last_message_points, currency, total_stardust_collected 
+            FROM users WHERE discord_id = ?""",
+            (user_id,)
+        )
+        result = await cursor.fetchone()
 
-                # Enforce 3-minute cooldown
-                if result['last_message_points']:
-                    last_points_time = datetime.fromisoformat(result['last_message_points']).replace(tzinfo=timezone.utc)
-                    elapsed = (now_utc - last_points_time).total_seconds()
-                    
-                    if elapsed < MESSAGE_COOLDOWN:
-                        return
-                    
-                # Calculate tiered rewards
-                if daily_message_count < MESSAGE_INTERVAL_1:
-                    points_earned = MESSAGE_STARDUST_1
-                elif daily_message_count < MESSAGE_INTERVAL_2:
-                    points_earned = MESSAGE_STARDUST_2
-                else:
-                    points_earned = MESSAGE_STARDUST_3
+        daily_message_count, last_message_points, currency, total_collected = result
 
-                # Update user stats
-                new_currency = result['currency'] + points_earned
-                total_collected = result['total_stardust_collected'] + points_earned
-                daily_message_count += 1
-                
-                await db.execute(
-                    """UPDATE users SET 
-                        currency = ?, 
-                        daily_message_count = ?, 
-                        last_message_points = ?,
-                        total_stardust_collected = ?
-                    WHERE discord_id = ?""",
-                    (
-                        new_currency,
-                        daily_message_count,
-                        now_utc.isoformat(), 
-                        total_collected,
-                        user_id
-                    )
-                )
+        # Reset daily count at GMT+8 midnight
+        if result['last_message_points']:
+            last_utc = datetime.fromisoformat(result['last_message_points']).replace(tzinfo=timezone.utc)
+            last_gmt8 = last_utc.astimezone(GMT8)
+            
+            if last_gmt8.date() != now_gmt8.date():
+                daily_message_count = 0
+            else:
+                daily_message_count = result['daily_message_count']
+        else:
+            daily_message_count = 0
 
-                new_achievements, reward = await self.check_achievements(
-                    db, user_id, "stardust", total_collected
-                )
+        # Enforce 3-minute cooldown
+        if result['last_message_points']:
+            last_points_time = datetime.fromisoformat(result['last_message_points']).replace(tzinfo=timezone.utc)
+            elapsed = (now_utc - last_points_time).total_seconds()
+            
+            if elapsed < MESSAGE_COOLDOWN:
+                return None
+            
+        # Calculate tiered rewards
+        if daily_message_count < MESSAGE_INTERVAL_1:
+            points_earned = MESSAGE_STARDUST_1
+        elif daily_message_count < MESSAGE_INTERVAL_2:
+            points_earned = MESSAGE_STARDUST_2
+        else:
+            points_earned = MESSAGE_STARDUST_3
 
-                # Send achievement notifications
-                if new_achievements:
-                    for threshold, title in new_achievements:
-                        embed = discord.Embed(
-                            title=f"Achievement Unlocked: {title}!",
-                            description=f"{message.author.mention} you have passed **{threshold}** total stardust! {emotes['stardust']}\n"
-                                    f"**Reward:** +100 {emotes['stardust']}",
-                            color=colors["gold"]
-                        )
-                        await message.channel.send(embed=embed)
+        # Update user stats
+        new_currency = result['currency'] + points_earned
+        total_collected = result['total_stardust_collected'] + points_earned
+        daily_message_count += 1
+        
+        await db.execute(
+            """UPDATE users SET 
+                currency = ?, 
+                daily_message_count = ?, 
+                last_message_points = ?,
+                total_stardust_collected = ?
+            WHERE discord_id = ?""",
+            (
+                new_currency,
+                daily_message_count,
+                now_utc.isoformat(), 
+                total_collected,
+                user_id
+            )
+        )
+        events.emit("grant", u=user_id, amount=points_earned, source="message")
 
-            except Exception as e:
-                raise
+        new_achievements, reward = await self.check_achievements(
+            db, user_id, "stardust", total_collected
+        )
+        return {"points": points_earned, "achievements": new_achievements}
 
 
     # calculate recycle values
@@ -1363,20 +1270,97 @@ class Gacha(commands.Cog):
         else:  # Regular
             return RECYCLE_STANDARD
 
-    async def get_next_serial(self, card_variant_id):
-        async with Database.connection() as db:
-            
-            try:
-                cursor = await db.execute("""
-                    SELECT COALESCE(MAX(serial_number), 0) + 1 
-                    FROM limited_card_instances 
-                    WHERE card_variant_id = ?
-                """, (card_variant_id,))
-                return (await cursor.fetchone())[0]
-            except Exception as e:
-                
-                raise
-        
+    async def apply_recycle(self, db, user_id: int, card_variant_id: int, quantity: int, recycle_value: int):
+        """Trades `quantity` copies of a variant for stardust, returns the stardust gained. Runs through `writes`."""
+        total_points = recycle_value * quantity
+        await db.execute(
+            """
+            UPDATE user_inventory 
+            SET quantity = quantity - ? 
+            WHERE user_id = ? AND card_variant_id = ?
+            """,
+            (quantity, user_id, card_variant_id)
+        )
+        await db.execute(
+            """
+            DELETE FROM user_inventory
+            WHERE user_id = ? AND card_variant_id = ? AND quantity <= 0
+            """,
+            (user_id, card_variant_id)
+        )
+        await db.execute(
+            "UPDATE users SET currency = currency + ? WHERE discord_id = ?",
+            (total_points, user_id)
+        )
+        events.emit("recycle", u=user_id, variant=card_variant_id, qty=quantity,
+                    stardust=total_points, source="manual")
+        return total_points
+
+    async def apply_bulk_recycle(self, db, user_id: int, level: int):
+        """Recycles every duplicate the tier allows down to one copy. Runs through `writes`."""
+        total_recycled = 0
+        recycled_info = {}
+
+        # Get all inventory items
+        cursor = await db.execute("""
+            SELECT ui.card_variant_id, ui.quantity, 
+                cv.holo_type, cv.signature_type
+            FROM user_inventory ui
+            JOIN card_variants cv ON ui.card_variant_id = cv.id
+            WHERE ui.user_id = ?
+        """, (user_id,))
+        inventory = await cursor.fetchall()
+
+        # Process recycling
+        for variant_id, quantity, holo, sig in inventory:
+            copies_to_recycle = quantity - 1  # Keep at least 1 copy
+            if copies_to_recycle <= 0 or not self.should_recycle_card(level, holo, sig):
+                continue
+
+            recycle_value = self.calculate_recycle_value(holo, sig)
+            total_recycled += recycle_value * copies_to_recycle
+
+            # Track by rarity
+            rarity = self.get_rarity_name(holo, sig)
+            recycled_info[rarity] = recycled_info.get(rarity, {
+                'copies': 0,
+                'value': recycle_value
+            })
+            recycled_info[rarity]['copies'] += copies_to_recycle
+
+            # Update inventory
+            await db.execute(
+                "UPDATE user_inventory SET quantity = 1 WHERE user_id = ? AND card_variant_id = ?",
+                (user_id, variant_id)
+            )
+            events.emit("recycle", u=user_id, variant=variant_id, qty=copies_to_recycle,
+                        stardust=recycle_value * copies_to_recycle, source="bulk")
+
+        # Update currency if any recycling occurred
+        if total_recycled > 0:
+            await db.execute(
+                """UPDATE users SET 
+                    currency = currency + ?,
+                    total_stardust_collected = total_stardust_collected + ?
+                WHERE discord_id = ?""",
+                (total_recycled, total_recycled, user_id)
+            )
+        return {"total": total_recycled, "recycled_info": recycled_info}
+
+    async def allocate_serial(self, db, limited):
+        """
+        Takes the next serial of a limited card, None once every copy is out. The check
+        and the increment are one statement, so two pulls can never get the same serial.
+        """
+        cursor = await db.execute("""
+            UPDATE limited_serials SET issued = issued + 1
+            WHERE card_variant_id = :variant AND (:max_copies IS NULL OR issued < :max_copies)
+            RETURNING issued
+        """, {"variant": limited.variant_id, "max_copies": limited.max_copies or None})
+        row = await cursor.fetchone()
+        # keep the pool's stock in step, it decides which cards can still be drawn
+        limited.issued = row[0] if row else limited.max_copies
+        return row[0] if row else None
 
     async def update_rarity_value(self, user_id, new_card_variant_id):
         async with Database.connection() as db:
@@ -1453,7 +1437,9 @@ class Gacha(commands.Cog):
     async def help(self, ctx: commands.Context):
         if not await self.command_channel_check(ctx):
             return
-        
+        await ctx.send(embed=render_cache.embed("help", self.build_help_embed))
+
+    def build_help_embed(self):
         embed = discord.Embed(
             title="KiichuBot Help Menu",
             description="Here are the available commands and how to use them:",
@@ -1462,22 +1448,21 @@ class Gacha(commands.Cog):
 
         commands_info = [
             ("`!dailies [user]`", "Claim your daily stardust!"),
-            ("`!pull [1 or 10]`", "Spend stardust to pull 1 or 10 cards."),
+            ("`!pull [1 or 10] [banner]`", "Spend stardust to pull 1 or 10 cards, from a live banner if you name one."),
             ("`!collection [user]`", "Access a user's card collection to view or manage it."),
             ("`!stardust`", "Check your current stardust balance."),
             ("`!profile [user]`", "View a user's profile to view their stats!"),
             ("`!leaderboard [pulls, stardust, streak] [page number]`", "View the leaderboard and your rank!"),
             ("`!autorecycle`", "Configure automatic recycling of duplicate cards when pulling."),
             ("`!bulkrecycle`", "Recycle duplicate cards from inventory."),
-            ("`!banner`", "View the current cards on the banner!"),
+            ("`!banner [banner]`", "View the cards on the featured banner, or on another live one!"),
         ]
 
         for cmd, desc in commands_info:
             embed.add_field(name=cmd, value=desc, inline=False)
 
         embed.set_footer(text="Use these commands to collect and manage your cards!")
-        
-        await ctx.send(embed=embed)
+        return embed
 
 
 
@@ -1497,102 +1482,25 @@ class Gacha(commands.Cog):
         if not await self.command_channel_check(ctx):
             return
         user_id = ctx.author.id
-        
-        async with Database.connection() as db:
-            try:
-                await db.execute(
-                    """INSERT OR IGNORE INTO users 
-                    (discord_id, currency, total_stardust_collected, has_claimed_welcome) 
-                    VALUES (?, 1000, 1000, 1)""",
-                    (user_id,)
-                )
 
-                # Grant welcome bonus if existing user hasn't claimed
-                await db.execute(
-                    """UPDATE users SET
-                        currency = currency + 1000,
-                        total_stardust_collected = total_stardust_collected + 1000,
-                        has_claimed_welcome = 1
-                    WHERE discord_id = ? AND has_claimed_welcome = 0""",
-                    (user_id,)
-                )
-
-                # Get current values with proper timezone
-                now_gmt8 = datetime.now(GMT8)
-                cursor = await db.execute(
-                    """SELECT last_daily, current_daily_streak, longest_daily_streak,
-                    total_stardust_collected FROM users WHERE discord_id = ?""",
-                    (user_id,)
-                )
-                result = await cursor.fetchone()
-
-                # Calculate new streak
-                new_streak = 1
-                if result['last_daily']:
-                    last_daily_utc = datetime.fromisoformat(result['last_daily']).replace(tzinfo=timezone.utc)
-                    last_daily_gmt8 = last_daily_utc.astimezone(GMT8)
-                    
-                    # Check if already claimed today in GMT+8
-                    if last_daily_gmt8.date() == now_gmt8.date():
-                        next_reset = (last_daily_gmt8 + timedelta(days=1)).replace(
-                            hour=0, minute=0, second=0, microsecond=0
-                        )
-                        embed = discord.Embed(
-                            description=f"Come back <t:{int(next_reset.timestamp())}:R> for your next daily!",
-                            color=colors["blue"]
-                        )
-                        await ctx.send(embed=embed)
-                        return
-                    
-                    # Calculate streak
-                    if (last_daily_gmt8 + timedelta(days=1)).date() == now_gmt8.date():
-                        new_streak = result['current_daily_streak'] + 1
-                    else:
-                        new_streak = 1
-
-                # Update daily rewards (store times in UTC)
-                await db.execute(
-                    """UPDATE users SET
-                        currency = currency + ?,
-                        total_stardust_collected = total_stardust_collected + ?,
-                        current_daily_streak = ?,
-                        longest_daily_streak = MAX(?, longest_daily_streak),
-                        last_daily = ?
-                    WHERE discord_id = ?""",
-                    (
-                        DAILY_STARDUST_AMOUNT,
-                        DAILY_STARDUST_AMOUNT,
-                        new_streak,
-                        new_streak,
-                        now_gmt8.astimezone(timezone.utc).isoformat(),
-                        user_id
-                    )
-                )
-
-                # Get updated totals for achievement checks
-                cursor = await db.execute(
-                    """SELECT currency, total_stardust_collected 
-                    FROM users WHERE discord_id = ?""",
-                    (user_id,)
-                )
-                updated = await cursor.fetchone()
-                new_currency = updated['currency']
-                new_total = updated['total_stardust_collected']
-
-                # Check both achievement types
-                streak_achievements, streak_reward = await self.check_achievements(db, user_id, "streak", new_streak)
-                stardust_achievements, stardust_reward = await self.check_achievements(db, user_id, "stardust", new_total)
-                all_achievements = [(threshold, title, 'streak') for threshold, title in streak_achievements] + [(threshold, title, 'stardust') for threshold, title in stardust_achievements]
+        try:
+            outcome = await writes.call("daily", user_id)
+        except Exception as e:
+            await ctx.send(f"Daily claim failed: {str(e)}")
+            return
 
-                # Debug output to console to confirm achievements are detected
-                print(f"User {user_id} - Streak Achievements: {streak_achievements}, Stardust Achievements: {stardust_achievements}")
+        if "next_reset" in outcome:
+            embed = discord.Embed(
+                description=f"Come back <t:{outcome['next_reset']}:R> for your next daily!",
+                color=colors["blue"]
+            )
+            await ctx.send(embed=embed)
+            return
 
-                await db.commit()
+        new_streak = outcome["streak"]
+        new_currency = outcome["currency"]
+        all_achievements = outcome["achievements"]
 
-            except Exception as e:
-                await ctx.send(f"Daily claim failed: {str(e)}")
-                return
-            
         main_embed = discord.Embed(
             description=f"{ctx.author.mention} you received **{DAILY_STARDUST_AMOUNT}** {emotes['stardust']}\n"
                         f"**Current Streak:** {self.pluralize(new_streak, 'day')}\n"
@@ -1616,6 +1524,100 @@ class Gacha(commands.Cog):
             await ctx.send(embed=embed)
 
 
+    async def apply_daily(self, db, user_id: int):
+        """
+        Daily reward (and the welcome bonus for new users), returns when the next claim
+        opens if today's was already taken. Runs through `writes`.
+        """
+        cursor = await db.execute(
+            """INSERT OR IGNORE INTO users 
+            (discord_id, currency, total_stardust_collected, has_claimed_welcome) 
+            VALUES (?, 1000, 1000, 1)""",
+            (user_id,)
+        )
+        welcomed = cursor.rowcount
+
+        # Grant welcome bonus if existing user hasn't claimed
+        cursor = await db.execute(
+            """UPDATE users SET
+                currency = currency + 1000,
+                total_stardust_collected = total_stardust_collected + 1000,
+                has_claimed_welcome = 1
+            WHERE discord_id = ? AND has_claimed_welcome = 0""",
+            (user_id,)
+        )
+        if welcomed > 0 or cursor.rowcount > 0:
+            events.emit("grant", u=user_id, amount=1000, source="welcome")
+
+        # Get current values with proper timezone
+        now_gmt8 = datetime.now(GMT8)
+        cursor = await db.execute(
+            """SELECT last_daily, current_daily_streak, longest_daily_streak,
+            total_stardust_collected FROM users WHERE discord_id = ?""",
+            (user_id,)
+        )
+        result = await cursor.fetchone()
+
+        # Calculate new streak
+        new_streak = 1
+        if result['last_daily']:
+            last_daily_utc = datetime.fromisoformat(result['last_daily']).replace(tzinfo=timezone.utc)
+            last_daily_gmt8 = last_daily_utc.astimezone(GMT8)
+
+            # Check if already claimed today in GMT+8
+            if last_daily_gmt8.date() == now_gmt8.date():
+                next_reset = (last_daily_gmt8 + timedelta(days=1)).replace(
+                    hour=0, minute=0, second=0, microsecond=0
+                )
+                return {"next_reset": int(next_reset.timestamp())}
+
+            # Calculate streak
+            if (last_daily_gmt8 + timedelta(days=1)).date() == now_gmt8.date():
+                new_streak = result['current_daily_streak'] + 1
+            else:
+                new_streak = 1
+
+        # Update daily rewards (store times in UTC)
+        await db.execute(
+            """UPDATE users SET
+                currency = currency + ?,
+                total_stardust_collected = total_stardust_collected + ?,
+                current_daily_streak = ?,
+                longest_daily_streak = MAX(?, longest_daily_streak),
+                last_daily = ?
+            WHERE discord_id = ?""",
+            (
+                DAILY_STARDUST_AMOUNT,
+                DAILY_STARDUST_AMOUNT,
+                new_streak,
+                new_streak,
+                now_gmt8.astimezone(timezone.utc).isoformat(),
+                user_id
+            )
+        )
+        events.emit("daily", u=user_id, amount=DAILY_STARDUST_AMOUNT, streak=new_streak)
+
+        # Get updated totals for achievement checks
+        cursor = await db.execute(
+            """SELECT currency, total_stardust_collected 
+            FROM users WHERE discord_id = ?""",
+            (user_id,)
+        )
+        updated = await cursor.fetchone()
+        new_currency = updated['currency']
+        new_total = updated['total_stardust_collected']
+
+        # Check both achievement types
+        streak_achievements, streak_reward = await self.check_achievements(db, user_id, "streak", new_streak)
+        stardust_achievements, stardust_reward = await self.check_achievements(db, user_id, "stardust", new_total)
+        all_achievements = [(threshold, title, 'streak') for threshold, title in streak_achievements] + [(threshold, title, 'stardust') for threshold, title in stardust_achievements]
+
+        # Debug output to console to confirm achievements are detected
+        print(f"User {user_id} - Streak Achievements: {streak_achievements}, Stardust Achievements: {stardust_achievements}")
+
+        return {"streak": new_streak, "currency": new_currency, "achievements": all_achievements}
+
+
 
 #-------------------- CHECK POINTS COMMAND -----------------------------#
 
@@ -1709,7 +1711,8 @@ class Gacha(commands.Cog):
                              description="Spend stardust to pull cards!",
                              aliases=["p", "roll"]
                              )
-    async def pull(self, ctx: commands.Context, pulls: int = commands.parameter(description="Number of pulls (1 or 10)", default=1)):
+    async def pull(self, ctx: commands.Context, pulls: int = commands.parameter(description="Number of pulls (1 or 10)", default=1), *,
+                   banner: str = commands.parameter(description="Live banner to pull from, every card if left out", default=None)):
         if not await self.command_channel_check(ctx):
             return
         if pulls not in {1, 10}:
@@ -1720,160 +1723,42 @@ class Gacha(commands.Cog):
             await ctx.send(embed = embed)
             return
 
-        user_id = ctx.author.id
-        total_cost = pulls * PULL_COST
-        recycled_info = {}
-
-        async with Database.connection() as db:
-            
-            try:
-                cursor = await db.execute("""
-                    SELECT currency, total_pulls, total_cards_owned, total_unique_variants 
-                    FROM users WHERE discord_id = ?
-                """, (user_id,))
-                result = await cursor.fetchone()
-
-                if not result or result['currency'] < total_cost:
-                    embed = discord.Embed(
-                        description=f"You don't have enough stardust for this pull!",
-                        color=colors["red"]
-                    )
-                    await ctx.send(embed=embed)
-                    
-                    return
-
-                currency = result['currency']
-                total_pulls = result['total_pulls'] + pulls
-                total_cards_owned = result['total_cards_owned']
-
-                await db.execute("""
-                    UPDATE users SET currency = currency - ? 
-                    WHERE discord_id = ?
-                """, (total_cost, user_id))
-
-                pulls_result = []
-                special_messages = {}
-                card_quantities = {}
-                variant_batch = []
-                variant_counts = {}
-
-                for i in range(pulls):
-                    variant_id, special_msg, qty, color = await self.generate_card_variant(db, user_id)
-                    pulls_result.append((variant_id, color))
-                    variant_batch.append((user_id, variant_id))
-                    
-                    # Track counts within this pull
-                    variant_counts[variant_id] = variant_counts.get(variant_id, 0) + 1
-                    
-                    if special_msg:
-                        special_messages[i] = special_msg
-                    card_quantities[i] = qty
-
-                # Insert all pulls into inventory
-                await db.executemany("""
-                    INSERT INTO user_inventory (user_id, card_variant_id, quantity)
-                    VALUES (?, ?, 1)
-                    ON CONFLICT(user_id, card_variant_id) 
-                    DO UPDATE SET quantity = quantity + 1
-                """, [(uid, vid) for uid, vid in variant_batch])
-
-                # ========== AUTO-RECYCLE LOGIC ==========
-                cursor = await db.execute(
-                    "SELECT auto_recycle_level FROM users WHERE discord_id = ?",
-                    (user_id,)
+        pool = None
+        if banner:
+            pool = banners.find(banner)
+            if pool is None:
+                live = ", ".join(f"**{live.banner.name}**" for live in banners.live) or "none"
+                embed = discord.Embed(
+                    description=f"There is no live banner called **{banner}**! Live banners: {live}",
+                    color=colors["red"]
                 )
-                auto_level = (await cursor.fetchone())['auto_recycle_level']
-                recycled_stardust = 0
-
-                pre_pull_quantities = {}
-                for variant_id in variant_counts.keys():
-                    cursor = await db.execute(
-                        "SELECT quantity FROM user_inventory WHERE user_id = ? AND card_variant_id = ?",
-                        (user_id, variant_id)
-                    )
-                    result = await cursor.fetchone()
-                    pre_pull = result['quantity'] - variant_counts[variant_id] if result else 0
-                    pre_pull_quantities[variant_id] = pre_pull
-
-                if auto_level > 0:
-                    # Process recycling for each unique variant in batch
-                    for variant_id, pull_count in variant_counts.items():
-                        # Get current count from database
-                        cursor = await db.execute(
-                            "SELECT quantity FROM user_inventory WHERE user_id = ? AND card_variant_id = ?",
-                            (user_id, variant_id)
-                        )
-                        current_qty = (await cursor.fetchone())['quantity']
-
-                        # Get variant details
-                        cursor = await db.execute(
-                            "SELECT holo_type, signature_type FROM card_variants WHERE id = ?",
-                            (variant_id,)
-                        )
-                        variant_data = await cursor.fetchone()
-                        if not variant_data:
-                            continue
-                        
-                        holo = variant_data['holo_type']
-                        sig = variant_data['signature_type']
-
-                        # Determine recycling eligibility
-                        if self.should_recycle_card(auto_level, holo, sig):
-                            new_copies = current_qty - pre_pull_quantities.get(variant_id, 0)
-                            
-                            # Calculate how many to keep (minimum 1 overall)
-                            keep = 1 if pre_pull_quantities.get(variant_id, 0) == 0 else 0
-                            copies_to_recycle = max(new_copies - keep, 0)
-
-                            if copies_to_recycle > 0:
-                                recycle_value = self.calculate_recycle_value(holo, sig)
-                                recycled_stardust += recycle_value * copies_to_recycle
-
-                                # Update inventory
-                                await db.execute(
-                                    "UPDATE user_inventory SET quantity = quantity - ? WHERE user_id = ? AND card_variant_id = ?",
-                                    (copies_to_recycle, user_id, variant_id)
-                                )
-                                await db.execute(
-                                    "DELETE FROM user_inventory WHERE quantity <= 0 AND user_id = ? AND card_variant_id = ?",
-                                    (user_id, variant_id)
-                                )
-
-                                # Store grouped recycle info
-                                rarity_name = self.get_rarity_name(holo, sig)
-                                if rarity_name not in recycled_info:
-                                    recycled_info[rarity_name] = {
-                                        'copies': 0,
-                                        'value': recycle_value,
-                                        'total': 0
-                                    }
-                                recycled_info[rarity_name]['copies'] += copies_to_recycle
-                                recycled_info[rarity_name]['total'] += recycle_value * copies_to_recycle
-
-                    # Update currency if any recycling occurred
-                    if recycled_stardust > 0:
-                        await db.execute(
-                            "UPDATE users SET currency = currency + ?, total_stardust_collected = total_stardust_collected + ? WHERE discord_id = ?",
-                            (recycled_stardust, recycled_stardust, user_id)
-                        )
+                await ctx.send(embed=embed)
+                return
 
-                await db.execute(
-                    "UPDATE users SET total_pulls = ? WHERE discord_id = ?",
-                    (total_pulls, user_id)
-                )
-                
-                new_achievements, _ = await self.check_achievements(db, user_id, "pulls", total_pulls)
-                unique_card_ids = {cv[0] for cv in variant_batch}
-                for card_id in unique_card_ids:
-                    await self.check_card_set_completion(db, user_id, card_id)
+        user_id = ctx.author.id
 
-                await db.commit()
+        try:
+            outcome = await writes.call("pull", user_id, pulls, pool.banner.id if pool else None)
+        except Exception as e:
+            await ctx.send(f"Pull failed: {str(e)}")
+            return
 
-            except Exception as e:
-                await ctx.send(f"Pull failed: {str(e)}")
-                return
+        if outcome is None:
+            embed = discord.Embed(
+                description=f"You don't have enough stardust for this pull!",
+                color=colors["red"]
+            )
+            await ctx.send(embed=embed)
+            return
 
-        
+        # keys come back as strings when the pull ran in the writer process
+        pulls_result = outcome["pulls_result"]
+        special_messages = {int(i): message for i, message in outcome["special_messages"].items()}
+        card_quantities = {int(i): qty for i, qty in outcome["card_quantities"].items()}
+        pre_pull_quantities = {int(vid): qty for vid, qty in outcome["pre_pull_quantities"].items()}
+        recycled_info = outcome["recycled_info"]
+        recycled_stardust = outcome["recycled_stardust"]
+        new_achievements = outcome["achievements"]
 
         # Send pull results
         embeds = await self.create_pull_embeds(pulls_result, pulls, special_messages, card_quantities, user_id, pre_pull_quantities, ctx.author.display_name)
@@ -1883,6 +1768,7 @@ class Gacha(commands.Cog):
             view = PullResultView(embeds, ctx.author)
             message = await ctx.send(embed=embeds[0], view=view)
             view.message = message
+            views.register(view, ctx.author.id, message)
 
 
         if recycled_stardust > 0:
@@ -1922,6 +1808,169 @@ class Gacha(commands.Cog):
                 await ctx.send(embed=embed)
 
 
+    async def apply_pull(self, db, user_id: int, pulls: int, banner_id: int = None):
+        """
+        Pays for and rolls `pulls` cards from a live banner (every card if `banner_id` is
+        None), returns None without enough stardust. Runs through `writes`.
+        """
+        pool = None
+        if banner_id is not None:
+            pool = banners.live_pool(banner_id)
+            if pool is None:
+                raise ValueError("That banner is not live any more")
+        total_cost = pulls * PULL_COST
+        recycled_info = {}
+
+        cursor = await db.execute("""
+            SELECT currency, total_pulls, total_cards_owned, total_unique_variants 
+            FROM users WHERE discord_id = ?
+        """, (user_id,))
+        result = await cursor.fetchone()
+
+        if not result or result['currency'] < total_cost:
+            return None
+
+        currency = result['currency']
+        total_pulls = result['total_pulls'] + pulls
+        total_cards_owned = result['total_cards_owned']
+
+        await db.execute("""
+            UPDATE users SET currency = currency - ? 
+            WHERE discord_id = ?
+        """, (total_cost, user_id))
+        events.emit("pull", u=user_id, n=pulls, cost=total_cost)
+
+        pulls_result = []
+        special_messages = {}
+        card_quantities = {}
+        variant_batch = []
+        variant_counts = {}
+
+        for i in range(pulls):
+            variant_id, special_msg, qty, color = await self.generate_card_variant(db, user_id, pool)
+            pulls_result.append((variant_id, color))
+            variant_batch.append((user_id, variant_id))
+            
+            # Track counts within this pull
+            variant_counts[variant_id] = variant_counts.get(variant_id, 0) + 1
+            
+            if special_msg:
+                special_messages[i] = special_msg
+            card_quantities[i] = qty
+
+        # Insert all pulls into inventory
+        await db.executemany("""
+            INSERT INTO user_inventory (user_id, card_variant_id, quantity)
+            VALUES (?, ?, 1)
+            ON CONFLICT(user_id, card_variant_id) 
+            DO UPDATE SET quantity = quantity + 1
+        """, [(uid, vid) for uid, vid in variant_batch])
+
+        # ========== AUTO-RECYCLE LOGIC ==========
+        cursor = await db.execute(
+            "SELECT auto_recycle_level FROM users WHERE discord_id = ?",
+            (user_id,)
+        )
+        auto_level = (await cursor.fetchone())['auto_recycle_level']
+        recycled_stardust = 0
+
+        pre_pull_quantities = {}
+        for variant_id in variant_counts.keys():
+            cursor = await db.execute(
+                "SELECT quantity FROM user_inventory WHERE user_id = ? AND card_variant_id = ?",
+                (user_id, variant_id)
+            )
+            result = await cursor.fetchone()
+            pre_pull = result['quantity'] - variant_counts[variant_id] if result else 0
+            pre_pull_quantities[variant_id] = pre_pull
+
+        if auto_level > 0:
+            # Process recycling for each unique variant in batch
+            for variant_id, pull_count in variant_counts.items():
+                # Get current count from database
+                cursor = await db.execute(
+                    "SELECT quantity FROM user_inventory WHERE user_id = ? AND card_variant_id = ?",
+                    (user_id, variant_id)
+                )
+                current_qty = (await cursor.fetchone())['quantity']
+
+                # Get variant details
+                cursor = await db.execute(
+                    "SELECT holo_type, signature_type FROM card_variants WHERE id = ?",
+                    (variant_id,)
+                )
+                variant_data = await cursor.fetchone()
+                if not variant_data:
+                    continue
+                
+                holo = variant_data['holo_type']
+                sig = variant_data['signature_type']
+
+                # Determine recycling eligibility
+                if self.should_recycle_card(auto_level, holo, sig):
+                    new_copies = current_qty - pre_pull_quantities.get(variant_id, 0)
+                    
+                    # Calculate how many to keep (minimum 1 overall)
+                    keep = 1 if pre_pull_quantities.get(variant_id, 0) == 0 else 0
+                    copies_to_recycle = max(new_copies - keep, 0)
+
+                    if copies_to_recycle > 0:
+                        recycle_value = self.calculate_recycle_value(holo, sig)
+                        recycled_stardust += recycle_value * copies_to_recycle
+
+                        # Update inventory
+                        await db.execute(
+                            "UPDATE user_inventory SET quantity = quantity - ? WHERE user_id = ? AND card_variant_id = ?",
+                            (copies_to_recycle, user_id, variant_id)
+                        )
+                        await db.execute(
+                            "DELETE FROM user_inventory WHERE quantity <= 0 AND user_id = ? AND card_variant_id = ?",
+                            (user_id, variant_id)
+                        )
+                        events.emit("recycle", u=user_id, variant=variant_id, qty=copies_to_recycle,
+                                    stardust=recycle_value * copies_to_recycle, source="auto")
+
+                        # Store grouped recycle info
+                        rarity_name = self.get_rarity_name(holo, sig)
+                        if rarity_name not in recycled_info:
+                            recycled_info[rarity_name] = {
+                                'copies': 0,
+                                'value': recycle_value,
+                                'total': 0
+                            }
+                        recycled_info[rarity_name]['copies'] += copies_to_recycle
+                        recycled_info[rarity_name]['total'] += recycle_value * copies_to_recycle
+
+            # Update currency if any recycling occurred
+            if recycled_stardust > 0:
+                await db.execute(
+                    "UPDATE users SET currency = currency + ?, total_stardust_collected = total_stardust_collected + ? WHERE discord_id = ?",
+                    (recycled_stardust, recycled_stardust, user_id)
+                )
+
+        await db.execute(
+            "UPDATE users SET total_pulls = ? WHERE discord_id = ?",
+            (total_pulls, user_id)
+        )
+        
+        new_achievements, _ = await self.check_achievements(db, user_id, "pulls", total_pulls)
+        unique_card_ids = {cv[0] for cv in variant_batch}
+        for card_id in unique_card_ids:
+            await self.check_card_set_completion(db, user_id, card_id)
+
+        await db.commit()
+
+        return {
+            "pulls_result": pulls_result,
+            "special_messages": special_messages,
+            "card_quantities": card_quantities,
+            "pre_pull_quantities": pre_pull_quantities,
+            "recycled_info": recycled_info,
+            "recycled_stardust": recycled_stardust,
+            "achievements": new_achievements,
+        }
+
+
     async def create_pull_embeds(self, pulls_result, pulls, special_messages, card_quantities, user_id, pre_pull_quantities, author_name):
         embeds = []
         async with Database.connection() as db:
@@ -1987,84 +2036,58 @@ class Gacha(commands.Cog):
 
 
     # Generate card Variants
-    async def generate_card_variant(self, db, user_id):
+    async def generate_card_variant(self, db, user_id, pool=None):
+        # `pool` is the banner pulled from; without one, regular cards come from every
+        # card and limited ones from the featured banner
+        rates = drop_rates(pool)
+        limited_pool = pool or banners.featured
         # Check for limited card first
-        if random.random() < LIMITED_CARD_RATE:
-            cursor = await db.execute("""
-                SELECT c.id, c.max_copies, cv.id 
-                FROM cards c
-                LEFT JOIN card_variants cv 
-                    ON c.id = cv.card_id 
-                    AND cv.generation = 999
-                WHERE c.is_limited = 1 
-                AND c.banner_id = (SELECT id FROM banners WHERE is_active = 1)
-                AND (
-                    c.max_copies IS NULL OR 
-                    (SELECT COUNT(*) FROM limited_card_instances 
-                    WHERE card_variant_id = cv.id) < c.max_copies
-                )
-                ORDER BY RANDOM() 
-                LIMIT 1
-            """)
-            limited_card = await cursor.fetchone()
+        limited = limited_pool.random_limited() if limited_pool and random.random() < rates.limited else None
+        if limited:
+            card_id, variant_id = limited.card_id, limited.variant_id
             
-            if limited_card:
-                card_id, max_copies, variant_id = limited_card
-                
-                # Create variant if missing
-                if not variant_id:
-                    await db.execute("""
-                        INSERT INTO card_variants 
-                        (card_id, holo_type, signature_type, image_url, generation)
-                        VALUES (?, 0, 0, '', 999)
-                    """, (card_id,))
-                    variant_id = (await db.execute("SELECT last_insert_rowid()")).fetchone()[0]
-                    
-
-                # Verify stock again before inserting
+            # Create variant if missing, at most once even when pulls interleave
+            if not variant_id:
+                await db.execute("""
+                    INSERT INTO card_variants 
+                    (card_id, holo_type, signature_type, image_url, generation)
+                    SELECT ?, 0, 0, ?, 999
+                    WHERE NOT EXISTS (SELECT 1 FROM card_variants WHERE card_id = ? AND generation = 999)
+                """, (card_id, catalog.cards[card_id].image_url, card_id))
                 cursor = await db.execute("""
-                    SELECT COUNT(*) FROM limited_card_instances 
-                    WHERE card_variant_id = ?
-                """, (variant_id,))
-                current_count = (await cursor.fetchone())[0]
-                
-                if max_copies and current_count >= max_copies:
-                    if LIMITED_CARD_FALLBACK:
-                        pass  # Fall through to regular pull
-                    else:
-                        return await self.generate_card_variant(db, user_id)
-                else:
-                    # Get next serial
-                    serial = await self.get_next_serial(variant_id)
-                    
-                    # Insert limited instance
-                    await db.execute("""
-                        INSERT INTO limited_card_instances 
-                        (card_variant_id, user_id, serial_number)
-                        VALUES (?, ?, ?)
-                    """, (variant_id, user_id, serial))
-                    
-                    # Update limited card image URL if missing
-                    cursor = await db.execute("""
-                        SELECT image_url FROM card_variants WHERE id = ?
-                    """, (variant_id,))
-                    if (await cursor.fetchone())[0] == '':
-                        await db.execute("""
-                            UPDATE card_variants 
-                            SET image_url = (SELECT image_url FROM cards WHERE id = ?)
-                            WHERE id = ?
-                        """, (card_id, variant_id))
-                    
-                    return variant_id, "✨ **LIMITED EDITION!** ✨", 0  # No variations for limited
+                    SELECT id FROM card_variants WHERE card_id = ? AND generation = 999 ORDER BY id LIMIT 1
+                """, (card_id,))
+                variant_id = limited.variant_id = (await cursor.fetchone())[0]
+                await db.execute("INSERT OR IGNORE INTO limited_serials (card_variant_id) VALUES (?)", (variant_id,))
+
+            serial = await self.allocate_serial(db, limited)
+            if serial is None:
+                if not LIMITED_CARD_FALLBACK:
+                    return await self.generate_card_variant(db, user_id, pool)
+                # Fall through to regular pull
+            else:
+                # Insert limited instance
+                await db.execute("""
+                    INSERT INTO limited_card_instances 
+                    (card_variant_id, user_id, serial_number)
+                    VALUES (?, ?, ?)
+                """, (variant_id, user_id, serial))
+                events.emit("drop", u=user_id, card=card_id, variant=variant_id, holo=0, sig=0,
+                            limited=1, serial=serial)
                 
+                return variant_id, "✨ **LIMITED EDITION!** ✨", 0, colors["gold"]  # No variations for limited
+            
         # Regular card flow
-        cursor = await db.execute("SELECT id FROM cards WHERE is_limited = 0 ORDER BY RANDOM() LIMIT 1")
-        card_id = (await cursor.fetchone())[0]
+        # a banner with only limited cards draws its regular cards from every card
+        card_id = (pool and pool.random_card()) or banners.standard.random_card()
+        if card_id is None:
+            cursor = await db.execute("SELECT id FROM cards WHERE is_limited = 0 ORDER BY RANDOM() LIMIT 1")
+            card_id = (await cursor.fetchone())[0]
 
         # determine holo type and signature type
-        holo_type = 1 if random.random() < HOLO_DROP_RATE else 0
-        signature_type = 1 if random.random() < SIGNED_DROP_RATE else 0
-        if signature_type == 1 and random.random() < GOLDEN_SIGNED_CHANCE:
+        holo_type = 1 if random.random() < rates.holo else 0
+        signature_type = 1 if random.random() < rates.signed else 0
+        if signature_type == 1 and random.random() < rates.golden_signed:
             signature_type = 2
 
         # special messages
@@ -2112,27 +2135,33 @@ class Gacha(commands.Cog):
             special_message = random.choice(messages["holo"])
 
         # check if the variant already exists
-        cursor = await db.execute(
-            """
-            SELECT id FROM card_variants
-            WHERE card_id = ? AND holo_type = ? AND signature_type = ?
-            """,
-            (card_id, holo_type, signature_type)
-        )
-        result = await cursor.fetchone()
-
-        if result:
-            card_variant_id = result[0]
-        else:
+        card_variant_id = catalog.variant_id(card_id, holo_type, signature_type)
+        if card_variant_id is None:
             cursor = await db.execute(
                 """
-                INSERT INTO card_variants (card_id, holo_type, signature_type)
-                VALUES (?, ?, ?)
+                SELECT id FROM card_variants
+                WHERE card_id = ? AND holo_type = ? AND signature_type = ?
                 """,
                 (card_id, holo_type, signature_type)
             )
-            
-            card_variant_id = cursor.lastrowid
+            result = await cursor.fetchone()
+
+            if result:
+                card_variant_id = result[0]
+            else:
+                # image_url is NOT NULL, the card's own image stands in until the variant art exists
+                image_url = catalog.cards[card_id].image_url if card_id in catalog.cards else ""
+                cursor = await db.execute(
+                    """
+                    INSERT INTO card_variants (card_id, holo_type, signature_type, image_url)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (card_id, holo_type, signature_type, image_url)
+                )
+                
+                card_variant_id = cursor.lastrowid
+            # later pulls of this variant find it without asking SQLite again
+            catalog.add_variant(Variant(card_variant_id, card_id, holo_type, signature_type, None, None))
 
         # get how many copies the user already owns
         cursor = await db.execute(
@@ -2144,7 +2173,7 @@ class Gacha(commands.Cog):
 
 
         color = self.get_rarity_color(holo_type, signature_type)
-
+        events.emit("drop", u=user_id, card=card_id, variant=card_variant_id, holo=holo_type, sig=signature_type)
 
         return card_variant_id, special_message, quantity_owned, color
 
@@ -2213,81 +2242,11 @@ class Gacha(commands.Cog):
             await ctx.send(embed = embed)
             return
 
-        # Define rarity rankings for proper comparison
-        def get_rarity_value(holo_type_val, signature_type_val):
-            if holo_type_val == 1 and signature_type_val == 2:
-                return 1
-            elif signature_type_val == 2:
-                return 2
-            elif holo_type_val == 1 and signature_type_val == 1:
-                return 3
-            elif signature_type_val == 1:
-                return 4
-            elif holo_type_val == 1:
-                return 5
-            return 6
-
-
-        # group collection into embeds and determine rarest card
-        embeds = []
-        card_list = []
-        rarest_card = None
-
-        for item in collection:
-            card_name, artist_name, card_variant_id, image_url, holo_type, signature_type, quantity = item
-
-            # determine variations
-            variations = []
-            if holo_type == 1:
-                variations.append("Holo")
-            if signature_type == 1:
-                variations.append("Signed")
-            elif signature_type == 2:
-                variations.append("Golden Signed")
-
-            variation_text = " ".join(variations) if variations else "Standard"
-            card_summary = f"**{card_name}** ({variation_text}), x{quantity}"
-
-            # store card data
-            card_list.append({
-                "name": card_name,
-                "summary": card_summary,
-                "card_variant_id": card_variant_id,
-                "image_url": image_url,
-                "rarity_value": get_rarity_value(holo_type, signature_type)
-            })
-
-            # determine the rarest card
-            if rarest_card is None or get_rarity_value(holo_type, signature_type) < rarest_card["rarity_value"]:
-                rarest_card = {
-                    "image_url": image_url,
-                    "rarity_value": get_rarity_value(holo_type, signature_type)
-                }
-
-        # create embeds (10 cards per page)
-        for i in range(0, len(card_list), 10):
-            page_cards = card_list[i:i + 10]
-            embed = discord.Embed(
-                description="\n".join([card["summary"] for card in page_cards]),
-                color=colors["blue"]
-            )
-            embed.set_footer(text=f"Page {i // 10 + 1} of {len(card_list) // 10 + 1} | Sorting: Rarity")
-
-            # add the rarest card thumbnail
-            if rarest_card and i == 0:
-                embed.set_thumbnail(url=rarest_card["image_url"])
-
-            embed.set_author(
-                name=f"{member.display_name}'s Collection",
-                icon_url=member.display_avatar.url
-            )
-
-            embeds.append(embed)
-
         # pass the Gacha instance to the InventoryView
-        view = InventoryView(embeds, ctx.author, member, card_list, self.bot, self)
-        message = await ctx.send(embed=embeds[0], view=view)
+        view = InventoryView(ctx.author, member, Collection(collection), self.bot, self)
+        message = await ctx.send(embed=view.render_page(0), view=view)
         view.message = message
+        views.register(view, ctx.author.id, message)
 
 
 
@@ -2623,7 +2582,8 @@ class Gacha(commands.Cog):
         embed.set_footer(text="You'll keep 1 copy of each card. Process cannot be undone!")
         
         view = BulkRecycleView(self, ctx.author)
-        await ctx.send(embed=embed, view=view, ephemeral=True)
+        message = await ctx.send(embed=embed, view=view, ephemeral=True)
+        views.register(view, ctx.author.id, message)
 
 
 #--------------------- BANNER COMMANDS ----------------------#
@@ -2663,51 +2623,91 @@ class Gacha(commands.Cog):
     
     @commands.cooldown(1, 3, BucketType.user)
     @commands.hybrid_command(name="banner")
-    async def current_banner(self, ctx: commands.Context):
+    async def current_banner(self, ctx: commands.Context, *,
+                             banner: str = commands.parameter(description="Live banner to show, the featured one if left out", default=None)):
         if not await self.command_channel_check(ctx):
             return
-        
+
+        if banner:
+            pool = banners.find(banner)
+            if pool is None:
+                return await ctx.send(f"There is no live banner called **{banner}**!")
+            banner = (pool.banner.id, pool.banner.name)
+        else:
+            banner = await self.active_banner()
+        if not banner:
+            return await ctx.send("No active banner!")
+
+        template = await self.banner_template(*banner)
+        if template is None:
+            embed = discord.Embed(
+                description=f"This banner has no base cards yet!",
+                color=colors["blue"]
+            )
+            await ctx.send(embed = embed)
+            return
+
+        view = BannerView(template, self.bot)
+        message = await ctx.send(embed=template.embed.copy(), view=view)
+        views.register(view, ctx.author.id, message)
+
+    async def active_banner(self):
+        """(id, name) of the featured banner, as the banner schedule last decided."""
+        if banners.loaded:
+            featured = banners.featured
+            return (featured.banner.id, featured.banner.name) if featured else None
+
         async with Database.connection() as db:
-            # Get active banner
             cursor = await db.execute("""
                 SELECT id, name
                 FROM banners WHERE is_active = 1
             """)
             banner = await cursor.fetchone()
-            
-            if not banner:
-                return await ctx.send("No active banner!")
-                
-            # Get all base cards in banner
-            cursor = await db.execute("""
-                SELECT id, name, image_url, artist_name
-                FROM cards 
-                WHERE banner_id = ? AND is_limited = 0
-                ORDER BY name
-            """, (banner['id'],))
-            cards = await cursor.fetchall()
+        return (banner['id'], banner['name']) if banner else None
+
+    async def banner_template(self, banner_id, banner_name):
+        """The banner embed and dropdown options, built once per banner and catalog version."""
+        key = ("banner", banner_id, banner_name)
+        pool = banners.pool(banner_id)
+        if pool and catalog.loaded:
+            cards = sorted((catalog.cards[card_id] for card_id in pool.card_ids), key=lambda card: card.name)
+            return render_cache.get(key, lambda: self.build_banner_template(banner_id, banner_name, cards))
 
+        async def load():
+            async with Database.connection() as db:
+                cursor = await db.execute("""
+                    SELECT id, name, image_url, artist_name, banner_id, is_limited, max_copies
+                    FROM cards 
+                    WHERE banner_id = ? AND is_limited = 0
+                    ORDER BY name
+                """, (banner_id,))
+                cards = [Card(*row) for row in await cursor.fetchall()]
+            return self.build_banner_template(banner_id, banner_name, cards)
+
+        return await render_cache.get_async(key, load)
+
+    def build_banner_template(self, banner_id, banner_name, cards):
         if not cards:
-            embed = discord.Embed(
-                description=f"This banner has no base cards yet!",
-                color=colors["blue"]
-            )
-            await ctx.send(embed = embed)
-            return
-        
+            return None
+
         card_list = "\n".join(
-            f"• **{card['name']}** by *{card['artist_name']}*" 
+            f"• **{card.name}** by *{card.artist_name}*" 
             for card in cards
         )
 
-        original_embed = discord.Embed(
-            title=f"{banner['name']}",
+        embed = discord.Embed(
+            title=f"{banner_name}",
             description=f"**{len(cards)}** base cards, with 6 variants each.\n{card_list}",
             color=colors["blue"]
         )
-        
-        view = BannerView(cards, self.bot, original_embed)
-        await ctx.send(embed=original_embed, view=view)
+        options = tuple(
+            discord.SelectOption(
+                label=card.name,
+                value=str(card.id),
+                description=f"by {card.artist_name}"
+            ) for card in cards
+        )
+        return BannerTemplate(banner_id, embed, options)
 
 
 
@@ -2722,71 +2722,87 @@ class Gacha(commands.Cog):
         if amount <= 0:
             return await ctx.send("Amount must be positive!")
         
-        async with Database.connection() as db:
-            await db.execute(
-                """UPDATE users 
-                SET currency = currency + ?, 
-                    total_stardust_collected = total_stardust_collected + ? 
-                WHERE discord_id = ?""",
-                (amount, amount, member.id)
-            )
-            embed = discord.Embed(
-                description=f"You have added {amount} {emotes['stardust']} to {member.mention}'s balance\n"
-                          f"**Current balance:** {await self.get_currency(db, member.id)} {emotes['stardust']}\n",
-                color=colors["blue"]
-            )
-            await ctx.send(embed=embed)
+        balance = await writes.call("add_points", member.id, amount)
+        embed = discord.Embed(
+            description=f"You have added {amount} {emotes['stardust']} to {member.mention}'s balance\n"
+                      f"**Current balance:** {balance} {emotes['stardust']}\n",
+            color=colors["blue"]
+        )
+        await ctx.send(embed=embed)
 
     @commands.command(name="removepoints", hidden=True)
     @commands.has_permissions(administrator=True)
     async def remove_points(self, ctx, member: discord.Member, amount: int):
-        async with Database.connection() as db:
-            cursor = await db.execute(
-                "SELECT currency FROM users WHERE discord_id = ?", 
-                (member.id,)
-            )
-            balance = (await cursor.fetchone())['currency']
-            
-            if amount > balance:
-                return await ctx.send("Cannot remove more points than user has!")
-                
-            await db.execute(
-                "UPDATE users SET currency = currency - ? WHERE discord_id = ?",
-                (amount, member.id)
-            )
-            embed = discord.Embed(
-                description=f"You have removed {amount} {emotes['stardust']} from {member.mention}'s balance\n"
-                          f"• New balance: {await self.get_currency(db, member.id)} {emotes['stardust']}\n"
-                          f"• Total collected: {await self.get_total_collected(db, member.id)} {emotes['stardust']}",
-                color=colors["blue"]
-            )
-            await ctx.send(embed=embed)
+        outcome = await writes.call("remove_points", member.id, amount)
+        if outcome is None:
+            return await ctx.send("Cannot remove more points than user has!")
+
+        embed = discord.Embed(
+            description=f"You have removed {amount} {emotes['stardust']} from {member.mention}'s balance\n"
+                      f"• New balance: {outcome['currency']} {emotes['stardust']}\n"
+                      f"• Total collected: {outcome['total_collected']} {emotes['stardust']}",
+            color=colors["blue"]
+        )
+        await ctx.send(embed=embed)
 
     @commands.command(name="setpoints", hidden=True)
     @commands.has_permissions(administrator=True)
     async def set_points(self, ctx, member: discord.Member, amount: int):
-        async with Database.connection() as db:
-            current_total = await self.get_total_collected(db, member.id)
-            current_balance = await self.get_currency(db, member.id)
-            
-            # Calculate difference to update total collected
-            difference = amount - current_balance
-            new_total = max(current_total + difference, current_total)
-            
-            await db.execute(
-                """UPDATE users 
-                SET currency = ?,
-                    total_stardust_collected = ?
-                WHERE discord_id = ?""",
-                (amount, new_total, member.id)
-            )
-            embed = discord.Embed(
-                description=f"Set {member.mention}'s balance to {amount} {emotes['stardust']}\n"
-                          f"• New balance: {amount} {emotes['stardust']}\n"
-                          f"• Total collected: {new_total} {emotes['stardust']}",
-                color=colors["blue"]
-            )
-            await ctx.send(embed=embed)
+        new_total = await writes.call("set_points", member.id, amount)
+        embed = discord.Embed(
+            description=f"Set {member.mention}'s balance to {amount} {emotes['stardust']}\n"
+                      f"• New balance: {amount} {emotes['stardust']}\n"
+                      f"• Total collected: {new_total} {emotes['stardust']}",
+            color=colors["blue"]
+        )
+        await ctx.send(embed=embed)
+
+    async def apply_add_points(self, db, user_id: int, amount: int):
+        """Admin grant, returns the new balance. Runs through `writes`."""
+        await db.execute(
+            """UPDATE users 
+            SET currency = currency + ?, 
+                total_stardust_collected = total_stardust_collected + ? 
+            WHERE discord_id = ?""",
+            (amount, amount, user_id)
+        )
+        events.emit("grant", u=user_id, amount=amount, source="admin")
+        return await self.get_currency(db, user_id)
+
+    async def apply_remove_points(self, db, user_id: int, amount: int):
+        """Admin deduction, returns None if the user has less than `amount`. Runs through `writes`."""
+        balance = await self.get_currency(db, user_id)
+        if amount > balance:
+            return None
+
+        await db.execute(
+            "UPDATE users SET currency = currency - ? WHERE discord_id = ?",
+            (amount, user_id)
+        )
+        events.emit("spend", u=user_id, amount=amount, source="admin")
+        return {
+            "currency": await self.get_currency(db, user_id),
+            "total_collected": await self.get_total_collected(db, user_id),
+        }
+
+    async def apply_set_points(self, db, user_id: int, amount: int):
+        """Admin override of the balance, returns the new total collected. Runs through `writes`."""
+        current_total = await self.get_total_collected(db, user_id)
+        current_balance = await self.get_currency(db, user_id)
+        
+        # Calculate difference to update total collected
+        difference = amount - current_balance
+        new_total = max(current_total + difference, current_total)
+        
+        await db.execute(
+            """UPDATE users 
+            SET currency = ?,
+                total_stardust_collected = ?
+            WHERE discord_id = ?""",
+            (amount, new_total, user_id)
+        )
+        events.emit("adjust", u=user_id, amount=difference, source="admin")
+        return new_total
 
     async def get_currency(self, db, user_id: int) -> int:
         cursor = await db.execute(
@@ -1,28 +1,96 @@
 
 #---------------------OWNER COMMANDS---------------------#
+import asyncio
 import json
-import aiosqlite
 import os
 
 from datetime import datetime
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ext.commands import Context
 
 from typing import Optional
 
 from helpers import checks, database
+from helpers.backup import KEEP, backup, list_backups
+from helpers.banners import banners
+from helpers.catalog import catalog
 from helpers.colors import colors
+from helpers.connection import connect
+from helpers.coordinator import writes
 from helpers.emotes import emotes
+from helpers.lazy import import_profile, import_times
+from helpers.maintenance import CHECK_INTERVAL, QUIET_HOURS, enable_incremental_vacuum, maintenance, wal_size
+from helpers.metrics import FAMILIES, metrics
+from helpers.slowlog import slow_queries
+from helpers.views import views
 
 DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'database.db')
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# What a cold start has to import, profiled by the importtime command
+PROFILED_MODULES = ("discord", "aiosqlite", "aiohttp", "cogs.gacha", "cogs.owner")
+
+# Hours between scheduled backups unless config.json sets "backup_hours" (0 turns them off)
+DEFAULT_BACKUP_HOURS = 6
 
 
 class Owner(commands.Cog, name="owner"):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        # scheduled backups and maintenance run in one process only, the one holding shard 0
+        shard_ids = getattr(self.bot, "shard_ids", None)
+        if shard_ids is not None and 0 not in shard_ids:
+            return
+        hours = self.bot.config.get("backup_hours", DEFAULT_BACKUP_HOURS)
+        if hours:
+            self.scheduled_backup.change_interval(hours=hours)
+            self.scheduled_backup.start()
+        self.database_maintenance.start()
+
+    async def cog_unload(self):
+        self.scheduled_backup.cancel()
+        self.database_maintenance.cancel()
+
+    @tasks.loop(hours=DEFAULT_BACKUP_HOURS)
+    async def scheduled_backup(self):
+        try:
+            result = await backup(DATABASE_PATH, keep=self.bot.config.get("backup_keep", KEEP))
+            self.bot.logger.info(
+                f"Backed up the database to {os.path.basename(result.path)} "
+                f"({result.compressed_size / 1e6:.1f} MB, {result.seconds:.1f}s)"
+            )
+        except Exception as e:
+            self.bot.logger.error(f"Scheduled backup failed: {type(e).__name__}: {e}")
+
+    @scheduled_backup.before_loop
+    async def before_scheduled_backup(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(seconds=CHECK_INTERVAL)
+    async def database_maintenance(self):
+        try:
+            result, quiet, interval = await maintenance.tick()
+        except Exception as e:
+            self.bot.logger.error(f"Database maintenance failed: {type(e).__name__}: {e}")
+            return
+        # checks come quicker while the WAL is long
+        if interval != self.database_maintenance.seconds:
+            self.database_maintenance.change_interval(seconds=interval)
+        if result and result.mode == "TRUNCATE":
+            self.bot.logger.info(
+                f"WAL checkpoint (TRUNCATE): {result.wal_before / 1e6:.1f} MB -> {result.wal_after / 1e6:.1f} MB "
+                f"in {result.seconds * 1000:.0f}ms{' (busy)' if result.busy else ''}"
+            )
+        if quiet:
+            self.bot.logger.info(
+                f"Quiet hours maintenance: optimized, freed {quiet['freed_pages']} pages "
+                f"({quiet['free_pages']} free), WAL truncated in {quiet['checkpoint'].seconds * 1000:.0f}ms"
+            )
+
 
 
 #---------------------SYNC HYBRID COMMANDS-------------------#
@@ -371,6 +439,272 @@ class Owner(commands.Cog, name="owner"):
 
 
 
+#--------------------------LATENCY METRICS--------------------------------#
+    @commands.hybrid_command(
+        name="metrics",
+        description="Shows the slowest commands, callbacks or queries by total time.",
+    )
+    @app_commands.describe(
+        family="command, interaction, query or checkpoint",
+        limit="How many entries to show",
+    )
+    @checks.is_owner()
+    async def show_metrics(self, context: Context, family: str = "command", limit: int = 10) -> None:
+        family = family.lower()
+        if family == "reset":
+            metrics.reset()
+            embed = discord.Embed(description="Latency metrics have been reset.", color=colors["blue"])
+            await context.send(embed=embed)
+            return
+        if family not in FAMILIES:
+            embed = discord.Embed(
+                description=f"The family must be one of `{'`, `'.join(FAMILIES)}` or `reset`.", color=colors["red"]
+            )
+            await context.send(embed=embed)
+            return
+
+        entries = metrics.top(family, max(1, min(limit, 20)))
+        if not entries:
+            embed = discord.Embed(description=f"No `{family}` timings recorded yet.", color=colors["red"])
+            await context.send(embed=embed)
+            return
+
+        embed = discord.Embed(title=f"Slowest {family} timings", color=colors["blue"])
+        for label, histogram in entries:
+            embed.add_field(
+                name=label if len(label) <= 250 else label[:247] + "...",
+                value=(
+                    f"total **{histogram.total:.2f}s** | calls {histogram.count} | "
+                    f"avg {histogram.total / histogram.count * 1000:.1f}ms | "
+                    f"p50 {histogram.quantile(0.5) * 1000:.1f}ms | p95 {histogram.quantile(0.95) * 1000:.1f}ms"
+                ),
+                inline=False,
+            )
+        messages = metrics.counters["messages"]
+        seen = sum(messages.values())
+        if seen:
+            dropped = messages.get("filtered", 0) + messages.get("bot", 0)
+            embed.set_footer(
+                text=f"Messages: {messages.get('processed', 0)} processed, {messages.get('filtered', 0)} filtered, "
+                     f"{messages.get('bot', 0)} from bots ({dropped / seen:.0%} dropped early)"
+            )
+        await context.send(embed=embed)
+
+
+
+#--------------------------OPEN VIEWS--------------------------------#
+    @commands.hybrid_command(
+        name="views",
+        description="Shows the open interactive views and roughly how much memory they hold.",
+    )
+    @checks.is_owner()
+    async def open_views(self, context: Context) -> None:
+        rows = views.summary()
+        if not rows:
+            embed = discord.Embed(description="No interactive views have been opened yet.", color=colors["blue"])
+            await context.send(embed=embed)
+            return
+
+        lines = [
+            f"`{kind}` {count} open, ~{size / 1024:.1f} KB, {evicted} evicted"
+            for kind, count, size, evicted in rows
+        ]
+        embed = discord.Embed(title="Open views", description="\n".join(lines), color=colors["blue"])
+        embed.set_footer(
+            text=f"Caps: {views.max_per_user} per user and type, {views.max_per_type} per type. "
+                 f"Total ~{sum(row[2] for row in rows) / 1024:.1f} KB"
+        )
+        await context.send(embed=embed)
+
+
+
+#--------------------------SLOW QUERIES--------------------------------#
+    @commands.hybrid_command(
+        name="slowqueries",
+        description="Lists the statements that spent the most time over the slow query threshold.",
+    )
+    @app_commands.describe(limit="How many statements to show, or 0 to reset the log")
+    @checks.is_owner()
+    async def slowqueries(self, context: Context, limit: int = 5) -> None:
+        if limit == 0:
+            slow_queries.reset()
+            embed = discord.Embed(description="The slow query log has been reset.", color=colors["blue"])
+            await context.send(embed=embed)
+            return
+
+        entries = slow_queries.top(max(1, min(limit, 10)))
+        if not entries:
+            embed = discord.Embed(
+                description=f"No statements over {slow_queries.threshold * 1000:.0f}ms yet. {emotes['comfy']}",
+                color=colors["blue"],
+            )
+            await context.send(embed=embed)
+            return
+
+        embed = discord.Embed(
+            title=f"Slow queries (over {slow_queries.threshold * 1000:.0f}ms)",
+            color=colors["blue"],
+        )
+        for entry in entries:
+            sql = entry.sql if len(entry.sql) <= 300 else entry.sql[:297] + "..."
+            plan = (entry.plan or "(plan pending)")[:400]
+            embed.add_field(
+                name=f"{entry.total:.2f}s total | {entry.count} calls | max {entry.max * 1000:.0f}ms",
+                value=f"```sql\n{sql}```{entry.shape}\n```\n{plan}```",
+                inline=False,
+            )
+        await context.send(embed=embed)
+
+
+
+#--------------------------DATABASE BACKUP--------------------------------#
+    @commands.hybrid_command(
+        name="backup",
+        description="Takes a database backup now, or lists the existing ones.",
+    )
+    @app_commands.describe(action="`now` to take a backup, `list` to show the latest ones")
+    @checks.is_owner()
+    async def backup_database(self, context: Context, action: str = "now") -> None:
+        if action == "list":
+            backups = list_backups()[:10]
+            description = "\n".join(
+                f"`{os.path.basename(path)}` {os.path.getsize(path) / 1e6:.1f} MB" for path in backups
+            ) or "No backups yet."
+            embed = discord.Embed(title="Database backups", description=description, color=colors["blue"])
+            await context.send(embed=embed)
+            return
+        if action != "now":
+            embed = discord.Embed(description="The action must be `now` or `list`.", color=colors["red"])
+            await context.send(embed=embed)
+            return
+
+        async with context.typing():
+            try:
+                result = await backup(DATABASE_PATH, keep=self.bot.config.get("backup_keep", KEEP))
+            except Exception as e:
+                embed = discord.Embed(description=f"Backup failed: {type(e).__name__}: {e}", color=colors["red"])
+                await context.send(embed=embed)
+                return
+
+        embed = discord.Embed(
+            description=(
+                f"Backed up to `{os.path.basename(result.path)}` {emotes['comfy']}\n"
+                f"{result.size / 1e6:.1f} MB -> {result.compressed_size / 1e6:.1f} MB in {result.seconds:.1f}s, "
+                f"integrity check ok."
+            ),
+            color=colors["blue"],
+        )
+        await context.send(embed=embed)
+
+
+
+#--------------------------DATABASE MAINTENANCE--------------------------------#
+    @commands.hybrid_command(
+        name="maintenance",
+        description="Shows the WAL size and the last checkpoints, or runs a checkpoint or vacuum now.",
+    )
+    @app_commands.describe(action="`status`, `checkpoint` (TRUNCATE now) or `vacuum` (enable incremental vacuum)")
+    @checks.is_owner()
+    async def database_maintenance_command(self, context: Context, action: str = "status") -> None:
+        action = action.lower()
+        if action not in ("status", "checkpoint", "vacuum"):
+            embed = discord.Embed(description="The action must be `status`, `checkpoint` or `vacuum`.", color=colors["red"])
+            await context.send(embed=embed)
+            return
+
+        async with context.typing():
+            try:
+                if action == "checkpoint":
+                    await maintenance.run_checkpoint("TRUNCATE")
+                elif action == "vacuum":
+                    # a full VACUUM rewrites the file, writers wait until it is done
+                    seconds = await asyncio.to_thread(enable_incremental_vacuum, DATABASE_PATH)
+                    self.bot.logger.info(f"Database vacuumed with auto_vacuum=INCREMENTAL in {seconds:.1f}s")
+            except Exception as e:
+                embed = discord.Embed(description=f"{action.title()} failed: {type(e).__name__}: {e}", color=colors["red"])
+                await context.send(embed=embed)
+                return
+
+        embed = discord.Embed(title="Database maintenance", color=colors["blue"])
+        embed.add_field(name="Database", value=f"{os.path.getsize(DATABASE_PATH) / 1e6:.1f} MB", inline=True)
+        embed.add_field(name="WAL", value=f"{wal_size(DATABASE_PATH) / 1e6:.1f} MB", inline=True)
+        last = maintenance.last_checkpoint
+        if last:
+            embed.add_field(
+                name="Last checkpoint",
+                value=(
+                    f"{last.mode}, {last.checkpointed}/{last.frames} frames in {last.seconds * 1000:.0f}ms"
+                    f"{', busy' if last.busy else ''}"
+                ),
+                inline=False,
+            )
+        timings = metrics.families["checkpoint"]
+        if timings:
+            embed.add_field(
+                name="Checkpoints",
+                value="\n".join(
+                    f"`{mode}` {h.count}x, p50 {h.quantile(0.5) * 1000:.1f}ms, p99 {h.quantile(0.99) * 1000:.1f}ms"
+                    for mode, h in timings.items()
+                ),
+                inline=False,
+            )
+        quiet = maintenance.last_quiet
+        embed.set_footer(
+            text=(
+                f"Quiet hours {QUIET_HOURS.start:02d}:00-{QUIET_HOURS.stop:02d}:00 GMT+8, last run "
+                + (f"{quiet[0]:%Y-%m-%d %H:%M}, freed {quiet[1]['freed_pages']} pages" if quiet else "not yet")
+            )
+        )
+        await context.send(embed=embed)
+
+
+
+#--------------------------STARTUP PROFILE--------------------------------#
+    @commands.hybrid_command(
+        name="importtime",
+        description="Shows where boot time went and the slowest imports of the bot's dependencies.",
+    )
+    @app_commands.describe(limit="How many imports to show")
+    @checks.is_owner()
+    async def importtime(self, context: Context, limit: int = 15) -> None:
+        async with context.typing():
+            try:
+                # a fresh interpreter, this process has everything imported already
+                rows = await import_profile(PROFILED_MODULES, cwd=ROOT_PATH)
+            except Exception as e:
+                rows = []
+                self.bot.logger.error(f"Import profile failed: {type(e).__name__}: {e}")
+
+        embed = discord.Embed(title="Startup profile", color=colors["blue"])
+        boot = getattr(self.bot, "boot_timings", {})
+        if boot:
+            embed.add_field(
+                name=f"Boot {boot.get('total', 0) * 1000:.0f}ms",
+                value="\n".join(f"{name}: {seconds * 1000:.0f}ms" for name, seconds in boot.items() if name != "total"),
+                inline=False,
+            )
+        cogs = getattr(self.bot, "cog_load_times", {})
+        if cogs:
+            embed.add_field(
+                name="Cogs",
+                value="\n".join(f"{name}: {seconds * 1000:.0f}ms" for name, seconds in cogs.items()),
+                inline=True,
+            )
+        if import_times:
+            lines = [f"{name}: {seconds * 1000:.0f}ms on first use" for name, seconds in import_times.items()]
+            embed.add_field(name="Deferred", value="\n".join(lines)[:1024], inline=True)
+
+        if rows:
+            lines = [f"{cumulative / 1000:>8.1f} {own / 1000:>7.1f}  {'  ' * depth}{module}"
+                     for cumulative, own, depth, module in rows[:max(1, min(limit, 30))]]
+            table = "\n".join([f"{'cum ms':>8} {'self ms':>7}  module"] + lines)
+            embed.add_field(name="Slowest imports (-X importtime)", value=f"```\n{table[:1000]}```", inline=False)
+        else:
+            embed.add_field(name="Slowest imports (-X importtime)", value="The import profile could not be run.", inline=False)
+        await context.send(embed=embed)
+
+
+
     #-------------------IMPORT CARDS-----------------#
 
     @commands.hybrid_command(
@@ -379,7 +713,7 @@ class Owner(commands.Cog, name="owner"):
     )
     @commands.has_permissions(manage_guild=True)  # Limit command to admins
     async def importcards(self, ctx: commands.Context, channel: discord.TextChannel):
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with connect(DATABASE_PATH, "bulk") as db:
             imported_count = 0
 
             # Fetch the messages from the specified channel
@@ -409,6 +743,10 @@ class Owner(commands.Cog, name="owner"):
 
             await db.commit()
 
+        # new cards join the pull pool right away
+        await catalog.load(DATABASE_PATH)
+        await banners.load()
+        await writes.publish("catalog")
         await ctx.send(f"Imported {imported_count} cards from {channel.mention}.")
 
 
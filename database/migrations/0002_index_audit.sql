@@ -0,0 +1,29 @@
+-- Index audit: drop indexes that duplicate the primary key or another index,
+-- or that nothing reads, since every one of them is rewritten on inventory and user writes
+DROP INDEX IF EXISTS idx_user_inventory_unique;  -- same as the user_inventory primary key
+DROP INDEX IF EXISTS idx_inventory_user;         -- prefix of the user_inventory primary key
+DROP INDEX IF EXISTS idx_inventory_sorting;      -- replaced by idx_inventory_covering
+DROP INDEX IF EXISTS idx_variants_rarity;        -- same as idx_variants_holo_sig
+DROP INDEX IF EXISTS idx_variants_holo_sig;      -- prefix of idx_variant_rarity
+DROP INDEX IF EXISTS idx_users_last_daily;       -- never filtered or sorted on
+
+-- Leaderboard pages and rank counts. Kept narrow on purpose: rank is a COUNT over
+-- the index range, and adding discord_id to cover the page made that scan slower
+CREATE INDEX IF NOT EXISTS idx_users_pulls ON users(total_pulls);
+CREATE INDEX IF NOT EXISTS idx_users_stardust ON users(total_stardust_collected);
+CREATE INDEX IF NOT EXISTS idx_users_streak ON users(longest_daily_streak);
+
+-- Pull path: variant lookup, owned quantity and set completion
+CREATE INDEX IF NOT EXISTS idx_variants_card_type ON card_variants(card_id, holo_type, signature_type);
+CREATE INDEX IF NOT EXISTS idx_variant_rarity ON card_variants(holo_type, signature_type, card_id, image_url);
+CREATE INDEX IF NOT EXISTS idx_inventory_covering ON user_inventory(user_id, card_variant_id, quantity);
+
+-- Card pool and banner listing (is_limited = ? AND banner_id = ? ORDER BY name)
+CREATE INDEX IF NOT EXISTS idx_cards_limited_banner ON cards(is_limited, banner_id, name);
+CREATE INDEX IF NOT EXISTS idx_cards_name ON cards(name);
+
+-- Limited serial lookups per owner (card_variant_id alone is served by the UNIQUE constraint)
+CREATE INDEX IF NOT EXISTS idx_limited_variant_user ON limited_card_instances(card_variant_id, user_id);
+
+CREATE INDEX IF NOT EXISTS idx_blacklist_user ON blacklist(user_id);
+CREATE INDEX IF NOT EXISTS idx_banners_active ON banners(is_active);
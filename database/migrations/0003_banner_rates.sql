@@ -0,0 +1,6 @@
+-- Per-banner drop rates. NULL keeps the default from cogs/gacha.py for that rate
+ALTER TABLE banners ADD COLUMN holo_rate REAL DEFAULT NULL;
+ALTER TABLE banners ADD COLUMN signed_rate REAL DEFAULT NULL;
+ALTER TABLE banners ADD COLUMN golden_signed_rate REAL DEFAULT NULL;
+ALTER TABLE banners ADD COLUMN limited_rate REAL DEFAULT NULL;
+
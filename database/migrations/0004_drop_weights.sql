@@ -0,0 +1,11 @@
+-- Drop weights for weighted pulls. A card's weight applies in the standard pool and
+-- in its banner; banner_card_weights overrides it inside one banner for rate-ups.
+-- A weight of 0 keeps a card out of the pool it applies to
+ALTER TABLE cards ADD COLUMN drop_weight REAL NOT NULL DEFAULT 1.0 CHECK (drop_weight >= 0);
+
+CREATE TABLE IF NOT EXISTS banner_card_weights (
+    banner_id INTEGER NOT NULL,
+    card_id INTEGER NOT NULL,
+    weight REAL NOT NULL CHECK (weight >= 0),
+    PRIMARY KEY (banner_id, card_id)
+) WITHOUT ROWID;
@@ -0,0 +1,19 @@
+-- Serial counters for limited cards. A pull takes the next serial with one
+-- UPDATE ... RETURNING, which also enforces max_copies, so no two pulls can hand
+-- out the same serial and stock needs no COUNT over limited_card_instances
+CREATE TABLE IF NOT EXISTS limited_serials (
+    card_variant_id INTEGER PRIMARY KEY REFERENCES card_variants(id),
+    issued INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO limited_serials (card_variant_id, issued)
+SELECT cv.id, COALESCE(MAX(lci.serial_number), 0)
+FROM card_variants cv
+LEFT JOIN limited_card_instances lci ON lci.card_variant_id = cv.id
+WHERE cv.generation = 999
+GROUP BY cv.id;
+
+-- Limited variants used to be created with an empty image and filled in afterwards
+UPDATE card_variants
+SET image_url = (SELECT image_url FROM cards WHERE cards.id = card_variants.card_id)
+WHERE generation = 999 AND image_url = '';
@@ -0,0 +1,82 @@
+#------------------------DATABASE BACKUP TOOL--------------------------#
+# Take, list, verify and restore backups of the gacha database (see helpers/backup.py).
+#
+#   python db_backup.py create
+#   python db_backup.py list
+#   python db_backup.py verify backups/kiichu-20250301-040000.db.gz
+#   python db_backup.py restore backups/kiichu-20250301-040000.db.gz     (stop the bot first)
+
+import argparse
+import os
+import sys
+import tempfile
+
+from helpers.backup import BACKUP_PATH, DATABASE_PATH, KEEP, BackupError
+from helpers.backup import check_integrity, create_backup, extract, list_backups, restore
+
+
+def create(args):
+    result = create_backup(args.db, args.dir, args.keep)
+    print(
+        f"Wrote {result.path}: {result.size / 1e6:.1f} MB -> {result.compressed_size / 1e6:.1f} MB "
+        f"in {result.seconds:.1f}s ({result.restarts} restarts)"
+    )
+
+
+def show(args):
+    backups = list_backups(args.dir)
+    if not backups:
+        print(f"No backups in {args.dir}")
+    for path in backups:
+        print(f"{os.path.basename(path)}  {os.path.getsize(path) / 1e6:>8.1f} MB")
+
+
+def verify(args):
+    with tempfile.TemporaryDirectory() as workdir:
+        copy = os.path.join(workdir, "verify.db")
+        extract(args.backup, copy)
+        check_integrity(copy)
+    print(f"{args.backup}: ok")
+
+
+def restore_backup(args):
+    if not args.yes:
+        answer = input(f"Replace {args.db} with {args.backup}? The bot must be stopped. [y/N] ")
+        if answer.strip().lower() != "y":
+            sys.exit("Aborted")
+    kept = restore(args.backup, args.db)
+    print(f"Restored {args.db} from {args.backup}")
+    if kept:
+        print(f"The previous database was kept as {kept}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back up and restore the gacha database.")
+    parser.add_argument("--db", default=DATABASE_PATH, help="database file (default: database/database.db)")
+    parser.add_argument("--dir", default=BACKUP_PATH, help="backup directory (default: backups/)")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    create_parser = subparsers.add_parser("create", help="take a backup now")
+    create_parser.add_argument("--keep", type=int, default=KEEP, help="backups to keep after rotation")
+    create_parser.set_defaults(run=create)
+
+    subparsers.add_parser("list", help="list backups, newest first").set_defaults(run=show)
+
+    verify_parser = subparsers.add_parser("verify", help="run an integrity check on a backup")
+    verify_parser.add_argument("backup")
+    verify_parser.set_defaults(run=verify)
+
+    restore_parser = subparsers.add_parser("restore", help="replace the database with a backup")
+    restore_parser.add_argument("backup")
+    restore_parser.add_argument("--yes", action="store_true", help="do not ask for confirmation")
+    restore_parser.set_defaults(run=restore_backup)
+
+    args = parser.parse_args()
+    try:
+        args.run(args)
+    except BackupError as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#----------------------DATABASE BENCHMARKS----------------------#
+# Times the gacha's hot queries and writes against a generated (or given) database.
+#
+#   python db_bench.py indexes --users 200000 --cards 2000
+#   python db_bench.py indexes --db bench.db
+#   python db_bench.py profiles --users 200000 --cards 2000
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from db_generate import BASE_DISCORD_ID, generate
+from helpers.connection import PROFILES
+from helpers.migrations import apply_migrations
+
+# Indexes as shipped before the index audit, used as the "before" side
+BASELINE_INDEXES = (
+    "CREATE INDEX idx_users_pulls ON users(total_pulls)",
+    "CREATE INDEX idx_users_stardust ON users(total_stardust_collected)",
+    "CREATE INDEX idx_users_streak ON users(longest_daily_streak)",
+    "CREATE INDEX idx_users_last_daily ON users(last_daily)",
+    "CREATE INDEX idx_variant_rarity ON card_variants(holo_type, signature_type, card_id, image_url)",
+    "CREATE UNIQUE INDEX idx_user_inventory_unique ON user_inventory (user_id, card_variant_id)",
+    "CREATE INDEX idx_inventory_user ON user_inventory(user_id)",
+    "CREATE INDEX idx_cards_name ON cards(name)",
+    "CREATE INDEX idx_variants_holo_sig ON card_variants(holo_type, signature_type)",
+    "CREATE INDEX idx_inventory_sorting ON user_inventory(user_id, quantity)",
+    "CREATE INDEX idx_variants_rarity ON card_variants(holo_type, signature_type)",
+    "CREATE INDEX idx_banners_active ON banners(is_active)",
+)
+
+COLLECTION_SQL = """
+    SELECT cards.name, cards.artist_name, card_variants.id, card_variants.image_url,
+        card_variants.holo_type, card_variants.signature_type, user_inventory.quantity
+    FROM user_inventory
+    INNER JOIN card_variants ON user_inventory.card_variant_id = card_variants.id
+    INNER JOIN cards ON card_variants.card_id = cards.id
+    WHERE user_inventory.user_id = ?
+    ORDER BY CASE
+        WHEN card_variants.holo_type = 1 AND card_variants.signature_type = 2 THEN 1
+        WHEN card_variants.signature_type = 2 THEN 2
+        WHEN card_variants.holo_type = 1 AND card_variants.signature_type = 1 THEN 3
+        WHEN card_variants.signature_type = 1 THEN 4
+        WHEN card_variants.holo_type = 1 THEN 5
+        ELSE 6
+    END, cards.name
+"""
+
+
+
+#----------------------WORKLOADS----------------------#
+
+def index_workloads(users, cards):
+    """(name, sql, parameter factory) for every hot statement the index audit targets."""
+    user = lambda: BASE_DISCORD_ID + random.randrange(users)
+    card = lambda: random.randint(1, cards)
+    variant = lambda: random.randint(1, cards * 6)
+    return [
+        ("variant lookup", "SELECT id FROM card_variants WHERE card_id = ? AND holo_type = ? AND signature_type = ?",
+            lambda: (card(), random.randint(0, 1), random.randint(0, 2))),
+        ("owned quantity", "SELECT quantity FROM user_inventory WHERE user_id = ? AND card_variant_id = ?",
+            lambda: (user(), variant())),
+        ("collection", COLLECTION_SQL, lambda: (user(),)),
+        ("set completion", """SELECT COUNT(DISTINCT cv.id), COUNT(DISTINCT ui.card_variant_id)
+            FROM card_variants cv
+            LEFT JOIN user_inventory ui ON cv.id = ui.card_variant_id AND ui.user_id = ?
+            WHERE cv.card_id = ?""", lambda: (user(), card())),
+        ("leaderboard page", """SELECT u.discord_id, total_stardust_collected FROM users u
+            WHERE total_stardust_collected > 0 ORDER BY total_stardust_collected DESC LIMIT 10 OFFSET ?""",
+            lambda: (random.randrange(0, 100, 10),)),
+        ("leaderboard rank", """WITH user_stats AS (SELECT total_pulls AS score FROM users WHERE discord_id = ?)
+            SELECT (SELECT COUNT(*) FROM users WHERE total_pulls > user_stats.score) + 1 FROM user_stats""",
+            lambda: (str(user()),)),
+        ("banner cards", "SELECT id, name, image_url, artist_name FROM cards WHERE banner_id = ? AND is_limited = 0 ORDER BY name",
+            lambda: (1,)),
+        ("limited stock", "SELECT COUNT(*) FROM limited_card_instances WHERE card_variant_id = ?",
+            lambda: (variant(),)),
+        ("blacklist check", "SELECT * FROM blacklist WHERE user_id = ?", lambda: (user(),)),
+        ("pull upsert", """INSERT INTO user_inventory (user_id, card_variant_id, quantity) VALUES (?, ?, 1)
+            ON CONFLICT(user_id, card_variant_id) DO UPDATE SET quantity = quantity + 1""",
+            lambda: (user(), variant())),
+        ("message points", """UPDATE users SET currency = currency + 15, daily_message_count = daily_message_count + 1,
+            total_stardust_collected = total_stardust_collected + 15 WHERE discord_id = ?""",
+            lambda: (str(user()),)),
+    ]
+
+
+def run_workloads(db_path, workloads, iterations, seed, repeats=3):
+    """Run each workload `iterations` times and return the best mean milliseconds per statement."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    results = {}
+    for name, sql, params in workloads:
+        random.seed(seed)
+        batch = [params() for _ in range(iterations)]
+        best = float("inf")
+        # the first repeat also warms the page cache, writes are rolled back each time
+        for _ in range(repeats):
+            conn.execute("BEGIN")
+            start = time.perf_counter()
+            for parameters in batch:
+                conn.execute(sql, parameters).fetchall()
+            best = min(best, time.perf_counter() - start)
+            conn.execute("ROLLBACK")
+        results[name] = best / iterations * 1000
+    conn.close()
+    return results
+
+
+def print_comparison(before, after, labels=("before", "after")):
+    print(f"\n{'statement':<20}{labels[0] + ' ms':>14}{labels[1] + ' ms':>14}{'speedup':>10}")
+    print("-" * 58)
+    for name in before:
+        ratio = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<20}{before[name]:>14.4f}{after[name]:>14.4f}{ratio:>9.2f}x")
+
+
+
+#----------------------INDEX AUDIT----------------------#
+
+def bench_indexes(args):
+    workdir = tempfile.mkdtemp(prefix="kiichu-bench-")
+    after_path = os.path.join(workdir, "after.db")
+    before_path = os.path.join(workdir, "before.db")
+
+    if args.db:
+        shutil.copyfile(args.db, after_path)
+        conn = sqlite3.connect(after_path, isolation_level=None)
+        apply_migrations(conn)
+        conn.close()
+    else:
+        print(f"Generating {args.users:,} users / {args.cards:,} cards...")
+        generate(after_path, args.users, args.cards, args.seed, log=lambda *a: None)
+
+    with sqlite3.connect(after_path) as conn:
+        conn.execute("PRAGMA journal_mode=DELETE")
+        users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        cards = conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+        current = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+        )]
+
+    # rebuild the "before" copy with the pre-audit index set
+    shutil.copyfile(after_path, before_path)
+    with sqlite3.connect(before_path) as conn:
+        for name in current:
+            conn.execute(f"DROP INDEX {name}")
+        for statement in BASELINE_INDEXES:
+            conn.execute(statement)
+        conn.execute("ANALYZE")
+
+    workloads = index_workloads(users, cards)
+    before = run_workloads(before_path, workloads, args.iterations, args.seed)
+    after = run_workloads(after_path, workloads, args.iterations, args.seed)
+    print_comparison(before, after)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+
+#----------------------CONNECTION PROFILES----------------------#
+
+# What the call sites set before they shared a connection factory (Database.get_connection)
+BASELINE_PROFILE = {"journal_mode": "WAL", "busy_timeout": 5000}
+
+# Rows per transaction in the bulk load
+BULK_BATCH = 1000
+
+
+def open_profile(db_path, settings):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    for name, value in settings.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+def run_profile_reads(conn, workloads, iterations, seed, repeats=3):
+    """Best mean milliseconds per read statement, each batch inside one read transaction."""
+    results = {}
+    for name, sql, params in workloads:
+        random.seed(seed)
+        batch = [params() for _ in range(iterations)]
+        best = float("inf")
+        for _ in range(repeats):
+            conn.execute("BEGIN")
+            start = time.perf_counter()
+            for parameters in batch:
+                conn.execute(sql, parameters).fetchall()
+            best = min(best, time.perf_counter() - start)
+            conn.execute("ROLLBACK")
+        results[name] = best / iterations * 1000
+    return results
+
+
+def run_profile_commits(conn, workloads, iterations, seed):
+    """Mean milliseconds per write committed on its own, the way the bot serves a command."""
+    results = {}
+    for name, sql, params in workloads:
+        random.seed(seed)
+        batch = [params() for _ in range(iterations)]
+        start = time.perf_counter()
+        for parameters in batch:
+            conn.execute(sql, parameters)
+        results[f"{name} (commit)"] = (time.perf_counter() - start) / iterations * 1000
+    return results
+
+
+def run_profile_bulk(conn, users, cards, rows, seed):
+    """Milliseconds per 1000 rows for an inventory load, plus a full reindex of the inventory."""
+    random.seed(seed)
+    batch = [(BASE_DISCORD_ID + random.randrange(users), random.randint(1, cards * 6)) for _ in range(rows)]
+    start = time.perf_counter()
+    for offset in range(0, rows, BULK_BATCH):
+        conn.execute("BEGIN")
+        conn.executemany(
+            """INSERT INTO user_inventory (user_id, card_variant_id, quantity) VALUES (?, ?, 1)
+            ON CONFLICT(user_id, card_variant_id) DO UPDATE SET quantity = quantity + 1""",
+            batch[offset:offset + BULK_BATCH],
+        )
+        conn.execute("COMMIT")
+    load = (time.perf_counter() - start) / rows * 1000 * 1000
+
+    start = time.perf_counter()
+    conn.execute("REINDEX user_inventory")
+    reindex = (time.perf_counter() - start) * 1000
+    return {"inventory load /1k": load, "reindex inventory": reindex}
+
+
+def bench_profiles(args):
+    workdir = tempfile.mkdtemp(prefix="kiichu-bench-")
+    base_path = os.path.join(workdir, "base.db")
+    if args.db:
+        shutil.copyfile(args.db, base_path)
+        conn = sqlite3.connect(base_path, isolation_level=None)
+        apply_migrations(conn)
+        conn.close()
+    else:
+        print(f"Generating {args.users:,} users / {args.cards:,} cards...")
+        generate(base_path, args.users, args.cards, args.seed, log=lambda *a: None)
+
+    with sqlite3.connect(base_path) as conn:
+        conn.execute("PRAGMA journal_mode=DELETE")
+        users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        cards = conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+    workloads = index_workloads(users, cards)
+    reads = [workload for workload in workloads if workload[1].lstrip().startswith(("SELECT", "WITH"))]
+    writes = [workload for workload in workloads if workload not in reads]
+    profiles = {"baseline": BASELINE_PROFILE, **PROFILES}
+
+    results = {}
+    for profile, settings in profiles.items():
+        # every profile starts from its own copy, the writes change the database
+        path = os.path.join(workdir, f"{profile}.db")
+        shutil.copyfile(base_path, path)
+        conn = open_profile(path, settings)
+        timings = run_profile_reads(conn, reads, args.iterations, args.seed)
+        timings.update(run_profile_commits(conn, writes, args.iterations // 4, args.seed))
+        timings.update(run_profile_bulk(conn, users, cards, args.rows, args.seed))
+        conn.close()
+        results[profile] = timings
+
+    names = list(results["baseline"])
+    print(f"\n{'ms':<26}" + "".join(f"{profile:>14}" for profile in profiles))
+    print("-" * (26 + 14 * len(profiles)))
+    for name in names:
+        print(f"{name:<26}" + "".join(f"{results[profile][name]:>14.4f}" for profile in profiles))
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+
+#----------------------MAIN----------------------#
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gacha database changes.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    indexes = subparsers.add_parser("indexes", help="pre-audit indexes vs the current migrations")
+    indexes.add_argument("--db", help="copy this database instead of generating one")
+    indexes.add_argument("--users", type=int, default=200000)
+    indexes.add_argument("--cards", type=int, default=2000)
+    indexes.add_argument("--iterations", type=int, default=2000)
+    indexes.add_argument("--seed", type=int, default=0)
+    indexes.set_defaults(run=bench_indexes)
+
+    profiles = subparsers.add_parser("profiles", help="old per-site PRAGMAs vs the interactive and bulk profiles")
+    profiles.add_argument("--db", help="copy this database instead of generating one")
+    profiles.add_argument("--users", type=int, default=200000)
+    profiles.add_argument("--cards", type=int, default=2000)
+    profiles.add_argument("--iterations", type=int, default=2000)
+    profiles.add_argument("--rows", type=int, default=100000, help="inventory rows in the bulk load")
+    profiles.add_argument("--seed", type=int, default=0)
+    profiles.set_defaults(run=bench_profiles)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#------------------SYNTHETIC DATABASE GENERATOR-------------------#
+# Builds a production-sized gacha database for benchmarking schema and query changes.
+# Inventories are drawn with the real drop rates from helpers/rates.py.
+#
+#   python db_generate.py bench.db --users 1000000 --cards 3000
+
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from helpers.collection import rarity_value
+from helpers.connection import connect_sync
+from helpers.migrations import apply_migrations
+from helpers.rates import PULL_COST, variant_probability
+
+# (holo_type, signature_type) of the six variants every card has
+VARIANT_TYPES = ((0, 0), (1, 0), (0, 1), (0, 2), (1, 1), (1, 2))
+
+# The bulk profile, loosened further while loading: no journal, no fsync, one writer
+LOAD_OVERRIDES = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "locking_mode": "EXCLUSIVE",
+}
+
+BATCH_USERS = 10000
+BASE_DISCORD_ID = 300000000000000000
+
+
+
+#----------------------GENERATOR----------------------#
+
+def generate(db_path, users, cards, seed=0, mean_pulls=15, inactive_share=0.4, log=print):
+    """Write a synthetic database to `db_path` and return row counts per table."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+
+    conn = connect_sync(db_path, "bulk", pragma_overrides=LOAD_OVERRIDES, isolation_level=None)
+
+    # migrate to the current schema, then hold the secondary indexes back until after the load
+    apply_migrations(conn)
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+    ).fetchall()
+    for name, _ in indexes:
+        conn.execute(f"DROP INDEX {name}")
+
+    conn.execute("BEGIN")
+
+    # cards and their six variants, ids are dense so variant ids can be computed
+    conn.executemany(
+        "INSERT INTO cards (id, name, image_url, artist_name, banner_id) VALUES (?, ?, ?, ?, 1)",
+        (
+            (card_id, f"Card {card_id}", f"https://cdn.example/cards/{card_id}.png", f"Artist {card_id % 97}")
+            for card_id in range(1, cards + 1)
+        )
+    )
+    variants = [
+        (card_id, holo, sig)
+        for card_id in range(1, cards + 1)
+        for holo, sig in VARIANT_TYPES
+    ]
+    conn.executemany(
+        "INSERT INTO card_variants (id, card_id, holo_type, signature_type, image_url) VALUES (?, ?, ?, ?, ?)",
+        (
+            (variant_id, card_id, holo, sig, f"https://cdn.example/cards/{card_id}_{holo}{sig}.png")
+            for variant_id, (card_id, holo, sig) in enumerate(variants, start=1)
+        )
+    )
+
+    variant_ids = list(range(1, len(variants) + 1))
+    cum_weights = []
+    running = 0.0
+    for _, holo, sig in variants:
+        running += variant_probability(holo, sig)
+        cum_weights.append(running)
+    variant_rarity = [0] + [rarity_value(holo, sig) for _, holo, sig in variants]
+
+    # heavy-tailed pull counts: most users pull a little, a few pull a lot
+    pareto_alpha = 1.5
+    pareto_scale = mean_pulls * (pareto_alpha - 1) / pareto_alpha
+
+    inventory_rows = 0
+    for batch_start in range(0, users, BATCH_USERS):
+        user_rows = []
+        inventory = []
+        for i in range(batch_start, min(batch_start + BATCH_USERS, users)):
+            discord_id = BASE_DISCORD_ID + i
+            pulls = 0 if rng.random() < inactive_share else min(int(rng.paretovariate(pareto_alpha) * pareto_scale), 5000)
+            owned = Counter(rng.choices(variant_ids, cum_weights=cum_weights, k=pulls)) if pulls else {}
+
+            rarest = min(owned, key=variant_rarity.__getitem__) if owned else None
+            currency = rng.randint(0, 3000)
+            streak = rng.randint(0, 30) if pulls else 0
+            last_daily = (now - timedelta(hours=rng.randint(0, 24 * 60))).isoformat() if pulls else None
+            user_rows.append((
+                str(discord_id),
+                currency,
+                currency + pulls * PULL_COST,
+                pulls,
+                pulls,
+                len(owned),
+                rarest,
+                streak,
+                max(streak, rng.randint(0, 90)) if pulls else 0,
+                last_daily,
+                variant_rarity[rarest] if rarest else 6,
+            ))
+            inventory.extend((discord_id, variant_id, quantity) for variant_id, quantity in owned.items())
+
+        conn.executemany(
+            """INSERT INTO users (discord_id, currency, total_stardust_collected, total_pulls,
+                total_cards_owned, total_unique_variants, rarest_card_id, current_daily_streak,
+                longest_daily_streak, last_daily, rarity_value, has_claimed_welcome)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)""",
+            user_rows
+        )
+        conn.executemany(
+            "INSERT INTO user_inventory (user_id, card_variant_id, quantity) VALUES (?, ?, ?)",
+            inventory
+        )
+        inventory_rows += len(inventory)
+        log(f"  {min(batch_start + BATCH_USERS, users):,} / {users:,} users, {inventory_rows:,} inventory rows")
+
+    conn.execute("COMMIT")
+
+    # build indexes once, after the bulk load
+    log("Building indexes...")
+    for _, statement in indexes:
+        conn.execute(statement)
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA journal_mode=WAL")
+
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("users", "cards", "card_variants", "user_inventory")
+    }
+    conn.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic gacha database for benchmarks.")
+    parser.add_argument("output", help="path of the database file to write")
+    parser.add_argument("--users", type=int, default=100000, help="number of users (default 100k)")
+    parser.add_argument("--cards", type=int, default=2000, help="number of base cards, six variants each")
+    parser.add_argument("--mean-pulls", type=int, default=15, help="mean pulls per active user")
+    parser.add_argument("--inactive", type=float, default=0.4, help="share of users that never pulled")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--force", action="store_true", help="overwrite the output file if it exists")
+    args = parser.parse_args()
+
+    if os.path.exists(args.output):
+        if not args.force:
+            parser.error(f"'{args.output}' already exists, use --force to overwrite it")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.output + suffix):
+                os.remove(args.output + suffix)
+
+    start = time.perf_counter()
+    counts = generate(args.output, args.users, args.cards, args.seed, args.mean_pulls, args.inactive)
+    elapsed = time.perf_counter() - start
+
+    print(f"Wrote {args.output} in {elapsed:.1f}s")
+    for table, count in counts.items():
+        print(f"  {table:<16}{count:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 import asyncio
-import aiosqlite
 import json
 
+from helpers.connection import connect
+
 # Configuration
 DATABASE_PATH = "./database/database.db"
 
@@ -14,8 +15,8 @@ async def repopulate_from_json():
         print(f"Error loading JSON file: {e}")
         return
 
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        await db.execute("PRAGMA foreign_keys = ON")
+    # deleting variants cascades to inventories, so this connection enforces foreign keys
+    async with connect(DATABASE_PATH, "bulk", {"foreign_keys": "ON"}) as db:
         
         # Clear existing variants using truncate optimization
         await db.execute("DELETE FROM card_variants")
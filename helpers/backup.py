@@ -0,0 +1,152 @@
+#----------------------DATABASE BACKUPS----------------------#
+# Hot backups of the live database with SQLite's online backup API. The copy is
+# made a few pages at a time on a worker thread, checked with PRAGMA
+# integrity_check, gzipped and rotated. db_backup.py restores them.
+
+import asyncio
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+DATABASE_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../database/database.db"
+BACKUP_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../backups"
+
+# Pages copied per backup step, and the pause between steps
+STEP_PAGES = 256
+STEP_SLEEP = 0.005
+# Writes restart a stepped copy; after this many restarts copy in one step instead
+MAX_RESTARTS = 3
+# Backups kept by default, oldest are deleted first
+KEEP = 14
+
+Backup = namedtuple("Backup", "path size compressed_size seconds restarts")
+
+
+class BackupError(Exception):
+    pass
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+
+#----------------------COPY AND CHECK----------------------#
+
+def copy_database(db_path: str, target: str) -> int:
+    """Consistent copy of `db_path` into `target`, returns how often the copy restarted."""
+    restarts = 0
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal restarts, last_remaining
+        # remaining only goes up when another connection wrote and the copy started over
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > MAX_RESTARTS:
+                raise _TooManyRestarts()
+        last_remaining = remaining
+
+    source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        destination = sqlite3.connect(target)
+        try:
+            try:
+                source.backup(destination, pages=STEP_PAGES, progress=progress, sleep=STEP_SLEEP)
+            except (_TooManyRestarts, sqlite3.OperationalError):
+                # under constant writes: one step is one read transaction, WAL writers carry on
+                source.backup(destination, pages=-1)
+            destination.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            destination.close()
+    finally:
+        source.close()
+    return restarts
+
+
+def check_integrity(db_path: str):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        result = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+    finally:
+        conn.close()
+    if result != ["ok"]:
+        raise BackupError(f"Integrity check failed for {db_path}: {'; '.join(result[:5])}")
+
+
+def extract(backup_path: str, target: str):
+    """Decompress a .db.gz backup (or copy a plain .db) to `target`."""
+    opener = gzip.open if backup_path.endswith(".gz") else open
+    with opener(backup_path, "rb") as source, open(target, "wb") as destination:
+        shutil.copyfileobj(source, destination, 1024 * 1024)
+
+
+
+#----------------------BACKUP AND ROTATION----------------------#
+
+def list_backups(directory: str = BACKUP_PATH) -> list:
+    """Backup files, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    names = [name for name in os.listdir(directory) if name.startswith("kiichu-") and name.endswith(".db.gz")]
+    return [os.path.join(directory, name) for name in sorted(names, reverse=True)]
+
+
+def rotate(directory: str = BACKUP_PATH, keep: int = KEEP) -> list:
+    removed = list_backups(directory)[keep:]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def create_backup(db_path: str = DATABASE_PATH, directory: str = BACKUP_PATH, keep: int = KEEP) -> Backup:
+    start = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    name = f"kiichu-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.db.gz"
+    target = os.path.join(directory, name)
+
+    with tempfile.TemporaryDirectory(dir=directory) as workdir:
+        copy = os.path.join(workdir, "copy.db")
+        restarts = copy_database(db_path, copy)
+        check_integrity(copy)
+
+        # compress next to the final name, then swap it in so a half-written file is never listed
+        partial = os.path.join(workdir, name)
+        with open(copy, "rb") as source, gzip.open(partial, "wb", compresslevel=6) as destination:
+            shutil.copyfileobj(source, destination, 1024 * 1024)
+        size = os.path.getsize(copy)
+        os.replace(partial, target)
+
+    rotate(directory, keep)
+    return Backup(target, size, os.path.getsize(target), time.perf_counter() - start, restarts)
+
+
+async def backup(db_path: str = DATABASE_PATH, directory: str = BACKUP_PATH, keep: int = KEEP) -> Backup:
+    """create_backup() on a worker thread, the event loop keeps serving while it copies."""
+    return await asyncio.to_thread(create_backup, db_path, directory, keep)
+
+
+def restore(backup_path: str, db_path: str = DATABASE_PATH) -> str:
+    """
+    Replace `db_path` with a backup. The bot must be stopped. The current database
+    (with its -wal/-shm files) is kept beside it as <name>.pre-restore-<time>.
+    """
+    directory = os.path.dirname(os.path.realpath(db_path))
+    with tempfile.TemporaryDirectory(dir=directory) as workdir:
+        candidate = os.path.join(workdir, "restore.db")
+        extract(backup_path, candidate)
+        check_integrity(candidate)
+
+        suffix = f".pre-restore-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}"
+        kept = None
+        for extension in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + extension):
+                os.replace(db_path + extension, db_path + suffix + extension)
+                kept = kept or db_path + suffix
+        os.replace(candidate, db_path)
+    return kept
@@ -0,0 +1,272 @@
+#----------------------BANNER SCHEDULE----------------------#
+# Which banners are live, decided from the start_date/end_date columns instead of
+# asking the database on every pull. load() reads the banners and builds a pool per
+# banner from the catalog (an alias sampler over its regular cards, its limited cards
+# with their variant and the copies already issued, its rate overrides), plus the
+# standard pool of every regular card. Draws are weighted by cards.drop_weight, which
+# banner_card_weights overrides inside one banner for rate-ups. tick() runs on a timer in every process and
+# swaps the live pools when a window opens or closes; the process that applies the
+# writes also keeps banners.is_active in step for anything that still reads it.
+#
+# Every banner whose window contains now is live, and the one that started last is
+# featured: it is the one !banner shows and the one plain pulls draw limited cards
+# from. A banner with no end date (what add_banner creates) stays live only until
+# the next banner with no end date starts, so open-ended banners replace each other
+# the way activating one used to deactivate the rest. Dates are UTC, the way SQLite's
+# CURRENT_TIMESTAMP stores them.
+
+import asyncio
+import logging
+import math
+import random
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from helpers.catalog import DATABASE_PATH, catalog
+from helpers.connection import connect
+from helpers.sampler import AliasSampler
+
+# Longest sleep between checks when nothing starts or ends sooner
+MAX_INTERVAL = 300
+# Seconds between rereads of the banners table, so dates edited straight in the
+# database are picked up without a restart
+RELOAD_INTERVAL = 300
+
+Banner = namedtuple("Banner", "id name start end")
+# Drop rates, None where a banner keeps the default
+Rates = namedtuple("Rates", "holo signed golden_signed limited", defaults=(None, None, None, None))
+
+# Pool of every regular card, for pulls that do not name a banner
+STANDARD = Banner(0, "Standard", None, None)
+
+_EARLIEST = datetime.min.replace(tzinfo=timezone.utc)
+
+# logs under KiichuBot, failed checks land in discord.log with the rest
+logger = logging.getLogger("KiichuBot.banners")
+
+
+class LimitedCard:
+    __slots__ = ("card_id", "variant_id", "max_copies", "issued")
+
+    def __init__(self, card_id: int, variant_id, max_copies, issued: int = 0):
+        self.card_id = card_id
+        # None until the first copy is pulled and its generation 999 variant created
+        self.variant_id = variant_id
+        self.max_copies = max_copies
+        self.issued = issued
+
+    @property
+    def in_stock(self) -> bool:
+        return not self.max_copies or self.issued < self.max_copies
+
+
+class BannerPool:
+    __slots__ = ("banner", "card_ids", "sampler", "limited", "rates")
+
+    def __init__(self, banner: Banner, card_ids, limited: dict, rates: Rates = Rates(), weights=None):
+        self.banner = banner
+        # regular card ids, sorted
+        self.card_ids = tuple(card_ids)
+        # weights line up with card_ids; a pool whose weights are all 0 draws nothing
+        weights = None if weights is None else tuple(weights)
+        drawable = self.card_ids and (weights is None or sum(weights) > 0)
+        self.sampler = AliasSampler(self.card_ids, weights) if drawable else None
+        # card id -> LimitedCard
+        self.limited = limited
+        self.rates = rates
+
+    def random_card(self):
+        """A regular card of this banner, None if it has none."""
+        return self.sampler.sample() if self.sampler else None
+
+    def random_limited(self):
+        """A limited card of this banner that still has copies left, None if there is none."""
+        available = [card for card in self.limited.values() if card.in_stock]
+        return random.choice(available) if available else None
+
+
+
+#----------------------DATES----------------------#
+
+def parse_date(value):
+    """A banners date column as an aware UTC datetime, None when empty or unreadable."""
+    if not value:
+        return None
+    try:
+        date = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return date.replace(tzinfo=timezone.utc) if date.tzinfo is None else date.astimezone(timezone.utc)
+
+
+def _started(banner: Banner):
+    return banner.start or _EARLIEST, banner.id
+
+
+def live_banners(banners, now: datetime) -> list:
+    """The banners whose window contains now, the last one to start first."""
+    started = [banner for banner in banners if banner.start is None or banner.start <= now]
+    # a banner without an end date runs until the next one without an end date starts
+    open_ended = max((banner for banner in started if banner.end is None), key=_started, default=None)
+    live = [banner for banner in started if banner is open_ended or (banner.end is not None and now < banner.end)]
+    return sorted(live, key=_started, reverse=True)
+
+
+def next_change(banners, now: datetime):
+    """Seconds until the next start or end date after now, None if there is none."""
+    upcoming = [
+        date for banner in banners for date in (banner.start, banner.end)
+        if date is not None and date > now
+    ]
+    return (min(upcoming) - now).total_seconds() if upcoming else None
+
+
+
+def drop_weight(weight, card_id: int, banner: Banner) -> float:
+    """A card's weight in a pool, 0 (never drawn) with a warning if the stored one is unusable."""
+    if isinstance(weight, (int, float)) and math.isfinite(weight) and weight >= 0:
+        return weight
+    logger.warning(f"Card {card_id} has drop weight {weight!r} in the {banner.name} pool, it is left out")
+    return 0.0
+
+
+
+#----------------------SCHEDULE----------------------#
+
+class BannerSchedule:
+    def __init__(self, db_path: str = DATABASE_PATH):
+        self.db_path = db_path
+        self.banners = ()
+        # banner id -> BannerPool
+        self.pools = {}
+        self.standard = BannerPool(STANDARD, (), {})
+        # live pools, featured first
+        self.live = ()
+        # banner ids the database marks active, as last read or written
+        self.stored_active = frozenset()
+        self.catalog_version = None
+        self.loaded_at = None
+        self.loaded = False
+
+    @property
+    def featured(self):
+        return self.live[0] if self.live else None
+
+    @property
+    def live_ids(self) -> tuple:
+        return tuple(pool.banner.id for pool in self.live)
+
+    async def load(self, db_path: str = None):
+        """Reread the banners and limited stock and rebuild every pool."""
+        if db_path:
+            self.db_path = db_path
+        async with connect(self.db_path) as db:
+            cursor = await db.execute("""
+                SELECT id, name, is_active, start_date, end_date,
+                       holo_rate, signed_rate, golden_signed_rate, limited_rate
+                FROM banners
+            """)
+            rows = await cursor.fetchall()
+            cursor = await db.execute("""
+                SELECT cv.card_id, cv.id, COALESCE(ls.issued, 0)
+                FROM card_variants cv
+                LEFT JOIN limited_serials ls ON ls.card_variant_id = cv.id
+                WHERE cv.generation = 999
+                ORDER BY cv.id DESC
+            """)
+            # a card with several generation 999 variants keeps its first one
+            issued = {card_id: (variant_id, count) for card_id, variant_id, count in await cursor.fetchall()}
+            cursor = await db.execute("SELECT banner_id, card_id, weight FROM banner_card_weights")
+            rate_ups = {(banner_id, card_id): weight for banner_id, card_id, weight in await cursor.fetchall()}
+
+        banners = tuple(Banner(row[0], row[1], parse_date(row[3]), parse_date(row[4])) for row in rows)
+        rates = {row[0]: Rates(*row[5:9]) for row in rows}
+        pools = {}
+        for banner in banners:
+            card_ids, weights, limited = [], [], {}
+            for card_id in (catalog.snapshot.banner_cards(banner.id) if catalog.snapshot else ()):
+                card = catalog.cards[card_id]
+                if card.is_limited:
+                    variant_id, count = issued.get(card_id, (None, 0))
+                    limited[card_id] = LimitedCard(card_id, variant_id, card.max_copies, count)
+                else:
+                    card_ids.append(card_id)
+                    weights.append(drop_weight(rate_ups.get((banner.id, card_id), card.weight), card_id, banner))
+            pools[banner.id] = BannerPool(banner, card_ids, limited, rates[banner.id], weights)
+
+        # swap whole references, a pull never sees a half built schedule
+        self.banners = banners
+        self.pools = pools
+        if catalog.version != self.catalog_version:
+            # the standard pool only changes with the catalog, and it is the big one
+            self.standard = self.standard_pool()
+        self.stored_active = frozenset(row[0] for row in rows if row[2])
+        self.catalog_version = catalog.version
+        self.loaded_at = datetime.now(timezone.utc)
+        self.loaded = True
+        self._select(self.loaded_at)
+
+    def standard_pool(self) -> BannerPool:
+        card_ids = catalog.regular_card_ids
+        cards = catalog.cards
+        weights = [drop_weight(cards[card_id].weight, card_id, STANDARD) for card_id in card_ids]
+        return BannerPool(STANDARD, card_ids, {}, weights=weights)
+
+    def _select(self, now: datetime) -> bool:
+        previous = self.live_ids
+        self.live = tuple(self.pools[banner.id] for banner in live_banners(self.banners, now))
+        return self.live_ids != previous
+
+    def pool(self, banner_id: int):
+        return self.pools.get(banner_id)
+
+    def live_pool(self, banner_id: int):
+        """The pool of a banner that is live right now, None otherwise."""
+        return next((pool for pool in self.live if pool.banner.id == banner_id), None)
+
+    def find(self, banner: str):
+        """A live pool by banner id or name (case-insensitive), None if no live banner matches."""
+        banner = banner.strip()
+        for pool in self.live:
+            if str(pool.banner.id) == banner or pool.banner.name.lower() == banner.lower():
+                return pool
+        return None
+
+    def interval(self, now: datetime) -> float:
+        seconds = next_change(self.banners, now)
+        # wake just after the boundary so the comparison lands on the new side of it
+        return MAX_INTERVAL if seconds is None else max(1.0, min(MAX_INTERVAL, seconds + 0.5))
+
+    async def tick(self, now: datetime = None, persist: bool = False):
+        """Swap the live pool if a window opened or closed. Returns (changed, seconds to the next check)."""
+        now = now or datetime.now(timezone.utc)
+        previous = self.live_ids
+        stale = not self.loaded or (now - self.loaded_at).total_seconds() >= RELOAD_INTERVAL
+        if stale or catalog.version != self.catalog_version:
+            await self.load()
+        self._select(now)
+        if persist and set(self.live_ids) != self.stored_active:
+            await self.store_active()
+        return self.live_ids != previous, self.interval(now)
+
+    async def store_active(self):
+        live_ids = self.live_ids
+        async with connect(self.db_path) as db:
+            await db.execute(
+                f"UPDATE banners SET is_active = id IN ({', '.join('?' * len(live_ids))})", live_ids
+            )
+            await db.commit()
+        self.stored_active = frozenset(live_ids)
+
+    async def run(self, persist: bool = False):
+        """tick() forever, for processes without a bot to run a tasks.loop (the writer)."""
+        while True:
+            try:
+                _, interval = await self.tick(persist=persist)
+            except Exception as e:
+                logger.error(f"Banner schedule check failed: {type(e).__name__}: {e}")
+                interval = MAX_INTERVAL
+            await asyncio.sleep(interval)
+
+
+banners = BannerSchedule()
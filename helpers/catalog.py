@@ -0,0 +1,98 @@
+#----------------------CARD CATALOG CACHE----------------------#
+# `cards` and `card_variants` as a memory-mapped snapshot (see helpers/snapshot.py),
+# so the pull path never has to ask SQLite about them. The process that changes the
+# catalog rebuilds the snapshot from SQLite with load(), every other process maps the
+# new file with attach() when it hears about the change.
+
+import asyncio
+import os
+
+from helpers.connection import connect
+from helpers.snapshot import (
+    Card, CatalogSnapshot, SnapshotError, Variant, latest_snapshot, prune_snapshots, snapshot_versions, write_snapshot,
+)
+
+DATABASE_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../database/database.db"
+
+
+def snapshot_path(db_path: str) -> str:
+    """The snapshot files live beside the database they were exported from, one per version."""
+    return f"{db_path}-catalog"
+
+
+class Catalog:
+    def __init__(self):
+        self.snapshot = None
+        # variants created after the snapshot was taken, (card, holo, signature) -> id
+        self.added = {}
+        self.loaded = False
+
+    @property
+    def version(self) -> int:
+        return self.snapshot.version if self.snapshot else 0
+
+    @property
+    def cards(self):
+        return self.snapshot.cards if self.snapshot else {}
+
+    @property
+    def variants(self):
+        return self.snapshot.variants if self.snapshot else {}
+
+    @property
+    def regular_card_ids(self):
+        return self.snapshot.regular_card_ids if self.snapshot else ()
+
+    async def load(self, db_path: str = DATABASE_PATH):
+        """Rebuild the snapshot from SQLite and map it."""
+        async with connect(db_path) as db:
+            cursor = await db.execute(
+                "SELECT id, name, image_url, artist_name, banner_id, is_limited, max_copies, drop_weight FROM cards"
+            )
+            cards = [Card(*row) for row in await cursor.fetchall()]
+            cursor = await db.execute(
+                "SELECT id, card_id, holo_type, signature_type, image_url, generation FROM card_variants"
+            )
+            variants = [Variant(*row) for row in await cursor.fetchall()]
+
+        base = snapshot_path(db_path)
+        version = max([self.version, *snapshot_versions(base)]) + 1
+        path = await asyncio.to_thread(write_snapshot, base, cards, variants, version)
+        self._swap(CatalogSnapshot(path))
+        await asyncio.to_thread(prune_snapshots, base)
+
+    async def attach(self, db_path: str = DATABASE_PATH):
+        """Map the snapshot another process exported, or build one if there is none yet."""
+        path = latest_snapshot(snapshot_path(db_path))
+        try:
+            if path is None:
+                raise SnapshotError("No catalog snapshot has been exported yet")
+            snapshot = CatalogSnapshot(path)
+        except (OSError, SnapshotError):
+            await self.load(db_path)
+            return
+        if snapshot.version != self.version:
+            self._swap(snapshot)
+
+    def _swap(self, snapshot: CatalogSnapshot):
+        # one reference swap, readers never see half a catalog; the old mapping
+        # is released once nothing holds it any more
+        self.snapshot = snapshot
+        self.added = {}
+        self.loaded = True
+
+    def variant_id(self, card_id: int, holo_type: int, signature_type: int):
+        variant_id = self.snapshot.variant_id(card_id, holo_type, signature_type) if self.snapshot else None
+        if variant_id is None:
+            variant_id = self.added.get((card_id, holo_type, signature_type))
+        return variant_id
+
+    def add_variant(self, variant: Variant):
+        if variant.generation != 999:
+            self.added[(variant.card_id, variant.holo_type, variant.signature_type)] = variant.id
+
+    def forget_added(self):
+        self.added = {}
+
+
+catalog = Catalog()
@@ -0,0 +1,98 @@
+#----------------------COLLECTION PAGES----------------------#
+# A loaded collection kept as parallel arrays (variant id, quantity, rarity) that
+# point into the shared catalog. Names, image URLs and summary lines are only made
+# for the page on screen, so an open collection view costs a few bytes per card
+# instead of a dict of strings per card for its whole timeout.
+
+from array import array
+
+from helpers.catalog import catalog
+
+PAGE_SIZE = 10
+
+# rarity value -> variation text, 1 is the rarest
+VARIATIONS = {
+    1: "Holo Golden Signed",
+    2: "Golden Signed",
+    3: "Holo Signed",
+    4: "Signed",
+    5: "Holo",
+    6: "Standard",
+}
+
+
+def rarity_value(holo_type: int, signature_type: int) -> int:
+    if holo_type == 1 and signature_type == 2:  # Holo + Golden Signed
+        return 1
+    elif signature_type == 2:  # Golden Signed
+        return 2
+    elif holo_type == 1 and signature_type == 1:  # Holo + Signed
+        return 3
+    elif signature_type == 1:  # Signed
+        return 4
+    elif holo_type == 1:  # Holo
+        return 5
+    return 6
+
+
+class Collection:
+    __slots__ = ("variant_ids", "quantities", "rarities", "extra")
+
+    def __init__(self, rows=()):
+        """
+        `rows` are (card name, artist, variant id, image url, holo type, signature type,
+        quantity) in display order, as the collection queries return them.
+        """
+        self.variant_ids = array("i")
+        self.quantities = array("i")
+        self.rarities = array("b")
+        # variants the catalog does not know yet (created after its snapshot): id -> (name, image url)
+        self.extra = {}
+        variants = catalog.variants
+        for name, _artist, variant_id, image_url, holo_type, signature_type, quantity in rows:
+            self.variant_ids.append(variant_id)
+            self.quantities.append(quantity)
+            self.rarities.append(rarity_value(holo_type, signature_type))
+            if variant_id not in variants:
+                self.extra[variant_id] = (name, image_url)
+
+    def __len__(self):
+        return len(self.variant_ids)
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-len(self.variant_ids) // PAGE_SIZE))
+
+    def nbytes(self) -> int:
+        """Bytes held by the columns, the catalog strings are shared and not counted."""
+        columns = (self.variant_ids, self.quantities, self.rarities)
+        return sum(column.itemsize * len(column) for column in columns) + sum(
+            len(name or "") + len(image_url or "") for name, image_url in self.extra.values()
+        )
+
+    def name(self, row: int):
+        variant_id = self.variant_ids[row]
+        if variant_id in self.extra:
+            return self.extra[variant_id][0]
+        card = catalog.cards.get(catalog.variants[variant_id].card_id)
+        return card.name if card else None
+
+    def image_url(self, row: int):
+        variant_id = self.variant_ids[row]
+        if variant_id in self.extra:
+            return self.extra[variant_id][1]
+        return catalog.variants[variant_id].image_url
+
+    def summary(self, row: int) -> str:
+        return f"**{self.name(row)}** ({VARIATIONS[self.rarities[row]]}), x{self.quantities[row]}"
+
+    def page(self, index: int) -> list:
+        """(variant id, summary) for the cards on one page."""
+        start = index * PAGE_SIZE
+        return [(self.variant_ids[row], self.summary(row)) for row in range(start, min(start + PAGE_SIZE, len(self)))]
+
+    def rarest_image_url(self):
+        if not self.rarities:
+            return None
+        # the first card of the lowest rarity value, even when sorted by quantity
+        return self.image_url(self.rarities.index(min(self.rarities)))
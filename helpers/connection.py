@@ -0,0 +1,103 @@
+#----------------------CONNECTION FACTORY----------------------#
+# Every connection to the gacha database is opened here, so they all run with the
+# same tuned PRAGMAs instead of whatever each call site remembered to set.
+#
+#   interactive: the bot. WAL with synchronous=NORMAL (a commit is a WAL append, no
+#                fsync until checkpoint), a modest page cache per connection and reads
+#                served from mmap.
+#   bulk:        imports and repopulation. Same durability, a much larger cache and
+#                less frequent automatic checkpoints while many rows are written.
+#
+# foreign_keys is off in both: user_inventory, limited_card_instances and
+# user_card_sets store Discord ids in user_id, which does not match users(id) they
+# declare as their parent, so enforcement would reject every pull. Scripts that rely
+# on the cascades (db_repopulate.py) turn it on for their own connection.
+#
+# db_bench.py profiles compares them against the old per-site settings.
+
+import os
+import sqlite3
+
+import aiosqlite
+
+DATABASE_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../database/database.db"
+
+# PRAGMA name -> value, applied in this order
+INTERACTIVE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "foreign_keys": "OFF",
+    "cache_size": -16384,           # 16 MB
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+BULK = {
+    **INTERACTIVE,
+    "busy_timeout": 30000,
+    "cache_size": -262144,          # 256 MB
+    "wal_autocheckpoint": 10000,    # pages, the default is 1000
+}
+
+PROFILES = {
+    "interactive": INTERACTIVE,
+    "bulk": BULK,
+}
+
+
+def pragmas(profile: str = "interactive", **overrides) -> list:
+    """The PRAGMA statements for a profile, with single settings overridden."""
+    settings = {**PROFILES[profile], **overrides}
+    return [f"PRAGMA {name}={value};" for name, value in settings.items()]
+
+
+
+#----------------------ASYNC (aiosqlite)----------------------#
+
+class Connector:
+    """Like aiosqlite.connect(): await it for a connection, or use it with `async with`."""
+
+    def __init__(self, db_path, profile, overrides, kwargs):
+        self.statements = pragmas(profile, **overrides)
+        self.db_path = db_path
+        self.kwargs = kwargs
+        self.conn = None
+
+    async def _open(self):
+        conn = await aiosqlite.connect(self.db_path, **self.kwargs)
+        try:
+            for statement in self.statements:
+                await conn.execute(statement)
+        except BaseException:
+            await conn.close()
+            raise
+        return conn
+
+    def __await__(self):
+        return self._open().__await__()
+
+    async def __aenter__(self):
+        self.conn = await self._open()
+        return self.conn
+
+    async def __aexit__(self, *exc_info):
+        await self.conn.close()
+
+
+def connect(db_path: str = DATABASE_PATH, profile: str = "interactive", pragma_overrides: dict = None, **kwargs) -> Connector:
+    return Connector(db_path, profile, pragma_overrides or {}, kwargs)
+
+
+
+#----------------------SYNC (sqlite3)----------------------#
+
+def connect_sync(db_path: str = DATABASE_PATH, profile: str = "interactive", pragma_overrides: dict = None, **kwargs) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, **kwargs)
+    try:
+        for statement in pragmas(profile, **(pragma_overrides or {})):
+            conn.execute(statement)
+    except BaseException:
+        conn.close()
+        raise
+    return conn
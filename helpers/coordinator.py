@@ -0,0 +1,264 @@
+#----------------------WRITE COORDINATOR----------------------#
+# Every stardust and inventory write goes through `writes.call(name, *args)`.
+#
+# Single process (the default) the operation simply runs on this process's own
+# connection. In the multi-process mode (cluster.py) each shard process connects to
+# one writer process over a local socket instead: the writer applies the operations
+# it receives in batched transactions, one savepoint per operation, and relays
+# cache invalidations published by one shard to all the others.
+
+import asyncio
+import itertools
+import json
+import logging
+from collections import defaultdict
+
+from helpers.events import events
+
+# Operations that arrive within this window share a transaction
+BATCH_WINDOW = 0.002
+BATCH_SIZE = 64
+# Longest line (one request or reply) accepted on the socket
+FRAME_LIMIT = 2 ** 20
+
+# child of the bot logger, so its records go through the bot's log queue
+logger = logging.getLogger("KiichuBot.coordinator")
+
+
+class WriteError(Exception):
+    """An operation failed inside the writer process, its savepoint was rolled back."""
+
+
+
+#----------------------FRAMING----------------------#
+
+def encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":"), default=str).encode() + b"\n"
+
+
+async def read_frames(reader: asyncio.StreamReader):
+    while True:
+        line = await reader.readline()
+        if not line:
+            return
+        yield json.loads(line)
+
+
+
+#----------------------SHARD SIDE----------------------#
+
+class WriteCoordinator:
+    def __init__(self):
+        self.operations = {}
+        self.subscribers = defaultdict(list)
+        # callbacks run after the writer rolls an operation back
+        self.rollback_hooks = set()
+        # async context manager factory used when no writer process is connected
+        self.connection = None
+        self.address = None
+        self._reader = None
+        self._writer = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._listener = None
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def remote(self) -> bool:
+        return self.address is not None
+
+    def operation(self, name: str, function):
+        """Register `async function(db, *args)`; args and result must be JSON-serializable."""
+        self.operations[name] = function
+
+    def on_rollback(self, callback):
+        """Run `callback()` when the writer rolls back, for caches filled from writes that were undone."""
+        self.rollback_hooks.add(callback)
+
+    def rolled_back(self):
+        for callback in self.rollback_hooks:
+            callback()
+
+    def subscribe(self, topic: str, callback):
+        """Run `async callback(key)` when another process publishes `topic`."""
+        self.subscribers[topic].append(callback)
+
+    async def call(self, name: str, *args):
+        if not self.remote:
+            async with self.connection() as db:
+                return await self.operations[name](db, *args)
+
+        await self._ensure_connected()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._writer.write(encode({"id": request_id, "op": name, "args": args}))
+            await self._writer.drain()
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def publish(self, topic: str, key=None):
+        """Tell the other processes a cache changed, this process already knows."""
+        if not self.remote:
+            return
+        await self._ensure_connected()
+        self._writer.write(encode({"publish": topic, "key": key}))
+        await self._writer.drain()
+
+    async def deliver(self, topic: str, key=None):
+        for callback in self.subscribers.get(topic, ()):
+            try:
+                await callback(key)
+            except Exception as e:
+                logger.error(f"Invalidation of '{topic}' failed: {type(e).__name__}: {e}")
+
+    async def connect(self, host: str, port: int):
+        self.address = (host, port)
+        await self._ensure_connected()
+
+    async def _ensure_connected(self):
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            self._reader, self._writer = await asyncio.open_connection(*self.address, limit=FRAME_LIMIT)
+            self._listener = asyncio.create_task(self._listen(self._reader))
+
+    async def _listen(self, reader):
+        try:
+            async for message in read_frames(reader):
+                if "event" in message:
+                    asyncio.create_task(self.deliver(message["event"], message.get("key")))
+                    continue
+                future = self._pending.get(message["id"])
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    future.set_exception(WriteError(message["error"]))
+                else:
+                    future.set_result(message["result"])
+        finally:
+            # the writer went away, fail whatever was in flight and reconnect on the next call
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Lost the connection to the writer process"))
+            if self._writer is not None:
+                self._writer.close()
+            self._writer = None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._listener is not None:
+            self._listener.cancel()
+        self._writer = None
+
+
+writes = WriteCoordinator()
+
+
+
+#----------------------WRITER SIDE----------------------#
+
+class BatchedConnection:
+    """The writer's connection, `commit()` from inside an operation waits for the batch."""
+
+    def __init__(self, conn):
+        self._batched = conn
+
+    def __getattr__(self, name):
+        return getattr(self._batched, name)
+
+    async def commit(self):
+        pass
+
+    async def commit_batch(self):
+        await self._batched.commit()
+
+
+class WriterServer:
+    def __init__(self, coordinator: WriteCoordinator, connection: BatchedConnection):
+        self.coordinator = coordinator
+        self.connection = connection
+        self.queue = asyncio.Queue()
+        self.clients = set()
+        self.batches = 0
+        self.applied = 0
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self._handle_client, host, port, limit=FRAME_LIMIT)
+        applier = asyncio.create_task(self._apply_batches())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            applier.cancel()
+
+    async def _handle_client(self, reader, writer):
+        self.clients.add(writer)
+        try:
+            async for message in read_frames(reader):
+                if "publish" in message:
+                    await self._broadcast(message["publish"], message.get("key"), sender=writer)
+                else:
+                    self.queue.put_nowait((writer, message))
+        except (ConnectionError, json.JSONDecodeError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    async def _broadcast(self, topic, key, sender=None):
+        frame = encode({"event": topic, "key": key})
+        for client in list(self.clients):
+            if client is not sender and not client.is_closing():
+                client.write(frame)
+        # the writer keeps caches of its own (the card catalog)
+        await self.coordinator.deliver(topic, key)
+
+    async def _apply_batches(self):
+        while True:
+            batch = [await self.queue.get()]
+            # give concurrent shards a moment to add to this transaction
+            await asyncio.sleep(BATCH_WINDOW)
+            while len(batch) < BATCH_SIZE and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            replies = await self._apply(batch)
+            for client, reply in replies:
+                if not client.is_closing():
+                    client.write(encode(reply))
+
+    async def _apply(self, batch) -> list:
+        db = self.connection
+        replies = []
+        # events of the operations that were released, logged once the batch commits
+        released = []
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            for client, request in batch:
+                await db.execute("SAVEPOINT operation")
+                with events.held() as held:
+                    try:
+                        result = await self.coordinator.operations[request["op"]](db, *request["args"])
+                        await db.execute("RELEASE operation")
+                        released.extend(held)
+                        replies.append((client, {"id": request["id"], "result": result}))
+                    except Exception as e:
+                        await db.execute("ROLLBACK TO operation")
+                        await db.execute("RELEASE operation")
+                        self.coordinator.rolled_back()
+                        replies.append((client, {"id": request["id"], "error": f"{type(e).__name__}: {e}"}))
+            await db.commit_batch()
+            events.release(released)
+        except Exception as e:
+            await db.rollback()
+            self.coordinator.rolled_back()
+            replies = [
+                (client, {"id": request["id"], "error": f"Batch failed, {type(e).__name__}: {e}"})
+                for client, request in batch
+            ]
+        self.batches += 1
+        self.applied += len(batch)
+        return replies
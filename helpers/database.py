@@ -5,6 +5,10 @@ import json
 import os
 import aiosqlite
 
+from helpers.connection import connect
+from helpers.coordinator import writes
+from helpers.prefixes import prefixes
+
 DATABASE_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../database/database.db"
 
 
@@ -12,18 +16,21 @@ DATABASE_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../database/data
 #-----------------------PREFIX---------------------#
 
 async def set_guild_prefix(server_id: str, prefix: str):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute(
             "INSERT OR REPLACE INTO prefixes (server_id, prefix) VALUES (?, ?)",
             (server_id, prefix),
         )
         await db.commit()
+    # write-through, the new prefix applies to the very next message
+    prefixes.set(server_id, prefix)
+    await writes.publish("prefixes", str(server_id))
 
 
 #----------------AUTOMATED MESSAGES----------------#
 
 async def add_automated_message(channel_id: str, message: str, interval_seconds: int):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute(
             "INSERT INTO automated_messages (channel_id, message, interval_seconds, next_run) VALUES (?, ?, ?, datetime('now', ? || ' seconds'))",
             (channel_id, message, interval_seconds, interval_seconds)
@@ -33,21 +40,21 @@ async def add_automated_message(channel_id: str, message: str, interval_seconds:
 
 
 async def remove_automated_message(message_id: int):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute("DELETE FROM automated_messages WHERE id = ?", (message_id,))
         await db.commit()
 
 
 
 async def get_automated_messages():
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         cursor = await db.execute("SELECT id, channel_id, message, interval_seconds FROM automated_messages")
         rows = await cursor.fetchall()
         return rows
 
 
 async def get_due_automated_messages():
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         cursor = await db.execute(
             "SELECT id, channel_id, message FROM automated_messages WHERE next_run <= datetime('now')"
         )
@@ -55,7 +62,7 @@ async def get_due_automated_messages():
         return rows
 
 async def update_next_run(message_id: int, interval_seconds: int):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute(
             "UPDATE automated_messages SET next_run = datetime('now', ? || ' seconds') WHERE id = ?",
             (interval_seconds, message_id)
@@ -70,7 +77,7 @@ async def update_next_run(message_id: int, interval_seconds: int):
         
 
 async def update_last_video_id(channel_id: str, video_id: str, publish_date: str):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute("""
             INSERT INTO youtube_last_video (channel_id, last_video_id, publish_date) VALUES (?, ?, ?)
             ON CONFLICT(channel_id) DO UPDATE SET last_video_id = excluded.last_video_id, publish_date = excluded.publish_date
@@ -78,7 +85,7 @@ async def update_last_video_id(channel_id: str, video_id: str, publish_date: str
         await db.commit()
 
 async def get_last_video_id(channel_id: str):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         cursor = await db.execute("SELECT last_video_id, publish_date FROM youtube_last_video WHERE channel_id = ?", (channel_id,))
         row = await cursor.fetchone()
         if row:
@@ -93,7 +100,7 @@ async def get_last_video_id(channel_id: str):
 
 #----------MESSAGE LOGS WEBHOOKS-------------#
 async def add_msglog_webhook(guild_id: int, webhook_url: str):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         try:
             await db.execute("INSERT INTO msglog_webhooks (guild_id, webhook_url) VALUES (?, ?)", (guild_id, webhook_url))
             await db.commit()
@@ -102,13 +109,13 @@ async def add_msglog_webhook(guild_id: int, webhook_url: str):
             await db.commit()
 
 async def get_msglog_webhooks() -> list:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         cursor = await db.execute("SELECT guild_id, webhook_url FROM msglog_webhooks")
         rows = await cursor.fetchall()
         return rows
 
 async def remove_msglog_webhook(guild_id: int):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute("DELETE FROM msglog_webhooks WHERE guild_id = ?", (guild_id,))
         await db.commit()
     
@@ -118,7 +125,7 @@ async def remove_msglog_webhook(guild_id: int):
 
 #-----------MOD LOGS-------------------#
 async def add_modlog_channel(guild_id: int, channel_id: int):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         try:
             await db.execute("INSERT INTO modlog_channels (guild_id, channel_id) VALUES (?, ?)", (guild_id, channel_id))
             await db.commit()
@@ -128,14 +135,14 @@ async def add_modlog_channel(guild_id: int, channel_id: int):
 
 
 async def get_modlog_channels() -> list:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         cursor = await db.execute("SELECT guild_id, channel_id FROM modlog_channels")
         rows = await cursor.fetchall()
         return rows
 
 
 async def remove_modlog_channel(guild_id: int):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute("DELETE FROM modlog_channels WHERE guild_id = ?", (guild_id,))
         await db.commit()
 
@@ -148,7 +155,7 @@ async def remove_modlog_channel(guild_id: int):
 #--------------------BLACKLIST-------------------------#
 
 async def get_blacklisted_users() -> list:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         async with db.execute(
             "SELECT user_id, strftime('%s', created_at) FROM blacklist"
         ) as cursor:
@@ -156,8 +163,22 @@ async def get_blacklisted_users() -> list:
             return result
 
 
+# user ids as stored in the table, None until load_blacklist() warms it
+blacklist_cache = None
+
+
+async def load_blacklist() -> set:
+    global blacklist_cache
+    async with connect(DATABASE_PATH) as db:
+        async with db.execute("SELECT user_id FROM blacklist") as cursor:
+            blacklist_cache = {str(row[0]) for row in await cursor.fetchall()}
+            return blacklist_cache
+
+
 async def is_blacklisted(user_id: int) -> bool:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    if blacklist_cache is not None:
+        return str(user_id) in blacklist_cache
+    async with connect(DATABASE_PATH) as db:
         async with db.execute(
             "SELECT * FROM blacklist WHERE user_id=?", (user_id,)
         ) as cursor:
@@ -166,9 +187,12 @@ async def is_blacklisted(user_id: int) -> bool:
 
 
 async def add_user_to_blacklist(user_id: int) -> int:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute("INSERT INTO blacklist(user_id) VALUES (?)", (user_id,))
         await db.commit()
+        if blacklist_cache is not None:
+            blacklist_cache.add(str(user_id))
+        await writes.publish("blacklist", str(user_id))
         rows = await db.execute("SELECT COUNT(*) FROM blacklist")
         async with rows as cursor:
             result = await cursor.fetchone()
@@ -176,9 +200,12 @@ async def add_user_to_blacklist(user_id: int) -> int:
 
 
 async def remove_user_from_blacklist(user_id: int) -> int:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute("DELETE FROM blacklist WHERE user_id=?", (user_id,))
         await db.commit()
+        if blacklist_cache is not None:
+            blacklist_cache.discard(str(user_id))
+        await writes.publish("blacklist", str(user_id))
         rows = await db.execute("SELECT COUNT(*) FROM blacklist")
         async with rows as cursor:
             result = await cursor.fetchone()
@@ -194,7 +221,7 @@ async def remove_user_from_blacklist(user_id: int) -> int:
 
 
 async def add_warn(user_id: int, server_id: int, moderator_id: int, reason: str) -> int:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         rows = await db.execute(
             "SELECT id FROM warns WHERE user_id=? AND server_id=? ORDER BY id DESC LIMIT 1",
             (
@@ -220,7 +247,7 @@ async def add_warn(user_id: int, server_id: int, moderator_id: int, reason: str)
 
 
 async def remove_warn(warn_id: int, user_id: int, server_id: int) -> int:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute(
             "DELETE FROM warns WHERE id=? AND user_id=? AND server_id=?",
             (
@@ -243,7 +270,7 @@ async def remove_warn(warn_id: int, user_id: int, server_id: int) -> int:
 
 
 async def get_warnings(user_id: int, server_id: int) -> list:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         rows = await db.execute(
             "SELECT user_id, server_id, moderator_id, reason, strftime('%s', created_at), id FROM warns WHERE user_id=? AND server_id=?",
             (
@@ -264,7 +291,7 @@ async def get_warnings(user_id: int, server_id: int) -> list:
 
 #-----------------------AUTO ROLES-----------------------------#
 async def add_auto_role(guild_id: str, role_id: str):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         cursor = await db.execute(
             "SELECT auto_assign_roles FROM onboarding WHERE guild_id = ?",
             (guild_id,),
@@ -294,7 +321,7 @@ async def add_auto_role(guild_id: str, role_id: str):
 
 
 async def remove_auto_role(guild_id: str, role_id: str):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         cursor = await db.execute(
             "SELECT auto_assign_roles FROM onboarding WHERE guild_id = ?",
             (guild_id,),
@@ -315,7 +342,7 @@ async def remove_auto_role(guild_id: str, role_id: str):
 
 
 async def get_auto_roles(guild_id: str) -> list:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         cursor = await db.execute(
             "SELECT auto_assign_roles FROM onboarding WHERE guild_id = ?",
             (guild_id,),
@@ -332,7 +359,7 @@ async def get_auto_roles(guild_id: str) -> list:
 
 #----------------------STICKY ROLES---------------------------#
 async def set_sticky_roles(user_id: str, guild_id: str, role_ids: str):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute(
             "INSERT INTO sticky_roles (user_id, guild_id, role_ids) VALUES (?, ?, ?) "
             "ON CONFLICT(user_id, guild_id) DO UPDATE SET role_ids = ?",
@@ -341,7 +368,7 @@ async def set_sticky_roles(user_id: str, guild_id: str, role_ids: str):
         await db.commit()
 
 async def get_sticky_roles(user_id: str, guild_id: str) -> list:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         cursor = await db.execute(
             "SELECT role_ids FROM sticky_roles WHERE user_id = ? AND guild_id = ?",
             (user_id, guild_id),
@@ -359,7 +386,7 @@ async def get_sticky_roles(user_id: str, guild_id: str) -> list:
 
 
 async def add_new_ticket(channel_id: str, user_id: str):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute(
             "INSERT INTO modmail_tickets (channel_id, user_id) VALUES (?, ?)",
             (channel_id, user_id)
@@ -372,7 +399,7 @@ async def add_new_ticket(channel_id: str, user_id: str):
 
 
 async def close_ticket(channel_id: str):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         await db.execute(
             "UPDATE modmail_tickets SET close_date = CURRENT_TIMESTAMP WHERE channel_id = ?",
             (channel_id,)
@@ -381,7 +408,7 @@ async def close_ticket(channel_id: str):
 
 
 async def get_ticket_number(channel_id: str):
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with connect(DATABASE_PATH) as db:
         async with db.execute("SELECT ticket_number FROM modmail_tickets WHERE channel_id = ?", (channel_id,)) as cursor:
             row = await cursor.fetchone()
             if row:
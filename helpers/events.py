@@ -0,0 +1,133 @@
+#----------------------ECONOMY EVENT LOG----------------------#
+# Append-only record of what actually happened in the gacha: every card dropped,
+# recycled, every stardust grant and spend. Unlike the inventory tables it is not
+# rewritten by recycling, so drop rates and stardust flows can be measured from it.
+#
+# One JSON object per line, written to logs/events/events-<date>-<pid>.jsonl. Lines
+# are buffered in memory and appended once a second off the event loop, with an fsync
+# every few seconds, so a crash loses at most FSYNC_INTERVAL seconds of events.
+#
+# Events emitted inside held() (every Database.connection() block and every operation
+# the writer applies) wait there and only reach the buffer once the writes they
+# describe have committed; a rolled back operation leaves nothing in the log.
+#
+#   {"t": 1760861234.123, "e": "drop", "u": 1234, "card": 12, "variant": 70, "holo": 1, "sig": 0}
+#
+# Event types: pull (u, n, cost), drop (u, card, variant, holo, sig[, limited, serial]),
+# recycle (u, variant, qty, stardust, source), grant (u, amount, source),
+# daily (u, amount, streak), spend (u, amount, source), adjust (u, amount, source).
+
+import asyncio
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+EVENTS_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../logs/events"
+
+FLUSH_INTERVAL = 1.0
+FSYNC_INTERVAL = 5.0
+# Flush early when this many lines are waiting
+MAX_BUFFER = 1000
+
+# lines emitted inside the innermost held() block of the running task
+_held = contextvars.ContextVar("held_events", default=None)
+
+
+class EventLog:
+    def __init__(self, path=EVENTS_PATH):
+        self.path = path
+        self.buffer = []
+        self.written = 0
+        self._file = None
+        self._file_name = None
+        self._last_fsync = 0.0
+        self._flusher = None
+        self._lock = None
+
+    def emit(self, kind: str, **fields):
+        line = json.dumps({"t": round(time.time(), 3), "e": kind, **fields}, separators=(",", ":"))
+        held = _held.get()
+        if held is not None:
+            held.append(line)
+        else:
+            self._append([line])
+
+    @contextmanager
+    def held(self):
+        """Hold back the events emitted in the block, release() the list once the writes commit."""
+        lines = []
+        token = _held.set(lines)
+        try:
+            yield lines
+        finally:
+            _held.reset(token)
+
+    def release(self, lines: list):
+        """Log held events, or pass them on to the enclosing held() block."""
+        if not lines:
+            return
+        held = _held.get()
+        if held is not None:
+            held.extend(lines)
+        else:
+            self._append(lines)
+
+    def _append(self, lines: list):
+        self.buffer.extend(lines)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # scripts without a loop flush on close()
+            return
+        if self._flusher is None or self._flusher.done():
+            self._lock = asyncio.Lock()
+            self._flusher = loop.create_task(self._flush_periodically())
+        elif len(self.buffer) >= MAX_BUFFER:
+            loop.create_task(self.flush())
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await self.flush()
+
+    async def flush(self, fsync: bool = False):
+        async with self._lock:
+            lines, self.buffer = self.buffer, []
+            if lines or fsync:
+                await asyncio.to_thread(self._write, lines, fsync)
+
+    def _write(self, lines, fsync=False):
+        # a new file per day (UTC) and per process, so shard processes never interleave
+        name = f"events-{datetime.now(timezone.utc):%Y-%m-%d}-{os.getpid()}.jsonl"
+        if name != self._file_name:
+            if self._file is not None:
+                self._file.close()
+            os.makedirs(self.path, exist_ok=True)
+            self._file = open(os.path.join(self.path, name), "a", encoding="utf-8")
+            self._file_name = name
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+            self.written += len(lines)
+        now = time.monotonic()
+        if fsync or now - self._last_fsync >= FSYNC_INTERVAL:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    async def close(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        await self.flush(fsync=bool(self.buffer) or self._file is not None)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_name = None
+
+
+events = EventLog()
@@ -0,0 +1,72 @@
+#----------------------LAZY IMPORTS----------------------#
+# Heavy optional dependencies are loaded on first use instead of at boot, and
+# `-X importtime` profiles show what the remaining cold start is spent on.
+
+import asyncio
+import importlib
+import re
+import sys
+import time
+
+# How long each lazily imported module took on first use, in seconds
+import_times = {}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+
+#----------------------LAZY MODULES----------------------#
+
+class LazyModule:
+    """Stands in for a module and imports it the first time an attribute is used."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = sys.modules.get(name)
+
+    def _load(self):
+        if self._module is None:
+            start = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            import_times[self._name] = time.perf_counter() - start
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """`PIL = lazy_import("PIL.Image")`, the import happens on the first `PIL.open(...)`."""
+    return LazyModule(name)
+
+
+
+#----------------------IMPORT PROFILING----------------------#
+
+async def import_profile(modules, cwd=None) -> list:
+    """
+    Import `modules` in a fresh interpreter with `-X importtime` and return
+    (cumulative_us, self_us, depth, module) rows, slowest first.
+    """
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}",
+        cwd=cwd,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+
+    rows = []
+    for line in stderr.decode(errors="replace").splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(cumulative_us), int(self_us), len(indent) // 2, module))
+    if process.returncode and not rows:
+        raise RuntimeError(stderr.decode(errors="replace").strip().splitlines()[-1])
+    rows.sort(reverse=True)
+    return rows
@@ -0,0 +1,162 @@
+#----------------------DATABASE MAINTENANCE----------------------#
+# Keeps the WAL short under constant writes and tidies the database once a day.
+#
+# Checkpoints follow the WAL size: nothing while it is small, PASSIVE (never waits
+# for readers or writers) once it grows, TRUNCATE (waits up to busy_timeout, then
+# shrinks the -wal file to zero) when it is large or PASSIVE keeps being starved.
+# In the quiet hours (GMT+8, well after the daily reset rush) PRAGMA optimize and an
+# incremental vacuum run as well. All of it uses its own sqlite3 connection on a
+# worker thread, so the shared connection never queues behind a checkpoint.
+
+import asyncio
+import os
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from helpers.connection import connect_sync
+from helpers.metrics import metrics
+
+DATABASE_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../database/database.db"
+
+GMT8 = ZoneInfo("Asia/Singapore")
+
+# WAL sizes that trigger a PASSIVE and a TRUNCATE checkpoint
+PASSIVE_BYTES = 4 * 1024 * 1024
+TRUNCATE_BYTES = 64 * 1024 * 1024
+# PASSIVE checkpoints in a row that could not copy every frame before TRUNCATE is forced
+MAX_INCOMPLETE = 5
+# Seconds between checks, shorter while the WAL is above PASSIVE_BYTES
+CHECK_INTERVAL = 60
+BUSY_INTERVAL = 15
+# Hours (GMT+8) in which the daily optimize and vacuum may run
+QUIET_HOURS = range(4, 6)
+# Free pages returned to the filesystem per quiet-hours run
+VACUUM_PAGES = 4096
+
+Checkpoint = namedtuple("Checkpoint", "mode wal_before wal_after frames checkpointed busy seconds")
+
+
+def wal_size(db_path: str = DATABASE_PATH) -> int:
+    try:
+        return os.path.getsize(db_path + "-wal")
+    except OSError:
+        return 0
+
+
+def open_connection(db_path: str) -> sqlite3.Connection:
+    return connect_sync(db_path, timeout=30, isolation_level=None)
+
+
+
+#----------------------CHECKPOINT AND VACUUM----------------------#
+
+def checkpoint(db_path: str, mode: str = "PASSIVE") -> Checkpoint:
+    before = wal_size(db_path)
+    start = time.perf_counter()
+    conn = open_connection(db_path)
+    try:
+        busy, frames, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    finally:
+        conn.close()
+    seconds = time.perf_counter() - start
+    metrics.observe("checkpoint", mode.lower(), seconds)
+    return Checkpoint(mode, before, wal_size(db_path), frames, checkpointed, bool(busy), seconds)
+
+
+def optimize(db_path: str, vacuum_pages: int = VACUUM_PAGES) -> dict:
+    """PRAGMA optimize, then an incremental vacuum if the database was created for it."""
+    start = time.perf_counter()
+    conn = open_connection(db_path)
+    try:
+        conn.execute("PRAGMA optimize")
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        incremental = conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        if incremental and freelist:
+            # execute() stops after the first freed page, executescript() runs it to the end
+            conn.executescript(f"PRAGMA incremental_vacuum({int(vacuum_pages)});")
+        remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        "freed_pages": freelist - remaining,
+        "free_pages": remaining,
+        "incremental": incremental,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def enable_incremental_vacuum(db_path: str) -> float:
+    """
+    Switch the database to auto_vacuum=INCREMENTAL. Needs a full VACUUM, which
+    rewrites the file and blocks writers while it runs, so it is only done on request.
+    """
+    start = time.perf_counter()
+    conn = open_connection(db_path)
+    try:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    return time.perf_counter() - start
+
+
+
+#----------------------SCHEDULER----------------------#
+
+class Maintenance:
+    def __init__(self, db_path: str = DATABASE_PATH):
+        self.db_path = db_path
+        self.incomplete = 0
+        self.last_checkpoint = None
+        self.last_quiet = None
+        self.quiet_day = None
+
+    def choose_mode(self, wal_bytes: int):
+        if wal_bytes >= TRUNCATE_BYTES or self.incomplete >= MAX_INCOMPLETE:
+            return "TRUNCATE"
+        last = self.last_checkpoint
+        if last and last.mode == "PASSIVE" and not self.incomplete and wal_bytes >= PASSIVE_BYTES:
+            # every frame was copied but the file keeps its size, truncating it is cheap now
+            return "TRUNCATE"
+        if wal_bytes >= PASSIVE_BYTES:
+            return "PASSIVE"
+        return None
+
+    async def run_checkpoint(self, mode: str) -> Checkpoint:
+        result = await asyncio.to_thread(checkpoint, self.db_path, mode)
+        # busy, or readers still on old snapshots kept frames from being copied
+        if result.busy or result.checkpointed < result.frames:
+            self.incomplete += 1
+        else:
+            self.incomplete = 0
+        self.last_checkpoint = result
+        metrics.set("database", "wal", result.wal_after)
+        return result
+
+    async def tick(self, now: datetime = None):
+        """One scheduled check. Returns (checkpoint or None, quiet-hours result or None, seconds to the next check)."""
+        size = wal_size(self.db_path)
+        metrics.set("database", "wal", size)
+        mode = self.choose_mode(size)
+        result = await self.run_checkpoint(mode) if mode else None
+
+        quiet = None
+        now = (now or datetime.now(GMT8)).astimezone(GMT8)
+        if now.hour in QUIET_HOURS and self.quiet_day != now.date():
+            self.quiet_day = now.date()
+            quiet = await asyncio.to_thread(optimize, self.db_path)
+            quiet["checkpoint"] = await self.run_checkpoint("TRUNCATE")
+            self.last_quiet = (now, quiet)
+
+        try:
+            metrics.set("database", "db", os.path.getsize(self.db_path))
+        except OSError:
+            pass
+        busy = wal_size(self.db_path) >= PASSIVE_BYTES or self.incomplete
+        return result, quiet, BUSY_INTERVAL if busy else CHECK_INTERVAL
+
+
+maintenance = Maintenance()
@@ -0,0 +1,214 @@
+#----------------------LATENCY METRICS----------------------#
+
+import functools
+import re
+import time
+from contextlib import contextmanager
+
+from helpers.lazy import lazy_import
+from helpers.slowlog import slow_queries
+
+# only needed when the metrics endpoint is enabled
+web = lazy_import("aiohttp.web")
+
+
+# Upper bounds (seconds) shared by every histogram
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# family -> (prometheus metric name, label name, help text)
+FAMILIES = {
+    "command": ("kiichu_command_duration_seconds", "command", "Wall time per command invocation."),
+    "interaction": ("kiichu_interaction_duration_seconds", "callback", "Wall time per view/select callback."),
+    "query": ("kiichu_query_duration_seconds", "statement", "Wall time per SQL statement issued through Database."),
+    "checkpoint": ("kiichu_wal_checkpoint_duration_seconds", "mode", "Wall time per WAL checkpoint."),
+}
+
+
+# counter -> (prometheus metric name, label name, help text)
+COUNTERS = {
+    "messages": ("kiichu_messages_total", "outcome", "Gateway messages by pre-filter outcome."),
+}
+
+
+# gauge -> (prometheus metric name, label name, help text)
+GAUGES = {
+    "database": ("kiichu_database_bytes", "file", "Size of the database file and of its WAL."),
+    "views": ("kiichu_open_views", "view", "Open interactive views by type."),
+    "view_bytes": ("kiichu_open_view_bytes", "view", "Approximate memory held by open interactive views, by type."),
+}
+
+
+#----------------------HISTOGRAM----------------------#
+
+class Histogram:
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, bound in enumerate(BUCKETS):
+            if seen + self.counts[i] >= rank:
+                inside = (rank - seen) / self.counts[i] if self.counts[i] else 0
+                return lower + (bound - lower) * inside
+            seen += self.counts[i]
+            lower = bound
+        return BUCKETS[-1]
+
+
+
+#----------------------REGISTRY----------------------#
+
+class Metrics:
+    def __init__(self):
+        self.families = {family: {} for family in FAMILIES}
+        self.counters = {counter: {} for counter in COUNTERS}
+        self.gauges = {gauge: {} for gauge in GAUGES}
+
+    def observe(self, family: str, label: str, seconds: float):
+        histograms = self.families[family]
+        histogram = histograms.get(label)
+        if histogram is None:
+            histogram = histograms[label] = Histogram()
+        histogram.observe(seconds)
+
+    def count(self, counter: str, label: str):
+        counts = self.counters[counter]
+        counts[label] = counts.get(label, 0) + 1
+
+    def set(self, gauge: str, label: str, value: float):
+        self.gauges[gauge][label] = value
+
+    @contextmanager
+    def timed(self, family: str, label: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(family, label, time.perf_counter() - start)
+
+    def top(self, family: str, limit: int = 10):
+        """(label, histogram) pairs with the most total time first."""
+        return sorted(self.families[family].items(), key=lambda item: item[1].total, reverse=True)[:limit]
+
+    def reset(self):
+        for histograms in self.families.values():
+            histograms.clear()
+        for counts in self.counters.values():
+            counts.clear()
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for family, (name, label_name, help_text) in FAMILIES.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for label, histogram in self.families[family].items():
+                label_value = escape_label(label)
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label_name}="{label_value}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{label_name}="{label_value}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{{label_name}="{label_value}"}} {histogram.total}')
+                lines.append(f'{name}_count{{{label_name}="{label_value}"}} {histogram.count}')
+        for counter, (name, label_name, help_text) in COUNTERS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for label, count in self.counters[counter].items():
+                lines.append(f'{name}{{{label_name}="{escape_label(label)}"}} {count}')
+        for gauge, (name, label_name, help_text) in GAUGES.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for label, value in self.gauges[gauge].items():
+                lines.append(f'{name}{{{label_name}="{escape_label(label)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace so the same statement always maps to one label."""
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+
+#----------------------INSTRUMENTATION HOOKS----------------------#
+
+def instrumented(func):
+    """Time a view or select callback under its qualified name."""
+    label = func.__qualname__.replace(".<locals>", "")
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with metrics.timed("interaction", label):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+class InstrumentedConnection:
+    """Wraps a shared aiosqlite connection, times every statement and feeds the slow query log."""
+
+    def __init__(self, conn):
+        self._wrapped = conn
+
+    def __getattr__(self, name):
+        return getattr(self._wrapped, name)
+
+    async def execute(self, sql, parameters=None):
+        start = time.perf_counter()
+        try:
+            return await self._wrapped.execute(sql, parameters)
+        finally:
+            self._observe(sql, parameters, time.perf_counter() - start, many=False)
+
+    async def executemany(self, sql, parameters):
+        start = time.perf_counter()
+        try:
+            return await self._wrapped.executemany(sql, parameters)
+        finally:
+            self._observe(sql, parameters, time.perf_counter() - start, many=True)
+
+    def _observe(self, sql, parameters, seconds, many):
+        normalized = normalize_sql(sql)
+        metrics.observe("query", normalized, seconds)
+        slow_queries.record(self._wrapped, sql, normalized, parameters, seconds, many)
+
+
+
+#----------------------/METRICS ENDPOINT----------------------#
+
+async def start_metrics_server(port: int, host: str = "127.0.0.1") -> "web.AppRunner":
+    async def handle(request):
+        return web.Response(text=metrics.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
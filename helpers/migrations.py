@@ -0,0 +1,72 @@
+#----------------------SCHEMA MIGRATIONS----------------------#
+# Numbered scripts in database/migrations/ (0001_initial.sql, 0002_...) are applied
+# in order, each in its own transaction, and PRAGMA user_version records the last one.
+
+import asyncio
+import os
+import re
+import sqlite3
+
+from helpers.connection import connect_sync
+
+MIGRATIONS_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../database/migrations"
+
+_migrated = set()
+
+
+
+def load_migrations(path: str = MIGRATIONS_PATH) -> list:
+    """(version, name, sql) for every migration file, sorted by version."""
+    migrations = []
+    for file in os.listdir(path):
+        match = re.fullmatch(r"(\d+)_(\w+)\.sql", file)
+        if not match:
+            continue
+        with open(os.path.join(path, file), encoding="utf-8") as handle:
+            migrations.append((int(match.group(1)), match.group(2), handle.read()))
+    migrations.sort()
+
+    versions = [version for version, _, _ in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Duplicate migration versions in {path}")
+    return migrations
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations: list = None) -> list:
+    """Apply every migration newer than the database's user_version, return the applied ones."""
+    migrations = load_migrations() if migrations is None else migrations
+    current = schema_version(conn)
+    applied = []
+    for version, name, sql in migrations:
+        if version <= current:
+            continue
+        try:
+            conn.executescript(f"BEGIN;\n{sql}\n;PRAGMA user_version = {version};\nCOMMIT;")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        applied.append((version, name))
+    return applied
+
+
+async def migrate(db_path: str) -> list:
+    """Bring `db_path` up to date, at most once per process."""
+    key = os.path.realpath(db_path)
+    if key in _migrated:
+        return []
+
+    def run():
+        conn = connect_sync(db_path, isolation_level=None)
+        try:
+            return apply_migrations(conn)
+        finally:
+            conn.close()
+
+    applied = await asyncio.to_thread(run)
+    _migrated.add(key)
+    return applied
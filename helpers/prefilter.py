@@ -0,0 +1,42 @@
+#----------------------MESSAGE PRE-FILTER----------------------#
+# Most gateway messages need no work from the bot. dispatch() drops them before any
+# listener task is created: messages from bots, and messages that are neither in a
+# channel some cog listens to nor start with the prefix of their guild. Cogs register
+# their channels with listen_in_channels() in cog_load and forget them in cog_unload.
+
+from helpers.metrics import metrics
+from helpers.prefixes import prefixes
+
+
+class MessagePrefilter:
+    """Mixed into the bot class ahead of the discord.py bot it filters for."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # channels where some cog wants every message, not only commands
+        self.channel_listeners = {}
+        self.listened_channels = frozenset()
+
+    def listen_in_channels(self, name: str, channel_ids) -> None:
+        self.channel_listeners[name] = frozenset(channel_ids)
+        self.listened_channels = frozenset().union(*self.channel_listeners.values())
+
+    def forget_channels(self, name: str) -> None:
+        self.channel_listeners.pop(name, None)
+        self.listened_channels = frozenset().union(*self.channel_listeners.values())
+
+    def dispatch(self, event_name: str, /, *args, **kwargs) -> None:
+        # drop messages nobody will act on before any listener task is created
+        if event_name == "message" and not self.wants_message(args[0]):
+            return
+        super().dispatch(event_name, *args, **kwargs)
+
+    def wants_message(self, message) -> bool:
+        if message.author.bot:
+            metrics.count("messages", "bot")
+            return False
+        if message.channel.id in self.listened_channels or message.content.startswith(prefixes.resolve(message)):
+            metrics.count("messages", "processed")
+            return True
+        metrics.count("messages", "filtered")
+        return False
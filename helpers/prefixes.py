@@ -0,0 +1,38 @@
+#----------------------PREFIX REGISTRY----------------------#
+# Prefix tuples are built once, when they change, instead of for every message.
+# A guild with a custom prefix only answers to it, every other guild and DMs
+# answer to the default prefix and to a bot mention.
+
+import os
+
+from helpers.connection import connect
+
+DATABASE_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../database/database.db"
+
+
+class PrefixRegistry:
+    def __init__(self):
+        self.default_prefix = None
+        self.default = ()
+        self.by_guild = {}
+
+    def configure(self, default_prefix: str, bot_id: int):
+        self.default_prefix = default_prefix
+        self.default = (default_prefix, f"<@{bot_id}> ")
+
+    async def load(self, db_path: str = DATABASE_PATH):
+        async with connect(db_path) as db:
+            async with db.execute("SELECT server_id, prefix FROM prefixes") as cursor:
+                self.by_guild = {int(server_id): (prefix,) for server_id, prefix in await cursor.fetchall()}
+
+    def set(self, server_id, prefix: str):
+        self.by_guild[int(server_id)] = (prefix,)
+
+    def resolve(self, message) -> tuple:
+        guild = message.guild
+        if guild is None:
+            return self.default
+        return self.by_guild.get(guild.id, self.default)
+
+
+prefixes = PrefixRegistry()
@@ -0,0 +1,26 @@
+#----------------------DROP RATES----------------------#
+# Pull price and default drop rates, shared by the gacha cog and the offline tools
+# (db_generate.py, analytics.py) so those can run without importing discord.
+# A banner can override the rates per banner, see helpers/banners.py.
+
+# Card Drop ratess
+LIMITED_CARD_RATE = 0 # 0 for now, until we decide to add it to the game
+LIMITED_CARD_FALLBACK = True
+HOLO_DROP_RATE = 0.2
+SIGNED_DROP_RATE = 0.2
+GOLDEN_SIGNED_CHANCE = 0.1
+
+# Cost of one card pull
+PULL_COST = 100
+
+
+def variant_probability(holo_type, signature_type):
+    """Chance that a regular pull lands on this holo/signature combination."""
+    holo = HOLO_DROP_RATE if holo_type == 1 else 1 - HOLO_DROP_RATE
+    if signature_type == 0:
+        sig = 1 - SIGNED_DROP_RATE
+    elif signature_type == 1:
+        sig = SIGNED_DROP_RATE * (1 - GOLDEN_SIGNED_CHANCE)
+    else:
+        sig = SIGNED_DROP_RATE * GOLDEN_SIGNED_CHANCE
+    return holo * sig
@@ -0,0 +1,58 @@
+#----------------------RENDER CACHE----------------------#
+# Embeds and view parts that only change with the catalog (the banner card list, card
+# previews) or never (help), built once and handed out as copies. An entry is built
+# again when the catalog version it was built for is no longer current, when it is
+# older than its max_age, or after invalidate().
+
+import time
+
+from helpers.catalog import catalog
+
+_MISSING = object()
+
+
+class RenderCache:
+    def __init__(self):
+        # key -> (catalog version, built at, value)
+        self.entries = {}
+        self.hits = 0
+        self.builds = 0
+
+    def _current(self, key, max_age):
+        entry = self.entries.get(key)
+        if entry is None:
+            return _MISSING
+        version, built_at, value = entry
+        if version != catalog.version or (max_age is not None and time.monotonic() - built_at >= max_age):
+            return _MISSING
+        self.hits += 1
+        return value
+
+    def _store(self, key, value):
+        self.builds += 1
+        self.entries[key] = (catalog.version, time.monotonic(), value)
+        return value
+
+    def get(self, key, build, max_age: float = None):
+        """The cached value for `key`, calling build() if there is no current one."""
+        value = self._current(key, max_age)
+        return self._store(key, build()) if value is _MISSING else value
+
+    async def get_async(self, key, build, max_age: float = None):
+        """get() for builders that have to query the database."""
+        value = self._current(key, max_age)
+        return self._store(key, await build()) if value is _MISSING else value
+
+    def embed(self, key, build, max_age: float = None):
+        """A copy of a cached embed, callers may change it freely."""
+        return self.get(key, build, max_age).copy()
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+
+
+render_cache = RenderCache()
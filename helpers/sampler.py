@@ -0,0 +1,50 @@
+#----------------------WEIGHTED SAMPLING----------------------#
+# Walker's alias method: O(n) to build, then every draw is one uniform index and one
+# coin flip, however many cards there are. Tables are built when a pool is built
+# (once per catalog version) and never changed afterwards, so pulls can share them.
+
+import random
+from array import array
+
+
+class AliasSampler:
+    __slots__ = ("items", "probability", "alias")
+
+    def __init__(self, items, weights=None):
+        """`items` are ids (u32), `weights` their relative weights (all equal if left out)."""
+        self.items = array("I", items)
+        count = len(self.items)
+        weights = [1.0] * count if weights is None else [float(weight) for weight in weights]
+        if len(weights) != count:
+            raise ValueError("Every item needs a weight")
+        if any(weight < 0 for weight in weights):
+            raise ValueError("Weights cannot be negative")
+        total = sum(weights)
+        if count and total <= 0:
+            raise ValueError("At least one weight has to be positive")
+
+        self.probability = array("d", [1.0]) * count
+        self.alias = array("I", range(count))
+        # Vose's variant: split into columns under and over the average, pair them off
+        scaled = [weight * count / total for weight in weights]
+        small = [i for i, weight in enumerate(scaled) if weight < 1.0]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1.0]
+        while small and large:
+            under, over = small.pop(), large.pop()
+            self.probability[under] = scaled[under]
+            self.alias[under] = over
+            scaled[over] -= 1.0 - scaled[under]
+            (small if scaled[over] < 1.0 else large).append(over)
+        # whatever is left is 1.0 up to rounding, those columns keep their own item
+
+    def __len__(self):
+        return len(self.items)
+
+    def sample(self, rng=random):
+        column = int(rng.random() * len(self.items))
+        if rng.random() >= self.probability[column]:
+            column = self.alias[column]
+        return self.items[column]
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in (self.items, self.probability, self.alias))
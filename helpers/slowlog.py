@@ -0,0 +1,152 @@
+#----------------------SLOW QUERY LOG----------------------#
+
+import asyncio
+import atexit
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../logs/slow_queries.log"
+
+# Statements slower than this are recorded
+DEFAULT_THRESHOLD_MS = 50
+# Re-run EXPLAIN QUERY PLAN for the same statement at most this often
+PLAN_TTL = 600
+
+
+
+#----------------------HELPERS----------------------#
+
+def parameters_shape(parameters, many=False) -> str:
+    """Describe parameters by type only, e.g. `(int, str)` or `[12 x (int, int)]`."""
+    if many:
+        # executemany already consumed a generator or iterator, only its type is left
+        if not isinstance(parameters, (list, tuple)):
+            return f"[{type(parameters).__name__}]"
+        first = parameters_shape(parameters[0]) if parameters else "()"
+        return f"[{len(parameters)} x {first}]"
+    if parameters is None:
+        return "()"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+
+
+def format_plan(rows) -> str:
+    """Render EXPLAIN QUERY PLAN rows (id, parent, notused, detail) as an indented tree."""
+    depth = {0: -1}
+    lines = []
+    for row in rows:
+        node_id, parent, _, detail = tuple(row)
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return "\n".join(lines)
+
+
+
+#----------------------SLOW QUERY LOG----------------------#
+
+class SlowStatement:
+    __slots__ = ("sql", "count", "total", "max", "shape", "plan", "planned_at")
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.shape = "()"
+        self.plan = None
+        self.planned_at = None
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms=DEFAULT_THRESHOLD_MS, log_path=LOG_PATH):
+        self.threshold = threshold_ms / 1000
+        self.log_path = log_path
+        self.statements = {}
+        self._logger = None
+        self._listener = None
+        self._pending = set()
+
+    def configure(self, threshold_ms=None, log_path=None):
+        if threshold_ms is not None:
+            self.threshold = threshold_ms / 1000
+        if log_path is not None:
+            self.log_path = log_path
+            self._logger = None
+
+    @property
+    def logger(self) -> logging.Logger:
+        if self._logger is None:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            logger = logging.getLogger("KiichuBot.slowqueries")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+            self.close()
+            handler = RotatingFileHandler(self.log_path, maxBytes=1_000_000, backupCount=5, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("[{asctime}] {message}", "%Y-%m-%d %H:%M:%S", style="{"))
+            # same setup as the bot logger: the event loop only enqueues, the file is written on the listener's thread
+            log_queue = queue.SimpleQueue()
+            self._listener = QueueListener(log_queue, handler)
+            self._listener.start()
+            logger.addHandler(QueueHandler(log_queue))
+            self._logger = logger
+        return self._logger
+
+    def close(self):
+        """Write out queued records and stop the listener thread."""
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+
+    def record(self, conn, sql, normalized, parameters, seconds, many=False):
+        """Called for every statement, only does work when it ran over the threshold."""
+        if seconds < self.threshold:
+            return
+
+        entry = self.statements.get(normalized)
+        if entry is None:
+            entry = self.statements[normalized] = SlowStatement(normalized)
+        entry.count += 1
+        entry.total += seconds
+        entry.max = max(entry.max, seconds)
+        entry.shape = parameters_shape(parameters, many)
+
+        # capturing the plan goes through the same connection, so do it off the caller's path
+        now = time.monotonic()
+        if entry.planned_at is None or now - entry.planned_at > PLAN_TTL:
+            entry.planned_at = now
+            if many:
+                sample = parameters[0] if isinstance(parameters, (list, tuple)) and parameters else None
+            else:
+                sample = parameters
+            task = asyncio.create_task(self._explain_and_log(conn, sql, sample, entry, seconds))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+        else:
+            self.logger.info(f"{seconds * 1000:.1f}ms {entry.shape} {normalized}")
+
+    async def _explain_and_log(self, conn, sql, parameters, entry, seconds):
+        try:
+            cursor = await conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters or ())
+            entry.plan = format_plan(await cursor.fetchall())
+        except Exception as e:
+            entry.plan = f"(no plan: {e})"
+        self.logger.info(f"{seconds * 1000:.1f}ms {entry.shape} {entry.sql}\n{entry.plan}")
+
+    def top(self, limit=10):
+        return sorted(self.statements.values(), key=lambda entry: entry.total, reverse=True)[:limit]
+
+    def reset(self):
+        self.statements.clear()
+
+
+slow_queries = SlowQueryLog()
+atexit.register(slow_queries.close)
@@ -0,0 +1,309 @@
+#----------------------CATALOG SNAPSHOT FILE----------------------#
+# The card catalog as one read-only binary file that every process maps with mmap,
+# so shard processes and side workers share one copy in the page cache instead of
+# each building dicts from SQLite. Lookups read straight out of the mapping.
+#
+# Layout (little-endian, every section 8-byte aligned):
+#
+#   header            magic "KCAT", format, catalog version, section count
+#   section table     (offset, byte length) per entry of SECTIONS
+#   card_ids          u32 per card, sorted           -> row in `cards`
+#   cards             CARD record per card, same order
+#   variant_ids       u32 per variant, sorted        -> row in `variants`
+#   variants          VARIANT record per variant, same order
+#   variant_keys      u64 (card_id << 16 | holo << 8 | signature), sorted, generation 999 left out
+#   variant_key_ids   u32 variant id per key, same order
+#   regular_card_ids  u32 ids of the cards that are not limited
+#   banner_ids        u32 per banner, sorted
+#   banner_starts     u32 per banner + 1, slice bounds into banner_cards
+#   banner_cards      u32 card ids grouped by banner, sorted within a banner
+#   strings           UTF-8 text referenced by (offset, length) pairs, deduplicated
+#
+# Every version is its own file, `<base>.<version>`, written under a temporary name and
+# renamed into place, so nothing is ever renamed over a file a process has mapped
+# (Windows refuses that). Processes that still map an older version keep reading it
+# until they map the newest; the writer deletes all but the last KEEP_VERSIONS, and
+# leaves a file it cannot delete yet (still mapped on Windows) for the next round.
+
+import bisect
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from collections import namedtuple
+from collections.abc import Mapping
+
+# weight is the card's drop weight in the standard pool, 1.0 unless cards.drop_weight says otherwise
+Card = namedtuple("Card", "id name image_url artist_name banner_id is_limited max_copies weight", defaults=(1.0,))
+Variant = namedtuple("Variant", "id card_id holo_type signature_type image_url generation")
+
+MAGIC = b"KCAT"
+FORMAT = 2
+
+# Versions kept on disk, the newest and the one processes may still be mapping
+KEEP_VERSIONS = 2
+
+SECTIONS = (
+    "card_ids", "cards", "variant_ids", "variants", "variant_keys", "variant_key_ids",
+    "regular_card_ids", "banner_ids", "banner_starts", "banner_cards", "strings",
+)
+
+HEADER = struct.Struct("<4sHHQI4x")
+SECTION = struct.Struct("<QQ")
+# banner_id, max_copies (-1 = none), is_limited, weight, then (offset, length) of name, image_url, artist_name
+CARD = struct.Struct("<IiB3xfIIIIII")
+# card_id, holo_type, signature_type, generation (-1 = none), then (offset, length) of image_url
+VARIANT = struct.Struct("<IBB2xiII")
+
+# offset of a NULL string
+NULL = 0xFFFFFFFF
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def variant_key(card_id: int, holo_type: int, signature_type: int) -> int:
+    return card_id << 16 | holo_type << 8 | signature_type
+
+
+
+#----------------------WRITING----------------------#
+
+class _Strings:
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = {}
+
+    def add(self, text):
+        if text is None:
+            return NULL, 0
+        encoded = str(text).encode("utf-8")
+        offset = self.offsets.get(encoded)
+        if offset is None:
+            offset = self.offsets[encoded] = len(self.data)
+            self.data += encoded
+        return offset, len(encoded)
+
+
+def build_snapshot(cards, variants, version: int) -> bytes:
+    cards = sorted(cards, key=lambda card: card.id)
+    variants = sorted(variants, key=lambda variant: variant.id)
+    strings = _Strings()
+
+    card_records = bytearray()
+    for card in cards:
+        card_records += CARD.pack(
+            card.banner_id or 0,
+            -1 if card.max_copies is None else card.max_copies,
+            1 if card.is_limited else 0,
+            card.weight,
+            *strings.add(card.name), *strings.add(card.image_url), *strings.add(card.artist_name),
+        )
+
+    variant_records = bytearray()
+    for variant in variants:
+        variant_records += VARIANT.pack(
+            variant.card_id,
+            variant.holo_type,
+            variant.signature_type,
+            -1 if variant.generation is None else variant.generation,
+            *strings.add(variant.image_url),
+        )
+
+    # the first variant wins for a key, like the dict this replaced
+    keyed = {}
+    for variant in variants:
+        if variant.generation != 999:
+            keyed.setdefault(variant_key(variant.card_id, variant.holo_type, variant.signature_type), variant.id)
+    keys = sorted(keyed)
+
+    banners = {}
+    for card in cards:
+        banners.setdefault(card.banner_id or 0, []).append(card.id)
+    banner_ids = sorted(banners)
+    banner_starts, banner_cards = [0], []
+    for banner_id in banner_ids:
+        banner_cards.extend(banners[banner_id])
+        banner_starts.append(len(banner_cards))
+
+    sections = {
+        "card_ids": array("I", [card.id for card in cards]).tobytes(),
+        "cards": bytes(card_records),
+        "variant_ids": array("I", [variant.id for variant in variants]).tobytes(),
+        "variants": bytes(variant_records),
+        "variant_keys": array("Q", keys).tobytes(),
+        "variant_key_ids": array("I", [keyed[key] for key in keys]).tobytes(),
+        "regular_card_ids": array("I", [card.id for card in cards if not card.is_limited]).tobytes(),
+        "banner_ids": array("I", banner_ids).tobytes(),
+        "banner_starts": array("I", banner_starts).tobytes(),
+        "banner_cards": array("I", banner_cards).tobytes(),
+        "strings": bytes(strings.data),
+    }
+
+    table_end = HEADER.size + SECTION.size * len(SECTIONS)
+    body = bytearray()
+    table = bytearray()
+    for name in SECTIONS:
+        body += b"\0" * (-(table_end + len(body)) % 8)
+        table += SECTION.pack(table_end + len(body), len(sections[name]))
+        body += sections[name]
+    return HEADER.pack(MAGIC, FORMAT, 0, version, len(SECTIONS)) + bytes(table) + bytes(body)
+
+
+def snapshot_file(base: str, version: int) -> str:
+    return f"{base}.{version}"
+
+
+def snapshot_versions(base: str) -> list:
+    """Versions with a snapshot file next to `base`, oldest first."""
+    directory, name = os.path.split(os.path.abspath(base))
+    pattern = re.compile(rf"{re.escape(name)}\.(\d+)")
+    try:
+        files = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted(int(match.group(1)) for match in map(pattern.fullmatch, files) if match)
+
+
+def latest_snapshot(base: str):
+    """Path of the newest snapshot file, None if there is none."""
+    versions = snapshot_versions(base)
+    return snapshot_file(base, versions[-1]) if versions else None
+
+
+def write_snapshot(base: str, cards, variants, version: int) -> str:
+    """Write version `version` to its own file and return its path, readers never see a partial file."""
+    if sys.byteorder != "little":
+        raise SnapshotError("Catalog snapshots are only supported on little-endian hosts")
+    data = build_snapshot(cards, variants, version)
+    path = snapshot_file(base, version)
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(partial, path)
+    return path
+
+
+def prune_snapshots(base: str, keep: int = KEEP_VERSIONS):
+    """Delete all but the newest `keep` versions, skipping files that are still mapped."""
+    for version in snapshot_versions(base)[:-keep]:
+        try:
+            os.remove(snapshot_file(base, version))
+        except OSError:
+            pass
+
+
+
+#----------------------READING----------------------#
+
+class CatalogSnapshot:
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise SnapshotError("Catalog snapshots are only supported on little-endian hosts")
+        with open(path, "rb") as handle:
+            try:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise SnapshotError(f"{path} is empty") from e
+        view = memoryview(self._mmap)
+        try:
+            magic, file_format, _, self.version, count = HEADER.unpack_from(view, 0)
+            if magic != MAGIC or file_format != FORMAT or count != len(SECTIONS):
+                raise SnapshotError(f"{path} is not a catalog snapshot this version can read")
+            sections = {}
+            for i, name in enumerate(SECTIONS):
+                offset, length = SECTION.unpack_from(view, HEADER.size + i * SECTION.size)
+                if offset + length > len(view):
+                    raise SnapshotError(f"{path} is truncated")
+                sections[name] = view[offset:offset + length]
+        except struct.error as e:
+            raise SnapshotError(f"{path} is truncated") from e
+
+        self.path = path
+        self.card_ids = sections["card_ids"].cast("I")
+        self._cards = sections["cards"]
+        self.variant_ids = sections["variant_ids"].cast("I")
+        self._variants = sections["variants"]
+        self.variant_keys = sections["variant_keys"].cast("Q")
+        self.variant_key_ids = sections["variant_key_ids"].cast("I")
+        self.regular_card_ids = sections["regular_card_ids"].cast("I")
+        self.banner_ids = sections["banner_ids"].cast("I")
+        self.banner_starts = sections["banner_starts"].cast("I")
+        self._banner_cards = sections["banner_cards"].cast("I")
+        self._strings = sections["strings"]
+
+        self.cards = RecordView(self.card_ids, self.card)
+        self.variants = RecordView(self.variant_ids, self.variant)
+
+    def string(self, offset: int, length: int):
+        if offset == NULL:
+            return None
+        return str(self._strings[offset:offset + length], "utf-8")
+
+    def _row(self, ids, record_id: int):
+        row = bisect.bisect_left(ids, record_id)
+        return row if row < len(ids) and ids[row] == record_id else None
+
+    def card(self, card_id: int):
+        row = self._row(self.card_ids, card_id)
+        if row is None:
+            return None
+        banner_id, max_copies, is_limited, weight, *text = CARD.unpack_from(self._cards, row * CARD.size)
+        return Card(
+            card_id, self.string(text[0], text[1]), self.string(text[2], text[3]), self.string(text[4], text[5]),
+            banner_id, is_limited, None if max_copies < 0 else max_copies, weight,
+        )
+
+    def variant(self, variant_id: int):
+        row = self._row(self.variant_ids, variant_id)
+        if row is None:
+            return None
+        card_id, holo_type, signature_type, generation, offset, length = VARIANT.unpack_from(
+            self._variants, row * VARIANT.size
+        )
+        return Variant(
+            variant_id, card_id, holo_type, signature_type, self.string(offset, length),
+            None if generation < 0 else generation,
+        )
+
+    def variant_id(self, card_id: int, holo_type: int, signature_type: int):
+        key = variant_key(card_id, holo_type, signature_type)
+        row = bisect.bisect_left(self.variant_keys, key)
+        if row < len(self.variant_keys) and self.variant_keys[row] == key:
+            return self.variant_key_ids[row]
+        return None
+
+    def banner_cards(self, banner_id: int):
+        """Card ids of a banner, a zero-copy view."""
+        row = self._row(self.banner_ids, banner_id)
+        if row is None:
+            return self._banner_cards[0:0]
+        return self._banner_cards[self.banner_starts[row]:self.banner_starts[row + 1]]
+
+
+class RecordView(Mapping):
+    """Read-only id -> record mapping over a snapshot section."""
+
+    def __init__(self, ids, lookup):
+        self._ids = ids
+        self._lookup = lookup
+
+    def __getitem__(self, record_id):
+        record = self._lookup(record_id)
+        if record is None:
+            raise KeyError(record_id)
+        return record
+
+    def __contains__(self, record_id):
+        return self._lookup(record_id) is not None
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
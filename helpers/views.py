@@ -0,0 +1,144 @@
+#----------------------OPEN VIEW REGISTRY----------------------#
+# Interactive views keep their pages and data until they time out, so a run of
+# !collection or !pull 10 can pin a lot of memory. The registry tracks the live ones
+# per user and per view type and caps them: opening one more evicts the oldest, which
+# is stopped and left on its message with its components disabled. It also keeps an
+# estimate of what the open views hold on to.
+
+import asyncio
+import json
+import sqlite3
+import sys
+from array import array
+from collections import OrderedDict
+
+import discord
+
+from helpers.metrics import metrics
+
+# Open views of one type a single user may keep, the oldest is evicted first
+MAX_PER_USER = 2
+# Open views of one type across every user
+MAX_PER_TYPE = 200
+
+
+class _Entry:
+    __slots__ = ("user_id", "message", "bytes")
+
+    def __init__(self, user_id, message, size):
+        self.user_id = user_id
+        self.message = message
+        self.bytes = size
+
+
+
+#----------------------MEMORY ESTIMATE----------------------#
+
+def estimate(value, depth: int = 0) -> int:
+    """Approximate bytes of the data a view holds. Shared objects (bot, cog, members) are not counted."""
+    if depth > 6 or value is None:
+        return 0
+    if isinstance(value, (str, bytes, int, float)):
+        return sys.getsizeof(value)
+    if isinstance(value, discord.Embed):
+        return len(json.dumps(value.to_dict()))
+    if isinstance(value, discord.SelectOption):
+        return sum(sys.getsizeof(text) for text in (value.label, value.value, value.description) if text)
+    if isinstance(value, array):
+        return value.itemsize * len(value)
+    if hasattr(value, "nbytes") and callable(value.nbytes):
+        return value.nbytes()
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate(item, depth + 1) for item in value.values())
+    if isinstance(value, (list, tuple, sqlite3.Row)):
+        return sys.getsizeof(value) + sum(estimate(item, depth + 1) for item in value)
+    return 0
+
+
+def retained_bytes(view: discord.ui.View) -> int:
+    size = sum(estimate(value) for value in vars(view).values())
+    for item in view.children:
+        size += sum(estimate(option) for option in getattr(item, "options", ()))
+        size += sum(estimate(value) for value in vars(item).values() if not isinstance(value, discord.ui.View))
+    return size
+
+
+
+#----------------------REGISTRY----------------------#
+
+class ViewRegistry:
+    def __init__(self, max_per_user: int = MAX_PER_USER, max_per_type: int = MAX_PER_TYPE):
+        self.max_per_user = max_per_user
+        self.max_per_type = max_per_type
+        # view type name -> {view: entry}, oldest first
+        self.live = {}
+        self.evicted = {}
+
+    def register(self, view: discord.ui.View, user_id: int, message=None):
+        """Track a view that was just sent, evicting older ones past the caps."""
+        kind = type(view).__name__
+        live = self.live.setdefault(kind, OrderedDict())
+
+        # a view sent in place of another on the same message replaces it
+        if message is not None:
+            for other, entry in list(live.items()):
+                if entry.message is not None and entry.message.id == message.id:
+                    del live[other]
+                    other.stop()
+
+        live[view] = _Entry(user_id, message, retained_bytes(view))
+        mine = [other for other, entry in live.items() if entry.user_id == user_id]
+        for other in mine[:-self.max_per_user]:
+            self.evict(other)
+        while len(live) > self.max_per_type:
+            self.evict(next(iter(live)))
+
+        asyncio.get_running_loop().create_task(self._forget_when_done(view))
+        self._report(kind)
+
+    def evict(self, view: discord.ui.View):
+        kind = type(view).__name__
+        entry = self.live.get(kind, {}).pop(view, None)
+        if entry is None:
+            return
+        self.evicted[kind] = self.evicted.get(kind, 0) + 1
+        for item in view.children:
+            if hasattr(item, "disabled"):
+                item.disabled = True
+        view.stop()
+        if entry.message is not None:
+            asyncio.get_running_loop().create_task(self._show_disabled(entry.message, view))
+        self._report(kind)
+
+    async def _show_disabled(self, message, view):
+        try:
+            await message.edit(view=view)
+        except discord.HTTPException:
+            # deleted message or expired interaction, nothing left to disable
+            pass
+
+    async def _forget_when_done(self, view):
+        # returns on timeout and on stop(), eviction included
+        await view.wait()
+        kind = type(view).__name__
+        if self.live.get(kind, {}).pop(view, None) is not None:
+            self._report(kind)
+
+    def _report(self, kind: str):
+        live = self.live.get(kind, {})
+        metrics.set("views", kind, len(live))
+        metrics.set("view_bytes", kind, sum(entry.bytes for entry in live.values()))
+
+    def summary(self) -> list:
+        """(view type, open views, approximate bytes, evicted so far), measured now."""
+        rows = []
+        for kind in sorted(set(self.live) | set(self.evicted)):
+            live = self.live.get(kind, {})
+            for view, entry in live.items():
+                entry.bytes = retained_bytes(view)
+            self._report(kind)
+            rows.append((kind, len(live), sum(entry.bytes for entry in live.values()), self.evicted.get(kind, 0)))
+        return rows
+
+
+views = ViewRegistry()
@@ -3,16 +3,21 @@
 # DEV: Angryappleseed (angryappleseed on discord)
 # Last Updated: Feb 28, 2024
 from signal import SIGINT, SIGTERM
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import contextlib
 from contextlib import asynccontextmanager
 import aiosqlite
+import argparse
 import asyncio
+import atexit
 import json
 import logging
 import os
 import sys
+import time
 
 import platform
+import queue
 import random
 
 import discord
@@ -20,9 +25,19 @@ from discord.ext import commands, tasks
 from discord.ext.commands import Bot, Context
 
 import helpers.exceptions as exceptions
+from helpers import database
+from helpers.banners import banners
+from helpers.catalog import catalog
+from helpers.coordinator import writes
+from helpers.events import events
 from datetime import datetime
 from helpers.colors import colors
 from helpers.emotes import emotes
+from helpers.metrics import metrics, start_metrics_server
+from helpers.migrations import migrate
+from helpers.prefilter import MessagePrefilter
+from helpers.prefixes import prefixes
+from helpers.slowlog import slow_queries
 
 
 # ------------------INTENTS---------------------#
@@ -46,41 +61,65 @@ else:
         
 #--------------Default Prefix in Config.json--------------------#
 default_prefix = config["prefix"]
+
+
+#------------------SHARDING (set by cluster.py)-----------------#
+# With no arguments the bot runs as one process with every shard, as before.
+
+arguments = argparse.ArgumentParser(description="Run KiichuBot.")
+arguments.add_argument("--shards", help="comma separated shard ids this process handles")
+arguments.add_argument("--shard-count", type=int, help="total shards across all processes")
+arguments.add_argument("--writer", help="host:port of the writer process")
+arguments = arguments.parse_args()
+
+shard_ids = [int(shard) for shard in arguments.shards.split(",")] if arguments.shards else None
     
 
 #----------------------------KIICHUBOT-----------------------------#
 
-class KiichuBot(commands.Bot):
+class KiichuBot(MessagePrefilter, commands.AutoShardedBot):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.log_channel = {} 
         self.active_ban_votes = {}
+        self.metrics_runner = None
+        self.boot_timings = {}
+        self.cog_load_times = {}
+
+    async def setup_hook(self):
+        slow_queries.configure(threshold_ms=self.config.get("slow_query_ms"))
+        await boot()
+
+        # local Prometheus endpoint, only when a port is configured
+        metrics_port = self.config.get("metrics_port")
+        if metrics_port:
+            self.metrics_runner = await start_metrics_server(int(metrics_port))
+            self.logger.info(f"Serving metrics on http://127.0.0.1:{metrics_port}/metrics")
+
+    async def close(self):
+        await writes.close()
+        await events.close()
+        if self.metrics_runner:
+            await self.metrics_runner.cleanup()
+        await super().close()
 
 # -------------------GET SERVER PREFIXES---------------------------#
     
     async def get_custom_prefix(self, message):
-        bot_mention = f'<@{self.user.id}> '
-        prefixes = [self.default_prefix, bot_mention]
-
-        if message.guild is not None:
-            server_id = str(message.guild.id)
-            custom_prefix = self.custom_prefixes.get(server_id)
-            if custom_prefix:
-                prefixes = [custom_prefix]
-
-        return tuple(prefixes)
+        return prefixes.resolve(message)
 
 
 
 bot = KiichuBot(command_prefix=KiichuBot.get_custom_prefix, 
                  intents=intents, 
                  help_command=None,
-                 case_insensitive=True)
+                 case_insensitive=True,
+                 shard_ids=shard_ids,
+                 shard_count=arguments.shard_count)
 
 
 
 bot.default_prefix = default_prefix
-bot.custom_prefixes = {}
 bot.config = config
 
 
@@ -104,14 +143,21 @@ class LoggingFormatter(logging.Formatter):
         logging.CRITICAL: red + bold,
     }
 
+    def __init__(self):
+        super().__init__()
+        # one ready-made formatter per level instead of building one for every record
+        self.formatters = {
+            level: logging.Formatter(
+                f"{self.black}{self.bold}{{asctime}}{self.reset} {color}{{levelname:<8}}{self.reset} "
+                f"{self.green}{self.bold}{{name}}{self.reset} {{message}}",
+                "%Y-%m-%d %H:%M:%S",
+                style="{",
+            )
+            for level, color in self.COLORS.items()
+        }
+
     def format(self, record):
-        log_color = self.COLORS[record.levelno]
-        format = "(black){asctime}(reset) (levelcolor){levelname:<8}(reset) (green){name}(reset) {message}"
-        format = format.replace("(black)", self.black + self.bold)
-        format = format.replace("(reset)", self.reset)
-        format = format.replace("(levelcolor)", log_color)
-        format = format.replace("(green)", self.green + self.bold)
-        formatter = logging.Formatter(format, "%Y-%m-%d %H:%M:%S", style="{")
+        formatter = self.formatters.get(record.levelno) or self.formatters[logging.INFO]
         return formatter.format(record)
 
 
@@ -121,14 +167,21 @@ logger.setLevel(logging.INFO)
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(LoggingFormatter())
 
-file_handler = logging.FileHandler(filename="discord.log", encoding="utf-8", mode="w")
+file_handler = RotatingFileHandler(
+    filename="discord.log", encoding="utf-8", maxBytes=5_000_000, backupCount=3
+)
 file_handler_formatter = logging.Formatter(
     "[{asctime}] [{levelname:<8}] {name}: {message}", "%Y-%m-%d %H:%M:%S", style="{"
 )
 file_handler.setFormatter(file_handler_formatter)
 
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+# the event loop only enqueues records, console and file writes happen on the listener's thread
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+logger.addHandler(QueueHandler(log_queue))
 bot.logger = logger
 
 
@@ -139,20 +192,71 @@ bot.logger = logger
 #-------------------------------LOAD DATABASE--------------------------#
 
 async def init_db():
-    async with aiosqlite.connect(
+    # Apply any pending numbered migrations from database/migrations
+    applied = await migrate(
         f"{os.path.realpath(os.path.dirname(__file__))}/database/database.db"
-    ) as db:
-        # Enable WAL mode and set busy timeout
-        await db.execute("PRAGMA journal_mode=WAL;")
-        await db.execute("PRAGMA busy_timeout=5000;")
-        
-        with open(
-            f"{os.path.realpath(os.path.dirname(__file__))}/database/schema.sql"
-        ) as file:
-            await db.executescript(file.read())
-        await db.commit()
+    )
+    for version, name in applied:
+        bot.logger.info(f"Applied database migration {version:04d}_{name}")
+
+
+
+
+
+#-----------------------------BOOT SEQUENCE-----------------------------#
+
+async def timed_step(timings: dict, name: str, coro):
+    start = time.perf_counter()
+    result = await coro
+    timings[name] = time.perf_counter() - start
+    return result
 
 
+async def load_catalog(timings: dict):
+    # shard processes map the snapshot the writer exported, a lone process builds it
+    await timed_step(timings, "catalog", catalog.attach() if arguments.writer else catalog.load())
+    # banner pools are built from the catalog
+    await timed_step(timings, "banners", banners.load())
+
+
+async def warm_database(timings: dict):
+    # everything that reads the database has to wait for the migrations
+    await timed_step(timings, "migrations", init_db())
+    await asyncio.gather(
+        timed_step(timings, "prefixes", prefixes.load()),
+        load_catalog(timings),
+        timed_step(timings, "blacklist", database.load_blacklist()),
+    )
+
+
+async def connect_writer(timings: dict):
+    # other shard processes publish when they change a cache this process also holds
+    writes.subscribe("blacklist", lambda key: database.load_blacklist())
+    writes.subscribe("banners", lambda key: banners.load())
+    writes.subscribe("catalog", lambda key: catalog.attach())
+    # callbacks run in order, the pools are rebuilt from the catalog just attached
+    writes.subscribe("catalog", lambda key: banners.load())
+    writes.subscribe("prefixes", lambda key: prefixes.load())
+    if arguments.writer:
+        host, port = arguments.writer.rsplit(":", 1)
+        await timed_step(timings, "writer", writes.connect(host, int(port)))
+
+
+async def boot():
+    # runs once, inside bot.run's event loop, before the gateway connects
+    timings = {}
+    start = time.perf_counter()
+    prefixes.configure(bot.default_prefix, bot.user.id)
+    await connect_writer(timings)
+    await asyncio.gather(
+        warm_database(timings),
+        timed_step(timings, "cogs", load_cogs()),
+    )
+    total = time.perf_counter() - start
+    bot.boot_timings = dict(timings, total=total)
+    steps = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items())
+    bot.logger.info(f"Boot finished in {total * 1000:.0f}ms ({steps})")
+
 
 
 
@@ -161,11 +265,6 @@ async def init_db():
 @bot.event
 async def on_ready():
     
-    # Initialize the database
-    await init_db()
-    # Load server prefixes
-    await load_prefixes()
-    
     statuses = ["with your feelings~", "Palworld!", "Tetrio :D", "League of Legends"]
     selected_status = random.choice(statuses)
     await bot.change_presence(
@@ -211,6 +310,19 @@ async def on_disconnect():
     pass
 
 
+#-----------------------COMMAND TIMING-------------------------#
+@bot.before_invoke
+async def start_command_timer(context: Context) -> None:
+    context.started_at = time.perf_counter()
+
+
+@bot.after_invoke
+async def stop_command_timer(context: Context) -> None:
+    started_at = getattr(context, "started_at", None)
+    if started_at is not None:
+        metrics.observe("command", context.command.qualified_name, time.perf_counter() - started_at)
+
+
 #---------------------ON COMMAND COMPLETION--------------------#
 @bot.event
 async def on_command_completion(context: Context) -> None:
@@ -351,32 +463,25 @@ async def on_command_error(context: commands.Context, error) -> None:
 #
 
 #-----------------------------LOAD COGS-------------------------------------#
-async def load_cogs() -> None:
-    for file in os.listdir(f"{os.path.realpath(os.path.dirname(__file__))}/cogs"):
-        if file.endswith(".py"):
-            extension = file[:-3]
-            try:
-                await bot.load_extension(f"cogs.{extension}")
-                bot.logger.info(f"Loaded extension: '{extension}'")
-            except Exception as e:
-                exception = f"{type(e).__name__}: {e}"
-                bot.logger.error(f"Failed to load extension: {extension}\n{exception}")
-
+async def load_cog(extension: str) -> None:
+    start = time.perf_counter()
+    try:
+        await bot.load_extension(f"cogs.{extension}")
+        bot.cog_load_times[extension] = time.perf_counter() - start
+        bot.logger.info(f"Loaded extension: '{extension}' in {bot.cog_load_times[extension] * 1000:.0f}ms")
+    except Exception as e:
+        exception = f"{type(e).__name__}: {e}"
+        bot.logger.error(f"Failed to load extension: {extension}\n{exception}")
 
 
-#-----------------------------LOAD PREFIXES--------------------------------#
-async def load_prefixes() -> None:
-    async with aiosqlite.connect(
-        f"{os.path.realpath(os.path.dirname(__file__))}/database/database.db"
-    ) as db:
-        async with db.execute("SELECT * FROM prefixes") as cursor:
-            rows = await cursor.fetchall()
-            for row in rows:
-                bot.custom_prefixes[row[0]] = row[1]
+async def load_cogs() -> None:
+    await asyncio.gather(*(
+        load_cog(file[:-3])
+        for file in os.listdir(f"{os.path.realpath(os.path.dirname(__file__))}/cogs")
+        if file.endswith(".py")
+    ))
 
 
 
-# RUN THE BOT
-asyncio.run(init_db())
-asyncio.run(load_cogs())
+# RUN THE BOT (database, caches and cogs are set up in setup_hook, on the same loop)
 bot.run(config["token"])
@@ -0,0 +1,309 @@
+#------------------------GACHA LOAD TEST--------------------------#
+# Drives the Gacha cog with fake contexts, messages and interactions against a
+# temporary SQLite database, then reports latency and queue wait per command.
+#
+#   python loadtest.py --users 500 --cards 60 --mix mixed --ops 2000 --concurrency 32
+
+import argparse
+import asyncio
+import contextvars
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import aiosqlite
+
+import cogs.gacha as gacha
+from cogs.gacha import Database, Gacha
+from db_generate import generate
+from helpers.backup import extract
+from helpers.banners import banners
+from helpers.catalog import catalog
+from helpers.events import events
+from helpers.migrations import migrate
+
+# (operation, weight) pairs replayed by the workers
+TRAFFIC_MIXES = {
+    "chat": [("on_message", 1)],
+    "pulls": [("pull", 1)],
+    "leaderboard": [("leaderboard", 1)],
+    "mixed": [
+        ("on_message", 70),
+        ("pull", 10),
+        ("dailies", 5),
+        ("collection", 8),
+        ("collection_page", 4),
+        ("leaderboard", 3),
+    ],
+}
+
+current_op = contextvars.ContextVar("current_op", default=None)
+
+
+
+#----------------------FAKE DISCORD OBJECTS----------------------#
+
+class FakeAsset:
+    def __init__(self, url):
+        self.url = url
+
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.bot = False
+        self.name = f"user{user_id}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+        self.display_avatar = FakeAsset(f"https://cdn.example/avatars/{user_id}.png")
+
+
+class FakeMessage:
+    def __init__(self, author=None, channel=None, content=""):
+        self.id = random.getrandbits(48)
+        self.author = author
+        self.channel = channel
+        self.content = content
+
+    async def edit(self, **kwargs):
+        return self
+
+    async def delete(self, delay=None):
+        pass
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = 0
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+        return FakeMessage(channel=self)
+
+
+class FakeContext:
+    def __init__(self, author, channel):
+        self.author = author
+        self.channel = channel
+        self.guild = None
+        self.message = FakeMessage(author, channel)
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(kwargs.get("view"))
+        return FakeMessage(channel=self.channel)
+
+
+class FakeResponse:
+    def __init__(self):
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def edit_message(self, **kwargs):
+        self._done = True
+
+    async def send_message(self, *args, **kwargs):
+        self._done = True
+
+    async def defer(self, **kwargs):
+        self._done = True
+
+
+class FakeFollowup:
+    async def edit_message(self, **kwargs):
+        pass
+
+    async def send(self, *args, **kwargs):
+        pass
+
+
+class FakeInteraction:
+    def __init__(self, user):
+        self.user = user
+        self.guild = None
+        self.message = FakeMessage(user)
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+
+
+class FakeBot:
+    async def fetch_user(self, user_id):
+        return FakeUser(user_id)
+
+    def get_user(self, user_id):
+        return FakeUser(user_id)
+
+
+
+#----------------------QUEUE WAIT PROBE----------------------#
+
+class QueueProbe:
+    """Records how long each statement waits in the aiosqlite worker queue."""
+
+    def __init__(self):
+        self.waits = {}
+
+    def attach(self, conn: aiosqlite.Connection):
+        original = conn._execute
+
+        async def timed_execute(fn, *args, **kwargs):
+            queued_at = time.perf_counter()
+            op = current_op.get()
+
+            def run():
+                self.waits.setdefault(op, []).append(time.perf_counter() - queued_at)
+                return fn(*args, **kwargs)
+
+            return await original(run)
+
+        conn._execute = timed_execute
+
+
+
+#----------------------TEMPORARY DATABASE----------------------#
+
+def seed_database(db_path, users, cards, seed=0):
+    """Generate a synthetic database and give every user enough stardust to keep pulling."""
+    generate(db_path, users, cards, seed, log=lambda *args: None)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE users SET currency = 1000000000")
+
+
+
+#----------------------TRAFFIC----------------------#
+
+async def run_op(cog, op, user):
+    command_channel = FakeChannel(gacha.COMMAND_CHANNELS[0])
+
+    if op == "on_message":
+        channel = FakeChannel(random.choice(gacha.STARDUST_CHANNELS))
+        await cog.on_message(FakeMessage(user, channel, "hello"))
+    elif op == "pull":
+        await Gacha.pull.callback(cog, FakeContext(user, command_channel), 10, banner=None)
+    elif op == "dailies":
+        await Gacha.dailies.callback(cog, FakeContext(user, command_channel))
+    elif op == "collection":
+        await Gacha.collection.callback(cog, FakeContext(user, command_channel))
+    elif op == "collection_page":
+        # open a collection, then page through it and toggle the sort order
+        ctx = FakeContext(user, command_channel)
+        await Gacha.collection.callback(cog, ctx)
+        view = ctx.sent[-1] if ctx.sent else None
+        if view is not None:
+            if not view.next_button.disabled:
+                await view.go_next(FakeInteraction(user))
+            await view.toggle_sort_order(FakeInteraction(user))
+    elif op == "leaderboard":
+        board = random.choice(list(gacha.LEADERBOARD_TYPES))
+        await Gacha.leaderboard.callback(cog, FakeContext(user, command_channel), board, random.randint(1, 5))
+
+
+async def worker(cog, mix, user_ids, remaining, latencies, errors):
+    ops, weights = zip(*mix)
+    while remaining[0] > 0:
+        remaining[0] -= 1
+        op = random.choices(ops, weights)[0]
+        user = FakeUser(random.choice(user_ids))
+        token = current_op.set(op)
+        start = time.perf_counter()
+        try:
+            await run_op(cog, op, user)
+        except Exception as e:
+            errors[op] = errors.get(op, 0) + 1
+            if errors[op] == 1:
+                print(f"{op} failed: {type(e).__name__}: {e}")
+        finally:
+            latencies.setdefault(op, []).append(time.perf_counter() - start)
+            current_op.reset(token)
+
+
+
+#----------------------REPORT----------------------#
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def print_report(latencies, waits, errors, elapsed):
+    total = sum(len(v) for v in latencies.values())
+    print(f"\n{total} operations in {elapsed:.2f}s ({total / elapsed:.1f} ops/s)\n")
+    header = f"{'command':<16}{'count':>7}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'qwait p50':>11}{'qwait p99':>11}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for op in sorted(latencies):
+        values = latencies[op]
+        op_waits = waits.get(op, [])
+        print(
+            f"{op:<16}{len(values):>7}{len(values) / elapsed:>9.1f}"
+            f"{percentile(values, 50) * 1000:>9.2f}{percentile(values, 95) * 1000:>9.2f}{percentile(values, 99) * 1000:>9.2f}"
+            f"{percentile(op_waits, 50) * 1000:>11.3f}{percentile(op_waits, 99) * 1000:>11.3f}{errors.get(op, 0):>8}"
+        )
+
+
+
+#----------------------MAIN----------------------#
+
+async def run(args):
+    random.seed(args.seed)
+    workdir = tempfile.mkdtemp(prefix="kiichu-loadtest-")
+    db_path = args.db or os.path.join(workdir, "loadtest.db")
+    if args.db and args.db.endswith(".gz"):
+        # replay against a copy of a production backup
+        db_path = os.path.join(workdir, "loadtest.db")
+        extract(args.db, db_path)
+    elif not args.db:
+        seed_database(db_path, args.users, args.cards, args.seed)
+    with sqlite3.connect(db_path) as conn:
+        user_ids = [int(row[0]) for row in conn.execute("SELECT discord_id FROM users LIMIT ?", (args.users,))]
+
+    # point the cog's shared connection at the test database
+    gacha.DATABASE_PATH = db_path
+    await Database.close()
+    # a backup may predate the newest migrations
+    await migrate(db_path)
+    await catalog.load(db_path)
+    await banners.load(db_path)
+    events.path = os.path.join(workdir, "events")
+    probe = QueueProbe()
+    probe.attach((await Database.get_connection())._wrapped)
+
+    cog = Gacha(FakeBot())
+    latencies, errors = {}, {}
+    remaining = [args.ops]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(cog, TRAFFIC_MIXES[args.mix], user_ids, remaining, latencies, errors)
+        for _ in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    await Database.close()
+    await events.close()
+    print_report(latencies, probe.waits, errors, elapsed)
+    print(f"\nEvent log: {events.path} ({events.written} events)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay synthetic Discord traffic against the Gacha cog.")
+    parser.add_argument("--users", type=int, default=500, help="number of seeded users")
+    parser.add_argument("--cards", type=int, default=60, help="number of seeded cards (six variants each)")
+    parser.add_argument("--mix", choices=sorted(TRAFFIC_MIXES), default="mixed", help="traffic mix to replay")
+    parser.add_argument("--ops", type=int, default=2000, help="total operations to run")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent simulated clients")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--db", help="run against an existing database file (it will be written to) or a copy of a .db.gz backup")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
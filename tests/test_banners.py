@@ -0,0 +1,90 @@
+#----------------------BANNER SCHEDULE----------------------#
+
+import asyncio
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from helpers.banners import Banner, BannerSchedule, live_banners
+from helpers.catalog import catalog
+from helpers.migrations import apply_migrations
+
+
+def banner_database(path, cards=()) -> str:
+    """A migrated database with `cards` as (id, drop_weight) in the default banner."""
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        apply_migrations(conn)
+        # stands in for a database that predates the CHECK on cards.drop_weight
+        conn.execute("PRAGMA ignore_check_constraints = ON")
+        conn.executemany(
+            "INSERT INTO cards (id, name, image_url, artist_name, drop_weight) VALUES (?, 'Kii', '', 'Seed', ?)",
+            cards,
+        )
+    finally:
+        conn.close()
+    return str(path)
+
+
+def load(db_path) -> BannerSchedule:
+    schedule = BannerSchedule(db_path)
+
+    async def run():
+        await catalog.load(db_path)
+        await schedule.load()
+
+    asyncio.run(run())
+    return schedule
+
+
+def test_negative_drop_weight_is_rejected(tmp_path):
+    conn = sqlite3.connect(banner_database(tmp_path / "banners.db"))
+    try:
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO cards (name, image_url, artist_name, drop_weight) VALUES ('Kii', '', 'Seed', -1)")
+    finally:
+        conn.close()
+
+
+def test_invalid_weights_are_left_out_instead_of_failing_load(tmp_path, caplog):
+    schedule = load(banner_database(tmp_path / "banners.db", cards=((1, -2.0), (2, 1.0))))
+
+    assert "Card 1 has drop weight -2.0" in caplog.text
+    assert {schedule.standard.random_card() for _ in range(50)} == {2}
+    assert {schedule.pool(1).random_card() for _ in range(50)} == {2}
+
+
+def test_newest_open_ended_banner_replaces_older_ones():
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    first = Banner(1, "Casual Kiichan", datetime(2025, 1, 1, tzinfo=timezone.utc), None)
+    second = Banner(2, "Spring", datetime(2026, 2, 1, tzinfo=timezone.utc), None)
+    event = Banner(3, "Event", datetime(2026, 2, 20, tzinfo=timezone.utc), datetime(2026, 3, 5, tzinfo=timezone.utc))
+    upcoming = Banner(4, "Summer", datetime(2026, 6, 1, tzinfo=timezone.utc), None)
+    banners = (first, second, event, upcoming)
+
+    assert live_banners(banners, now) == [event, second]
+    # once its window closes only the newest open-ended banner is left
+    assert live_banners(banners, datetime(2026, 4, 1, tzinfo=timezone.utc)) == [second]
+    assert live_banners(banners, datetime(2026, 6, 2, tzinfo=timezone.utc)) == [upcoming]
+
+
+def test_store_active_marks_only_the_newest_open_ended_banner(tmp_path):
+    db_path = banner_database(tmp_path / "banners.db")
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        # add_banner leaves end_date NULL
+        conn.execute("UPDATE banners SET start_date = '2025-01-01 00:00:00' WHERE id = 1")
+        conn.execute("INSERT INTO banners (id, name, start_date) VALUES (2, 'Spring', '2026-02-01 00:00:00')")
+    finally:
+        conn.close()
+
+    schedule = load(db_path)
+    asyncio.run(schedule.tick(now=datetime(2026, 3, 1, tzinfo=timezone.utc), persist=True))
+
+    assert schedule.live_ids == (2,)
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT id FROM banners WHERE is_active").fetchall() == [(2,)]
+    finally:
+        conn.close()
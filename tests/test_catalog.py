@@ -0,0 +1,55 @@
+#----------------------CATALOG VARIANTS----------------------#
+# Variants a pull creates after the snapshot was taken are registered with the
+# catalog, and forgotten again when the writer rolls back.
+
+import asyncio
+import sqlite3
+
+import cogs.gacha as gacha
+from cogs.gacha import Database, Gacha
+from helpers.catalog import catalog
+from helpers.coordinator import writes
+from helpers.migrations import apply_migrations
+
+
+def card_database(path) -> str:
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        apply_migrations(conn)
+        conn.execute(
+            "INSERT INTO cards (id, name, image_url, artist_name) VALUES (1, 'Kii', 'https://cdn.example/1.png', 'Seed')"
+        )
+    finally:
+        conn.close()
+    return str(path)
+
+
+def test_new_variant_is_registered_and_forgotten_on_rollback(tmp_path, monkeypatch):
+    db_path = card_database(tmp_path / "catalog.db")
+    monkeypatch.setattr(gacha, "DATABASE_PATH", db_path)
+    monkeypatch.setattr(gacha, "HOLO_DROP_RATE", 0)
+    monkeypatch.setattr(gacha, "SIGNED_DROP_RATE", 0)
+
+    async def run():
+        await Database.close()
+        await catalog.load(db_path)
+        try:
+            async with Database.connection() as db:
+                variant_id, *_ = await Gacha(None).generate_card_variant(db, 1234)
+        finally:
+            await Database.close()
+        return variant_id
+
+    variant_id = asyncio.run(run())
+
+    assert catalog.variant_id(1, 0, 0) == variant_id
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT image_url FROM card_variants WHERE id = ?", (variant_id,)).fetchone() == (
+            "https://cdn.example/1.png",
+        )
+    finally:
+        conn.close()
+
+    writes.rolled_back()
+    assert catalog.variant_id(1, 0, 0) is None
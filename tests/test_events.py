@@ -0,0 +1,75 @@
+#----------------------ECONOMY EVENTS----------------------#
+# Events are only logged for writes that committed: held() keeps them back until
+# release(), and the writer drops the events of an operation it rolls back.
+
+import asyncio
+import json
+import os
+
+from helpers.connection import connect
+from helpers.coordinator import BatchedConnection, WriteCoordinator, WriterServer
+from helpers.events import EventLog, events
+
+
+def logged(path) -> list:
+    lines = []
+    for name in sorted(os.listdir(path)):
+        with open(os.path.join(path, name), encoding="utf-8") as handle:
+            lines.extend(json.loads(line) for line in handle)
+    return lines
+
+
+def test_held_events_wait_for_release():
+    log = EventLog()
+    with log.held() as outer:
+        with log.held() as inner:
+            log.emit("grant", u=1, amount=100, source="test")
+        assert log.buffer == [] and outer == []
+        # a released inner block hands its events to the enclosing one
+        log.release(inner)
+        assert len(outer) == 1 and log.buffer == []
+    log.release(outer)
+    assert [json.loads(line)["e"] for line in log.buffer] == ["grant"]
+
+
+def test_dropped_block_logs_nothing():
+    log = EventLog()
+    with log.held():
+        log.emit("drop", u=1, card=2, variant=3, holo=0, sig=0)
+    assert log.buffer == []
+
+
+def test_writer_drops_events_of_rolled_back_operations(tmp_path, monkeypatch):
+    monkeypatch.setattr(events, "path", str(tmp_path / "events"))
+    monkeypatch.setattr(events, "buffer", [])
+
+    async def grant(db, user_id):
+        await db.execute("INSERT INTO grants (user_id) VALUES (?)", (user_id,))
+        events.emit("grant", u=user_id, amount=100, source="test")
+
+    async def failing_grant(db, user_id):
+        await grant(db, user_id)
+        raise ValueError("rolled back")
+
+    async def run():
+        coordinator = WriteCoordinator()
+        coordinator.operation("grant", grant)
+        coordinator.operation("failing_grant", failing_grant)
+        async with connect(str(tmp_path / "writer.db"), isolation_level=None) as conn:
+            await conn.execute("CREATE TABLE grants (user_id INTEGER)")
+            server = WriterServer(coordinator, BatchedConnection(conn))
+            replies = await server._apply([
+                (None, {"id": 1, "op": "grant", "args": [1]}),
+                (None, {"id": 2, "op": "failing_grant", "args": [2]}),
+                (None, {"id": 3, "op": "grant", "args": [3]}),
+            ])
+            cursor = await conn.execute("SELECT user_id FROM grants ORDER BY user_id")
+            rows = [row[0] for row in await cursor.fetchall()]
+        await events.close()
+        return replies, rows
+
+    replies, rows = asyncio.run(run())
+
+    assert "error" in replies[1][1]
+    assert rows == [1, 3]
+    assert [event["u"] for event in logged(tmp_path / "events")] == [1, 3]
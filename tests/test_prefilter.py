@@ -0,0 +1,92 @@
+#----------------------MESSAGE PRE-FILTER----------------------#
+
+from types import SimpleNamespace
+
+import pytest
+
+from cogs.gacha import COMMAND_CHANNEL_IDS, POINT_CHANNEL_IDS
+from helpers.metrics import metrics
+from helpers.prefilter import MessagePrefilter
+from helpers.prefixes import prefixes
+
+GUILD = 42
+QUIET_CHANNEL = 1
+
+
+class DispatchRecorder:
+    """Stands in for the discord.py bot, records what reaches its dispatch()."""
+
+    def __init__(self):
+        self.dispatched = []
+
+    def dispatch(self, event_name, /, *args, **kwargs):
+        self.dispatched.append((event_name, args))
+
+
+class FilteredBot(MessagePrefilter, DispatchRecorder):
+    pass
+
+
+def message(content="hello", channel=QUIET_CHANNEL, bot=False, guild=GUILD):
+    return SimpleNamespace(
+        content=content,
+        author=SimpleNamespace(bot=bot),
+        channel=SimpleNamespace(id=channel),
+        guild=SimpleNamespace(id=guild) if guild else None,
+    )
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    monkeypatch.setattr(prefixes, "default", ("k!", "<@99> "))
+    monkeypatch.setattr(prefixes, "by_guild", {GUILD: ("?",)})
+    metrics.reset()
+    bot = FilteredBot()
+    # what the gacha cog registers in cog_load
+    bot.listen_in_channels("gacha", POINT_CHANNEL_IDS | COMMAND_CHANNEL_IDS)
+    yield bot
+    metrics.reset()
+
+
+def dispatched_messages(bot) -> list:
+    return [args[0] for event_name, args in bot.dispatched if event_name == "message"]
+
+
+def test_bot_authors_are_dropped(bot):
+    bot.dispatch("message", message("?pull", channel=next(iter(COMMAND_CHANNEL_IDS)), bot=True))
+    assert dispatched_messages(bot) == []
+    assert metrics.counters["messages"] == {"bot": 1}
+
+
+def test_chatter_outside_listened_channels_is_dropped(bot):
+    bot.dispatch("message", message("hello"))
+    # the default prefix does not count in a guild with its own
+    bot.dispatch("message", message("k!pull"))
+    assert dispatched_messages(bot) == []
+    assert metrics.counters["messages"] == {"filtered": 2}
+
+
+def test_listened_channels_and_prefixed_messages_pass(bot):
+    passing = [
+        message("hello", channel=next(iter(POINT_CHANNEL_IDS))),
+        message("hello", channel=next(iter(COMMAND_CHANNEL_IDS))),
+        message("?pull"),
+        message("k!pull", guild=None),
+    ]
+    for passed in passing:
+        bot.dispatch("message", passed)
+    assert dispatched_messages(bot) == passing
+    assert metrics.counters["messages"] == {"processed": 4}
+
+
+def test_other_events_are_not_filtered(bot):
+    bot.dispatch("ready")
+    assert bot.dispatched == [("ready", ())]
+    assert metrics.counters["messages"] == {}
+
+
+def test_forgotten_channels_stop_passing(bot):
+    bot.forget_channels("gacha")
+    bot.dispatch("message", message("hello", channel=next(iter(POINT_CHANNEL_IDS))))
+    assert dispatched_messages(bot) == []
+    assert metrics.counters["messages"] == {"filtered": 1}
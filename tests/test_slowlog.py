@@ -0,0 +1,42 @@
+#----------------------SLOW QUERY LOG----------------------#
+
+import asyncio
+from logging.handlers import QueueHandler
+
+import helpers.metrics as metrics_module
+from helpers.connection import connect
+from helpers.metrics import InstrumentedConnection
+from helpers.slowlog import SlowQueryLog
+
+
+def test_records_go_through_a_queue_to_the_file(tmp_path):
+    log_path = tmp_path / "slow_queries.log"
+    slow_log = SlowQueryLog(log_path=str(log_path))
+    try:
+        assert [type(handler) for handler in slow_log.logger.handlers] == [QueueHandler]
+        slow_log.logger.info("75.0ms (int) SELECT * FROM users WHERE discord_id = ?")
+    finally:
+        slow_log.close()
+
+    assert "SELECT * FROM users WHERE discord_id = ?" in log_path.read_text(encoding="utf-8")
+
+
+def test_executemany_with_a_generator_is_recorded(tmp_path, monkeypatch):
+    slow_log = SlowQueryLog(threshold_ms=0, log_path=str(tmp_path / "slow_queries.log"))
+    monkeypatch.setattr(metrics_module, "slow_queries", slow_log)
+
+    async def run():
+        async with connect(str(tmp_path / "slow.db")) as conn:
+            db = InstrumentedConnection(conn)
+            await db.execute("CREATE TABLE grants (user_id INTEGER)")
+            await db.executemany("INSERT INTO grants (user_id) VALUES (?)", ((user_id,) for user_id in range(3)))
+            await asyncio.gather(*slow_log._pending)
+            cursor = await db.execute("SELECT COUNT(*) FROM grants")
+            return (await cursor.fetchone())[0]
+
+    try:
+        assert asyncio.run(run()) == 3
+    finally:
+        slow_log.close()
+
+    assert slow_log.statements["INSERT INTO grants (user_id) VALUES (?)"].shape == "[generator]"
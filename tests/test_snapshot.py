@@ -0,0 +1,53 @@
+#----------------------CATALOG SNAPSHOT FILE----------------------#
+
+import os
+
+from helpers import snapshot
+from helpers.snapshot import (
+    Card, CatalogSnapshot, Variant, latest_snapshot, prune_snapshots, snapshot_versions, write_snapshot,
+)
+
+CARDS = [Card(1, "Kii", "https://cdn.example/1.png", "Seed", 1, 0, None)]
+VARIANTS = [Variant(1, 1, 0, 0, "https://cdn.example/1.png", 1)]
+
+
+def test_each_version_gets_its_own_file(tmp_path, monkeypatch):
+    base = str(tmp_path / "database.db-catalog")
+    replace = os.replace
+
+    def replace_new_file_only(source, target):
+        # renaming over a mapped file fails on Windows, so never rename over any file
+        assert not os.path.exists(target)
+        replace(source, target)
+
+    monkeypatch.setattr(snapshot.os, "replace", replace_new_file_only)
+
+    first = CatalogSnapshot(write_snapshot(base, CARDS, VARIANTS, 1))
+    renamed = CARDS[0]._replace(name="Kiichan")
+    second = CatalogSnapshot(write_snapshot(base, [renamed], VARIANTS, 2))
+
+    # the old mapping keeps reading its own version
+    assert first.cards[1].name == "Kii" and second.cards[1].name == "Kiichan"
+    assert snapshot_versions(base) == [1, 2]
+    assert latest_snapshot(base) == f"{base}.2"
+
+
+def test_prune_keeps_the_newest_and_skips_files_in_use(tmp_path, monkeypatch):
+    base = str(tmp_path / "database.db-catalog")
+    for version in range(1, 5):
+        write_snapshot(base, CARDS, VARIANTS, version)
+
+    remove = os.remove
+
+    def remove_unless_mapped(path):
+        if path.endswith(".1"):
+            raise PermissionError(path)
+        remove(path)
+
+    monkeypatch.setattr(snapshot.os, "remove", remove_unless_mapped)
+    prune_snapshots(base)
+    assert snapshot_versions(base) == [1, 3, 4]
+
+    monkeypatch.setattr(snapshot.os, "remove", remove)
+    prune_snapshots(base)
+    assert snapshot_versions(base) == [3, 4]
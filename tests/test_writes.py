@@ -0,0 +1,101 @@
+#----------------------WRITE OPERATIONS----------------------#
+# Stardust and inventory writes are registered with `writes`, so a cluster runs them
+# in the writer process. These call them the way a shard does with no writer connected.
+
+import asyncio
+import sqlite3
+
+import cogs.gacha as gacha
+from cogs.gacha import Database, Gacha
+from helpers.coordinator import writes
+from helpers.migrations import apply_migrations
+
+USER = 1234
+
+
+def economy_database(path) -> str:
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        apply_migrations(conn)
+        conn.execute("INSERT INTO cards (id, name, image_url, artist_name) VALUES (1, 'Kii', '', 'Seed')")
+        conn.executemany(
+            "INSERT INTO card_variants (id, card_id, image_url, holo_type, signature_type) VALUES (?, 1, '', ?, ?)",
+            ((1, 0, 0), (2, 1, 2)),
+        )
+        conn.execute("INSERT INTO users (discord_id, currency, has_claimed_welcome) VALUES (?, 500, 1)", (USER,))
+        conn.executemany(
+            "INSERT INTO user_inventory (user_id, card_variant_id, quantity) VALUES (?, ?, ?)",
+            ((USER, 1, 4), (USER, 2, 3)),
+        )
+    finally:
+        conn.close()
+    return str(path)
+
+
+def call(db_path, monkeypatch, *calls):
+    monkeypatch.setattr(gacha, "DATABASE_PATH", db_path)
+    Gacha(None)
+
+    async def run():
+        await Database.close()
+        try:
+            return [await writes.call(name, *args) for name, *args in calls]
+        finally:
+            await Database.close()
+
+    return asyncio.run(run())
+
+
+def balance(db_path) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT currency FROM users WHERE discord_id = ?", (USER,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_every_stardust_write_is_an_operation():
+    Gacha(None)
+    assert {
+        "message_points", "pull", "daily", "recycle", "bulk_recycle", "add_points", "remove_points", "set_points",
+    } <= set(writes.operations)
+
+
+def test_daily_is_claimed_once(tmp_path, monkeypatch):
+    db_path = economy_database(tmp_path / "economy.db")
+    first, second = call(db_path, monkeypatch, ("daily", USER), ("daily", USER))
+
+    assert first["streak"] == 1 and first["currency"] == 500 + gacha.DAILY_STARDUST_AMOUNT
+    assert set(second) == {"next_reset"}
+    assert balance(db_path) == 500 + gacha.DAILY_STARDUST_AMOUNT
+
+
+def test_recycles_pay_out_and_keep_one_copy(tmp_path, monkeypatch):
+    db_path = economy_database(tmp_path / "economy.db")
+    manual, bulk = call(db_path, monkeypatch, ("recycle", USER, 1, 1, gacha.RECYCLE_STANDARD), ("bulk_recycle", USER, 1))
+
+    assert manual == gacha.RECYCLE_STANDARD
+    # tier 1 only recycles standard duplicates, the holo golden signed copies stay
+    assert bulk["total"] == 2 * gacha.RECYCLE_STANDARD
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT card_variant_id, quantity FROM user_inventory ORDER BY card_variant_id").fetchall() == [
+            (1, 1), (2, 3),
+        ]
+    finally:
+        conn.close()
+    assert balance(db_path) == 500 + 3 * gacha.RECYCLE_STANDARD
+
+
+def test_admin_point_changes(tmp_path, monkeypatch):
+    db_path = economy_database(tmp_path / "economy.db")
+    added, refused, removed, total = call(
+        db_path, monkeypatch,
+        ("add_points", USER, 100), ("remove_points", USER, 10_000), ("remove_points", USER, 50), ("set_points", USER, 1000),
+    )
+
+    assert added == 600
+    assert refused is None
+    assert removed["currency"] == 550
+    # total collected went 0 -> 100 with the grant and grows by the 450 the balance was raised
+    assert total == 550 and balance(db_path) == 1000